@@ -11,6 +11,7 @@ import importlib
 import uuid
 from datetime import datetime, timedelta
 import logging
+from utils.ai_stats import show_ai_stats
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -161,6 +162,7 @@ def show_login_page():
 def show_main_app():
     st.sidebar.write("디버그 정보:")
     st.sidebar.write(f"사용자 데이터: {st.session_state.user}")
+    show_ai_stats()
 
     # 사이드바에 메뉴 추가
     menu = st.sidebar.selectbox(
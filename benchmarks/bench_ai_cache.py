@@ -0,0 +1,52 @@
+"""
+AI 응답 캐시 적중 시 지연 시간 (로컬 LLM 스텁 서버 사용, 응답 지연 LATENCY초).
+
+    python benchmarks/bench_ai_cache.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.ai_cache import AIResponseCache
+from utils.llm_client import LLMClient
+from utils.llm_stub import StubLLMServer
+
+LATENCY = 0.5
+REGIONS = ["수원시", "성남시", "고양시", "용인시"]
+REPEAT = 200
+
+
+def main():
+    with StubLLMServer(latency=LATENCY) as server, tempfile.TemporaryDirectory() as root:
+        client = LLMClient("bench-key", base_url=server.base_url)
+        path = os.path.join(root, "ai_responses.sqlite")
+        cache = AIResponseCache(path=path)
+
+        def ask(cache, region):
+            prompt = f"지역: {region}\n탄소 배출량을 줄이기 위한 정책을 5개 제안해주세요."
+            return cache.get_or_call(prompt, lambda: client.chat(prompt), client.model, "bench")
+
+        rows = []
+        for label, target in (("미적중 (LLM 호출)", lambda: cache), ("메모리 적중", lambda: cache),
+                              ("디스크 적중 (새 프로세스)", lambda: AIResponseCache(path=path))):
+            timings = []
+            for i in range(len(REGIONS) if label.startswith("미적중") else REPEAT):
+                instance = target()
+                start = time.perf_counter()
+                ask(instance, REGIONS[i % len(REGIONS)])
+                timings.append((time.perf_counter() - start) * 1000)
+            rows.append((label, np.mean(timings), np.percentile(timings, 95)))
+
+        print(f"{'':<24}{'평균(ms)':>12}{'p95(ms)':>12}")
+        for label, mean, p95 in rows:
+            print(f"{label:<24}{mean:>12.3f}{p95:>12.3f}")
+        print(f"LLM 요청 수: {len(server.requests)}, 캐시 통계: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+녹화/재생 전송 계층으로 LLM 경로를 오프라인 부하 테스트합니다.
+로컬 스텁 서버에 정책 제안 프롬프트를 보내 녹화한 뒤, 서버를 내리고 주입한 지연 분포로 재생합니다.
+
+    python benchmarks/bench_cassette.py [지연 분포]   (예: lognormal:0.2,0.6, 기본값 아래 LATENCY)
+
+실제 Groq/네이버 응답으로 페이지 전체를 재현하려면 키가 있는 환경에서 한 번 녹화한 뒤 재생합니다.
+
+    CASSETTE_MODE=record streamlit run app.py
+    CASSETTE_MODE=replay CASSETTE_LATENCY=lognormal:0.8,0.5 CASSETTE_SEED=0 streamlit run app.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.cassette import LatencyModel, mount_cassette
+from utils.llm_client import LLMClient
+from utils.llm_stub import StubLLMServer
+from utils.suggestions import policy_jobs
+
+LATENCY = "lognormal:0.2,0.6"
+PROMPTS = 20
+CALLS = 200
+SESSIONS = 16
+
+
+def main():
+    spec = sys.argv[1] if len(sys.argv) > 1 else LATENCY
+    prompts = [prompt for _, _, prompt in policy_jobs('gyeonggi')[:PROMPTS]]
+    root = tempfile.mkdtemp()
+
+    with StubLLMServer(latency=0.05) as server:
+        client = LLMClient("bench-key", base_url=server.base_url)
+        recorder = mount_cassette(client.session, 'groq', inner=client.session.get_adapter('https://'),
+                                  mode='record', root=root)
+        for prompt in prompts:
+            client.chat(prompt)
+            "".join(client.chat_stream(prompt))
+        base_url = server.base_url
+    print(f"녹화: {recorder.stats()['recorded']}개 응답 ({root})")
+
+    # 서버가 내려간 상태에서 재생합니다.
+    client = LLMClient("bench-key", base_url=base_url, pool_size=SESSIONS)
+    player = mount_cassette(client.session, 'groq', mode='replay', root=root, latency=LatencyModel(spec, seed=0))
+    rng = random.Random(0)
+    calls = [(rng.choice(prompts), rng.random() < 0.5) for _ in range(CALLS)]
+
+    def call(args):
+        prompt, stream = args
+        start = time.perf_counter()
+        text = "".join(client.chat_stream(prompt)) if stream else client.chat(prompt)
+        return time.perf_counter() - start, text
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=SESSIONS) as pool:
+        results = list(pool.map(call, calls))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([latency for latency, _ in results])
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f"재생 ({spec}): {CALLS}회, 동시 {SESSIONS}세션, {elapsed:.2f}초, 처리량 {CALLS / elapsed:.1f}회/초")
+    print(f"지연 p50 {p50:.3f}초, p95 {p95:.3f}초, p99 {p99:.3f}초")
+    print(f"재생 통계: {player.stats()}")
+
+
+if __name__ == "__main__":
+    main()
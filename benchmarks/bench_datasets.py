@@ -0,0 +1,61 @@
+"""
+재실행당 데이터셋 전달 비용: st.cache_data 복사본 vs 공유 읽기 전용 뷰.
+
+st.cache_data는 적중할 때마다 저장된 pickle을 풀어 새 복사본을 만듭니다.
+경계 GeoDataFrame과 조인된 지도 프레임에 대해 그 비용(시간, 할당 메모리)을
+공유 프레임의 얕은 복사본을 건네는 비용과 비교합니다.
+
+    python benchmarks/bench_datasets.py
+"""
+import os
+import pickle
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import geopandas as gpd
+
+from utils.catalog import get_province_catalog
+from utils.dataset import load_gyeonggi_emissions
+from utils.geometry import LAYERS
+
+REPEAT = 20
+
+
+def measure(hand_out):
+    hand_out()  # 예열
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        hand_out()
+    elapsed_ms = (time.perf_counter() - start) / REPEAT * 1000
+
+    tracemalloc.start()
+    result = hand_out()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed_ms, peak
+
+
+def main():
+    frames = {
+        '경계 원본 (GeoDataFrame)': gpd.read_file(LAYERS['sgg_41']['path']).to_crs(epsg=4326),
+        '지도 조인 프레임': get_province_catalog().get(41).data,
+        '지자체 배출 표': load_gyeonggi_emissions(),
+    }
+
+    print(f"{'프레임':<24}{'방식':<10}{'시간(ms)':>12}{'할당(KB)':>12}")
+    for name, frame in frames.items():
+        # st.cache_data 적중 경로: 저장된 pickle을 매번 역직렬화
+        payload = pickle.dumps(frame, protocol=pickle.HIGHEST_PROTOCOL)
+        elapsed_ms, peak = measure(lambda: pickle.loads(payload))
+        print(f"{name:<24}{'복사본':<10}{elapsed_ms:>12.3f}{peak / 1024:>12.1f}")
+
+        elapsed_ms, peak = measure(lambda: frame.copy(deep=False))
+        print(f"{name:<24}{'공유 뷰':<10}{elapsed_ms:>12.3f}{peak / 1024:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+탄소 발자국 계산 처리량: 행 단위 스칼라 계산 vs 계수 행렬 일괄 계산 vs CSV 스트리밍.
+
+    python benchmarks/bench_footprint.py [행 수]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from utils.footprint import INPUT_COLUMNS, calculate_footprint, calculate_footprints, score_csv
+
+SCALAR_ROWS = 100_000
+
+
+def make_inputs(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    upper = [1000, 1000, 21, 50, 50]
+    return pd.DataFrame({column: rng.integers(0, high + 1, rows) for column, high in zip(INPUT_COLUMNS, upper)})
+
+
+def report(name, rows, elapsed):
+    print(f"{name:<20}{rows:>12,}{elapsed * 1000:>12.1f}{rows / elapsed:>16,.0f}")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    df = make_inputs(rows)
+
+    print(f"{'방식':<20}{'행 수':>12}{'시간(ms)':>12}{'행/초':>16}")
+
+    sample = df.head(SCALAR_ROWS).to_numpy().tolist()
+    start = time.perf_counter()
+    for values in sample:
+        calculate_footprint(*values)
+    report("스칼라 (행 단위)", len(sample), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    calculate_footprints(df)
+    report("일괄 (계수 행렬)", rows, time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "households.csv")
+        df.to_csv(input_path, index=False)
+        start = time.perf_counter()
+        score_csv(input_path, os.path.join(tmp, "scored.csv"))
+        report("CSV 스트리밍", rows, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+경기도 지자체 지도: 원본 경계 vs 단순화 경계 벤치마크.
+
+브라우저로 전송되는 Figure JSON 크기와 Figure 생성 시간을 비교합니다.
+
+    python benchmarks/bench_geometry.py
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import geopandas as gpd
+import plotly.express as px
+
+from utils.dataset import load_gyeonggi_emissions
+from utils.geometry import LAYERS, SIMPLIFY_LEVELS, join_layer_data, load_simplified_layer
+
+REPEAT = 5
+
+
+def preprocess_name(name):
+    # 기존 carbon_map의 이름 기반 조인
+    return name.replace('경기도 ', '').replace(' ', '')
+
+
+def build_full_resolution_figure(df):
+    # 기존 carbon_map.show_gyeonggi_map과 같은 경로
+    gdf = gpd.read_file(LAYERS['sgg_41']['path']).to_crs(epsg=4326)
+    gdf['처리된_지자체명'] = gdf['SGG_NM'].apply(preprocess_name)
+    df = df.assign(처리된_지자체명=df['지자체명'].apply(preprocess_name))
+    merged = gdf.merge(df, on='처리된_지자체명', how='inner')
+    return px.choropleth_mapbox(merged, geojson=merged.geometry, locations=merged.index,
+                                color='순배출량', mapbox_style="carto-positron", zoom=8,
+                                center={"lat": 37.41, "lon": 127.52}, hover_name='SGG_NM')
+
+
+def build_simplified_figure(df, level):
+    layer = load_simplified_layer('sgg_41', level)
+    merged = join_layer_data(layer, df)
+    return px.choropleth_mapbox(merged, geojson=layer.geojson, locations='_feature_id',
+                                color='순배출량', mapbox_style="carto-positron", zoom=8,
+                                center={"lat": 37.41, "lon": 127.52}, hover_name='SGG_NM')
+
+
+def measure(builder):
+    fig = builder()  # 예열 (디스크 캐시/프로세스 캐시 생성)
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fig = builder()
+    elapsed_ms = (time.perf_counter() - start) / REPEAT * 1000
+    return elapsed_ms, len(fig.to_json().encode('utf-8'))
+
+
+def main():
+    df = load_gyeonggi_emissions()
+
+    print(f"{'경계':<16}{'Figure 생성(ms)':>16}{'전송 크기(KB)':>16}")
+    elapsed_ms, size = measure(lambda: build_full_resolution_figure(df))
+    print(f"{'원본':<16}{elapsed_ms:>16.1f}{size / 1024:>16.1f}")
+
+    for level, tolerance in SIMPLIFY_LEVELS.items():
+        elapsed_ms, size = measure(lambda: build_simplified_figure(df, level))
+        print(f"{f'{level} ({tolerance}m)':<16}{elapsed_ms:>16.1f}{size / 1024:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+로컬 템플릿 대체 결과가 있을 때와 없을 때 결과 칸의 첫 내용 표시 지연 (로컬 LLM 스텁 서버 사용).
+스텁은 요청의 SLOW_SHARE만큼을 SLOW_LATENCY초, 나머지를 FAST_LATENCY초 뒤에 응답하기 시작합니다.
+
+    python benchmarks/bench_hedging.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.ai_jobs import AIJobExecutor
+from utils.llm_client import LLMClient
+from utils.llm_stub import DEFAULT_REPLY, StubLLMServer
+
+FAST_LATENCY = 0.2
+SLOW_LATENCY = 3.0
+SLOW_SHARE = 0.2
+DEADLINE = 0.5
+JOBS = 50
+
+
+def slow_tail_reply(payload):
+    time.sleep(SLOW_LATENCY if random.random() < SLOW_SHARE else FAST_LATENCY)
+    return DEFAULT_REPLY
+
+
+def first_content(executor, client, fallback):
+    jobs = [executor.submit("bench", i, lambda: client.chat_stream("정책 제안"),
+                            fallback=(lambda: "기본 제안") if fallback else None, deadline=DEADLINE)
+            for i in range(JOBS)]
+    latencies = [None] * JOBS
+    while any(latency is None for latency in latencies):
+        for i, job in enumerate(jobs):
+            if latencies[i] is None and job.view()[1] != 'waiting':
+                latencies[i] = time.monotonic() - job.started
+        time.sleep(0.005)
+    while not all(job.done for job in jobs):
+        time.sleep(0.05)
+    return np.array(latencies)
+
+
+def main():
+    random.seed(0)
+    with StubLLMServer(reply=slow_tail_reply) as server:
+        client = LLMClient("bench-key", base_url=server.base_url, pool_size=JOBS)
+        print(f"{'':<16}{'p50(s)':>10}{'p95(s)':>10}{'p99(s)':>10}")
+        for label, fallback in (("대체 결과 없음", False), ("대체 결과 있음", True)):
+            executor = AIJobExecutor(max_workers=JOBS)
+            latencies = first_content(executor, client, fallback)
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            print(f"{label:<16}{p50:>10.3f}{p95:>10.3f}{p99:>10.3f}")
+            if fallback:
+                stats = executor.stats()
+                print(f"대체 결과 표시 {stats['fallbacks']}회, 이후 LLM 답변으로 교체 {stats['swapped']}회")
+
+
+if __name__ == "__main__":
+    main()
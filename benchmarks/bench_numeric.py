@@ -0,0 +1,62 @@
+"""
+숫자 컬럼 정리: 기존 셀 단위 apply(clean_numeric) vs 벡터화 parse_korean_numeric.
+
+    python benchmarks/bench_numeric.py [행 수]
+"""
+import io
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset import parse_korean_numeric
+
+
+def clean_numeric(x):
+    # 기존 pages/visualization.py 구현 ('-'를 문자열 안에서 모두 '0'으로 바꿔 음수가 깨짐)
+    if isinstance(x, str):
+        return float(x.replace(',', '').replace('-', '0'))
+    return float(x)
+
+
+def make_column(n_rows, seed=0):
+    # 시군구 CSV와 같은 형태로 쓰고 read_csv로 다시 읽어 실제 로드 경로의 컬럼 타입을 재현합니다.
+    rng = np.random.default_rng(seed)
+    values = rng.integers(-5_000_000, 50_000_000, n_rows)
+    text = pd.Series(values).map('"{:,}"'.format)
+    text[rng.random(n_rows) < 0.05] = '-'
+    text[rng.random(n_rows) < 0.05] = '0'
+    csv = "값\n" + "\n".join(text)
+    return pd.read_csv(io.StringIO(csv))['값']
+
+
+def timed(fn, column, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(column)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    column = make_column(n_rows)
+
+    legacy_ms, legacy = timed(lambda c: c.apply(clean_numeric), column)
+    vector_ms, vectorized = timed(parse_korean_numeric, column)
+
+    negatives = column.map(lambda x: isinstance(x, str) and x.startswith('-') and x != '-')
+    print(f"행 수: {n_rows:,}")
+    print(f"apply(clean_numeric):  {legacy_ms:10.1f} ms")
+    print(f"parse_korean_numeric:  {vector_ms:10.1f} ms  (x{legacy_ms / vector_ms:.1f})")
+    print(f"음수 셀 {negatives.sum():,}개 중 잘못 변환된 셀 - "
+          f"기존: {(legacy[negatives] >= 0).sum():,}, 벡터화: {(vectorized[negatives] >= 0).sum():,}")
+
+
+if __name__ == "__main__":
+    main()
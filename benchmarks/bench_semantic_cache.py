@@ -0,0 +1,60 @@
+"""
+유사 요청 캐시의 거리 기준별 적중률과 아낀 LLM 시간 (로컬 LLM 스텁 서버 사용, 응답 지연 LATENCY초).
+경기도와 광역 단위 모든 지역의 정책 제안을 무작위 순서로 한 번씩 요청합니다.
+거리는 특징마다 데이터셋 표준편차로 나눈 눈금입니다.
+
+    python benchmarks/bench_semantic_cache.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.dataset import dataset_version
+from utils.llm_client import LLMClient
+from utils.llm_stub import StubLLMServer
+from utils.semantic_cache import SemanticCache, emissions_features
+from utils.suggestions import policy_feature_scales, policy_inputs, policy_namespace, policy_prompt
+
+LATENCY = 0.3
+DISTANCES = [0.1, 0.25, 0.5]
+DATASETS = ['gyeonggi', 'national']
+
+
+def main():
+    with StubLLMServer(latency=LATENCY, reply=lambda payload: "지역 맞춤 정책 제안") as server:
+        client = LLMClient("bench-key", base_url=server.base_url)
+        for dataset in DATASETS:
+            inputs = [(region, emissions_data) for _, region, emissions_data in policy_inputs(dataset)]
+            random.Random(0).shuffle(inputs)
+            scales = policy_feature_scales(dataset, dataset_version())
+            print(f"[{dataset}] 지역 {len(inputs)}개")
+            print(f"{'거리 기준':<10}{'LLM 호출':>10}{'적중률':>10}{'아낀 시간(s)':>14}{'총 소요(s)':>12}")
+            for max_distance in DISTANCES:
+                cache = SemanticCache(max_distance=max_distance)
+                calls = 0
+                pairs = []
+                start = time.perf_counter()
+                for region, emissions_data in inputs:
+                    namespace = policy_namespace(client.model, emissions_data)
+                    vector = emissions_features(emissions_data, scales)
+                    similar = cache.lookup(namespace, vector)
+                    if similar is not None:
+                        pairs.append((region, similar[1], similar[2]))
+                        continue
+                    call_start = time.monotonic()
+                    response = client.chat(policy_prompt(region, emissions_data))
+                    cache.add(namespace, vector, region, response, time.monotonic() - call_start)
+                    calls += 1
+                elapsed = time.perf_counter() - start
+                stats = cache.stats()
+                print(f"{max_distance:<10}{calls:>10}{stats['hit_rate']:>10.1%}{stats['saved_seconds']:>14.2f}"
+                      f"{elapsed:>12.2f}")
+                for region, source, distance in pairs[:3]:
+                    print(f"    {region} <- {source} (거리 {distance:.3f})")
+
+
+if __name__ == "__main__":
+    main()
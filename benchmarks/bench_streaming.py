@@ -0,0 +1,46 @@
+"""
+스트리밍과 일반 호출의 첫 내용 표시 시간 비교 (로컬 LLM 스텁 서버 사용).
+
+    python benchmarks/bench_streaming.py
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.llm_client import LLMClient
+from utils.llm_stub import StubLLMServer
+
+# 스텁 설정: 첫 토큰까지 FIRST_TOKEN초, 이후 조각마다 TOKEN_INTERVAL초
+FIRST_TOKEN = 0.3
+TOKEN_INTERVAL = 0.02
+REPLY = " ".join(f"{i}. 지역 특성을 고려한 탄소 감축 정책 제안입니다." for i in range(1, 6)) * 4
+REPEAT = 5
+
+
+def main():
+    with StubLLMServer(reply=REPLY, latency=FIRST_TOKEN, token_interval=TOKEN_INTERVAL) as server:
+        client = LLMClient("bench-key", base_url=server.base_url)
+        blocking, first, complete = [], [], []
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            client.chat("정책 제안")
+            blocking.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for i, _ in enumerate(client.chat_stream("정책 제안")):
+                if i == 0:
+                    first.append(time.perf_counter() - start)
+            complete.append(time.perf_counter() - start)
+
+    print(f"{'':<28}{'평균(s)':>10}")
+    print(f"{'일반 호출: 첫 내용 표시':<28}{np.mean(blocking):>10.3f}")
+    print(f"{'스트리밍: 첫 내용 표시':<28}{np.mean(first):>10.3f}")
+    print(f"{'스트리밍: 전체 완료':<28}{np.mean(complete):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
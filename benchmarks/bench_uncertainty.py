@@ -0,0 +1,33 @@
+"""
+몬테카를로 불확실성 계산의 요청당 지연 시간 (목표: 50 ms 미만).
+
+    python benchmarks/bench_uncertainty.py
+"""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.uncertainty import DRAWS, simulate_footprint
+
+REPEAT = 50
+INPUTS = [100, 300, 7, 10, 5]
+
+
+def main():
+    print(f"{'표본 수':>10}{'평균(ms)':>12}{'p95(ms)':>12}")
+    for draws in (DRAWS // 4, DRAWS, DRAWS * 4):
+        simulate_footprint(INPUTS, draws=draws)  # 예열
+        timings = []
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            simulate_footprint(INPUTS, draws=draws)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{draws:>10,}{np.mean(timings):>12.2f}{np.percentile(timings, 95):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,48 +5,32 @@ import plotly.graph_objects as go
 import sys
 import os
 from datetime import datetime
-import requests
 
 # 프로젝트 루트 디렉토리를 sys.path에 추가
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-# Groq API 설정
-MODEL = "llama-3.1-70b-versatile"
-API_URL = "https://api.groq.com/openai/v1/chat/completions"
-GROQ_API_KEY = st.secrets["GROQ_API_KEY"]
-
-# 탄소 발자국 계산 함수 개선
+from utils.ai_helper import get_emission_reduction_tips as get_local_emission_reduction_tips
+from utils.ai_jobs import show_ai_job, submit_ai_job
+from utils.ai_stats import show_ai_stats
+from utils.emission_factors import factors_fingerprint
+from utils.figure_cache import get_figure_cache
+from utils.footprint import TOTAL_COLUMN, calculate_footprint, explain_calculation, recompute_footprints
+from utils.geocoder import get_region_locator
+from utils.history_store import downsample, get_history_store, history_frame
+from utils.llm_client import get_llm_client
+from utils.quantile_sketch import NATIONAL, get_percentile_sketches
+from utils.regions import get_region_registry
+from utils.running_stats import RunningStats
+from utils.uncertainty import DRAWS, simulate_footprint
+
+# 분포 내 위치와 지역 중앙값을 보여주기 위한 최소 제출 수
+PERCENTILE_MIN_SAMPLES = 30
+
+# 지역/전국 사용자 제출이 모자랄 때 비교하는 기준 1인 탄소 발자국 (톤 CO2e, 가정값)
+REFERENCE_AVERAGE = 5.0
+
+# 탄소 발자국 계산 함수 개선 (계수 행렬 기반 엔진, 대량 계산은 utils.footprint.calculate_footprints)
 def calculate_carbon_footprint(transportation, energy_usage, food_habits, consumer_goods, waste):
-    # 교통 (주간 자동차 사용 km)
-    transport_footprint = (transportation * 52 * 0.12) / 1000  # 연간으로 환산, kg CO2/km, 톤 단위로 변환
-
-    # 에너지 사용 (월간 전기 사용량 kWh, 4인 가구 기준)
-    energy_footprint = (energy_usage * 12 * 0.4) / 1000  # 연간으로 환산, kg CO2/kWh, 톤 단위로 변환
-
-    # 식습관 (주간 육류 소비 횟수)
-    food_footprint = (food_habits * 52 * 3.3) / 1000  # 연간으로 환산, kg CO2e/식사, 톤 단위로 변환
-
-    # 소비재 (월간 새 물건 구매 횟수)
-    consumer_goods_footprint = (consumer_goods * 12 * 10) / 1000  # 연간으로 환산, kg CO2e/구매, 톤 단위로 변환
-
-    # 폐기물 (주간 재활용하지 않는 쓰레기 kg)
-    waste_footprint = (waste * 52 * 0.5) / 1000  # 연간으로 환산, kg CO2e/kg 쓰레기, 톤 단위로 변환
-    
-    total_footprint = (
-        transport_footprint +
-        energy_footprint +
-        food_footprint +
-        consumer_goods_footprint +
-        waste_footprint
-    )
-    
-    return total_footprint, {
-        "교통": transport_footprint,
-        "에너지": energy_footprint,
-        "식습관": food_footprint,
-        "소비재": consumer_goods_footprint,
-        "폐기물": waste_footprint
-    }
+    return calculate_footprint(transportation, energy_usage, food_habits, consumer_goods, waste)
 
 # AI를 이용한 맞춤형 팁 제공 함수
 def get_emission_reduction_tips(footprint, transportation, energy_usage, food_habits, consumer_goods, waste):
@@ -64,35 +48,50 @@ def get_emission_reduction_tips(footprint, transportation, energy_usage, food_ha
     천천히 답변해도 좋으니, 모든 답변 내용을 리뷰해서 100퍼센트 한글로만 답변해 주세요.
     """
 
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
-    data = {
-        "model": MODEL,
-        "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.7,
-        "max_tokens": 1000
-    }
-
-    response = requests.post(API_URL, headers=headers, json=data)
-    if response.status_code == 200:
-        return response.json()['choices'][0]['message']['content'].split("\n")
-    else:
-        return ["AI 팁을 가져오는 데 문제가 발생했습니다. 나중에 다시 시도해주세요."]
+    # 생성되는 대로 결과 칸에 쌓이도록 응답 조각을 차례로 내보냅니다 (백그라운드 작업에서 실행). 실패하면 LLMError.
+    yield from get_llm_client().chat_stream(prompt, temperature=0.7, max_tokens=1000)
+
+# AI 응답이 늦거나 실패할 때 먼저 보여줄 로컬 템플릿 팁 (템플릿은 kg 단위)
+def get_fallback_tips(footprint, transportation, energy_usage, food_habits, consumer_goods, waste):
+    tips = get_local_emission_reduction_tips(round(footprint * 1000, 1), transportation, energy_usage, food_habits, consumer_goods)
+    return "\n".join(f"- {tip}" for tip in tips)
 
 # 사용자 데이터 저장 및 불러오기 함수
+# 로그인 사용자의 기록만 저장소에 남기고, 비로그인 사용자의 기록은 세션에만 둡니다 (탭을 닫으면 사라짐).
+def current_user_id():
+    user = st.session_state.get('user')
+    return user['id'] if user else None
+
 def save_user_data(data):
-    if 'user_data' not in st.session_state:
-        st.session_state.user_data = []
-    st.session_state.user_data.append(data)
+    user_id = current_user_id()
+    if user_id is None:
+        st.session_state.setdefault('user_data', []).append(data)
+        return
+    # 누적 통계는 저장소가 기록 세그먼트와 함께 관리합니다.
+    get_history_store().append(user_id, data)
 
 def load_user_data():
-    return st.session_state.get('user_data', [])
+    user_id = current_user_id()
+    if user_id is None:
+        return history_frame(st.session_state.get('user_data', []))
+    return get_history_store().history(user_id)
+
+def load_history_series():
+    # 기록이 많으면 일/주/월 등 구간 평균으로 줄인 시계열
+    user_id = current_user_id()
+    if user_id is None:
+        return downsample(load_user_data())
+    return get_history_store().downsampled(user_id)
+
+def load_user_stats():
+    user_id = current_user_id()
+    if user_id is None:
+        return RunningStats.from_history(load_user_data())
+    return get_history_store().stats(user_id)
 
 def show():
     st.title("🌍 개인 탄소 발자국 계산기")
+    show_ai_stats()
 
     st.write("일상생활에서의 탄소 발자국을 자세히 계산하고 추적해보세요.")
 
@@ -107,74 +106,129 @@ def show():
         consumer_goods = st.slider("🛍️ 소비재 (월간 새 물건 구매 횟수)", 0, 50, 10, help="평균: 월 15회")
         waste = st.slider("🗑️ 폐기물 (주간 재활용하지 않는 쓰레기 kg)", 0, 50, 5, help="평균: 주 7kg")
 
-        if st.button("탄소 발자국 계산하기"):
+        # 지역 사용자 분포 비교를 위한 위치 (선택, 경기도 내 좌표). 입력하지 않으면 전국 분포만 봅니다.
+        with st.expander("📍 내 위치 (선택, 지역 사용자 분포 비교용)"):
+            latitude = st.number_input("위도", value=None, format="%.4f", placeholder="예: 37.2636")
+            longitude = st.number_input("경도", value=None, format="%.4f", placeholder="예: 127.0286")
+
+        uncertainty_mode = st.checkbox("🎲 불확실성 범위 함께 보기 (몬테카를로)",
+                                       help="배출계수와 입력값의 오차를 반영해 95% 신뢰구간을 계산합니다.")
+
+        # 결과는 입력이 바뀔 때까지 유지합니다 (AI 팁이 끝나 페이지 전체가 다시 실행되어도 그대로 보이도록).
+        # 기록 저장처럼 한 번만 해야 하는 일은 버튼을 누른 실행에서만 합니다.
+        calculation = (transportation, energy_usage, food_habits, consumer_goods, waste, latitude, longitude, uncertainty_mode)
+        calculate = st.button("탄소 발자국 계산하기")
+        if calculate:
+            st.session_state.calculation = calculation
+
+        if st.session_state.get('calculation') == calculation:
             # 탄소 발자국 계산
             footprint, footprint_breakdown = calculate_carbon_footprint(
                 transportation, energy_usage, food_habits, consumer_goods, waste
             )
 
+            # AI 팁은 백그라운드에서 먼저 요청해 두고, 응답을 기다리지 않고 나머지 결과를 그립니다.
+            # 2초 안에 응답이 시작되지 않으면 로컬 템플릿 팁을 먼저 보여주고 AI 답변이 오면 바꿉니다.
+            tip_inputs = (transportation, energy_usage, food_habits, consumer_goods, waste)
+            submit_ai_job("carbon_calculator.tips",
+                          lambda: get_emission_reduction_tips(footprint, *tip_inputs), signature=tip_inputs,
+                          fallback=lambda: get_fallback_tips(footprint, *tip_inputs))
+
             st.subheader(f"당신의 연간 탄소 발자국: {footprint:.2f} 톤 CO2e")
 
-            # 지역 평균과 비교 (예시 데이터, 실제 데이터로 대체 필요)
-            region_average = 5.0  # 톤 CO2e
+            if uncertainty_mode:
+                interval = simulate_footprint([transportation, energy_usage, food_habits, consumer_goods, waste])
+                st.write(f"95% 신뢰구간: {interval.at[TOTAL_COLUMN, '하한']:.2f} ~ "
+                         f"{interval.at[TOTAL_COLUMN, '상한']:.2f} 톤 CO2e ({DRAWS:,}회 표본추출)")
+                st.dataframe(interval.style.format("{:.2f}"))
+
+            # 위치를 입력한 경우에만 시군구를 찾아 지역 사용자 분포에 넣습니다.
+            located = latitude is not None and longitude is not None
+            region_code = get_region_locator().resolve(longitude, latitude) if located else None
+            region_name = get_region_registry().name_for(region_code) if region_code else None
+
+            # 지역 평균과 비교: 같은 시군구 사용자 제출의 중앙값 (제출이 모자라면 상위 시/도, 전국 순).
+            # 어디에도 제출이 충분하지 않으면 기준값과 비교합니다.
+            sketches = get_percentile_sketches()
+            typical = sketches.median(region_code, min_samples=PERCENTILE_MIN_SAMPLES)
+            if typical is not None:
+                region_average, key, samples = typical  # 톤 CO2e
+                area = "전국" if key == NATIONAL else get_region_registry().name_for(key)
+                basis = f"{area} 사용자 중앙값"
+                st.caption(f"비교 기준: {area} 사용자 {samples:,}명이 계산한 탄소 발자국의 중앙값 {region_average:.2f} 톤 CO2e")
+            else:
+                region_average = REFERENCE_AVERAGE
+                basis = "기준 평균"
+                st.caption(f"비교 기준: 사용자 제출이 {PERCENTILE_MIN_SAMPLES}명 미만이라 1인 기준값 "
+                           f"{REFERENCE_AVERAGE:.1f} 톤 CO2e(가정값)와 비교합니다.")
             comparison = (footprint - region_average) / region_average * 100
 
             if comparison > 0:
-                st.write(f"당신의 탄소 발자국은 지역 평균보다 {comparison:.1f}% 높습니다.")
+                st.write(f"당신의 탄소 발자국은 {basis}보다 {comparison:.1f}% 높습니다.")
             else:
-                st.write(f"당신의 탄소 발자국은 지역 평균보다 {abs(comparison):.1f}% 낮습니다.")
+                st.write(f"당신의 탄소 발자국은 {basis}보다 {abs(comparison):.1f}% 낮습니다.")
+
+            # 다른 사용자 제출 분포에서의 위치 (분위수 스케치 조회)
+            groups = [(region_name, region_code), ("전국", None)] if region_code else [("전국", None)]
+            for label, code in groups:
+                percentile, samples = sketches.percentile(footprint, code)
+                if samples >= PERCENTILE_MIN_SAMPLES:
+                    st.write(f"{label} 사용자 {samples:,}명 중 {percentile:.0f}%가 당신보다 탄소 발자국이 작습니다.")
+            if calculate:
+                sketches.record(region_code, footprint)
 
             # 각 항목별 탄소발자국 발생량 표시
             st.subheader("🏷️ 항목별 탄소발자국 발생량:")
             for category, amount in footprint_breakdown.items():
                 st.write(f"{category}: {amount:.2f} 톤 CO2e")
 
-            # 탄소 발자국 내역 시각화
-            fig = px.pie(
-                values=list(footprint_breakdown.values()),
-                names=list(footprint_breakdown.keys()),
-                title='탄소 발자국 내역'
-            )
+            # 탄소 발자국 내역 시각화 (같은 입력이면 캐시된 Figure 재사용)
+            figure_cache = get_figure_cache()
+            inputs = dict(transportation=transportation, energy_usage=energy_usage, food_habits=food_habits,
+                          consumer_goods=consumer_goods, waste=waste, factors=factors_fingerprint())
+            fig = figure_cache.get_or_build(
+                "carbon_calculator.breakdown",
+                lambda: px.pie(
+                    values=list(footprint_breakdown.values()),
+                    names=list(footprint_breakdown.keys()),
+                    title='탄소 발자국 내역'
+                ),
+                **inputs)
             st.plotly_chart(fig)
 
             # 비교 시각화
-            fig = px.bar(x=['Your Footprint', 'Region Average'], y=[footprint, region_average],
-                         labels={'x': '', 'y': 'Carbon Footprint (tons CO2e)'},
-                         title='당신의 탄소발자국 vs 지역 평균')
+            fig = figure_cache.get_or_build(
+                "carbon_calculator.comparison",
+                lambda: px.bar(x=['Your Footprint', basis], y=[footprint, region_average],
+                               labels={'x': '', 'y': 'Carbon Footprint (tons CO2e)'},
+                               title=f'당신의 탄소발자국 vs {basis}'),
+                region_average=round(region_average, 6), basis=basis, **inputs)
             st.plotly_chart(fig)
 
             # AI 맞춤형 팁 제공
-            st.subheader("💡 AI의 탄소 배출 감소를 위한 맞춤형 팁:")
-            with st.spinner("AI가 맞춤형 팁을 생성하고 있습니다..."):
-                tips = get_emission_reduction_tips(footprint, transportation, energy_usage, food_habits, consumer_goods, waste)
-            for tip in tips:
-                st.write(f" {tip}")
+            show_ai_job("carbon_calculator.tips", signature=tip_inputs, title="💡 AI의 탄소 배출 감소를 위한 맞춤형 팁:",
+                        waiting_text="AI가 맞춤형 팁을 생성하고 있습니다...",
+                        error_text="AI 팁을 가져오는 데 문제가 발생했습니다. 나중에 다시 시도해주세요.")
                 
             # 추가 정보 제공
             st.info("이 팁들은 AI에 의해 생성되었으며, 귀하의 개인 상황에 맞춰 제안되었습니다. 실행 가능성을 고려하여 적용해 보세요.")
 
             # 결과 저장
-            save_user_data({
-                "date": datetime.now().strftime("%Y-%m-%d"),
-                "footprint": footprint,
-                "breakdown": footprint_breakdown,
-                "transportation": transportation,
-                "energy_usage": energy_usage,
-                "food_habits": food_habits,
-                "consumer_goods": consumer_goods,
-                "waste": waste
-            })
+            if calculate:
+                save_user_data({
+                    "date": datetime.now(),
+                    "footprint": footprint,
+                    "transportation": transportation,
+                    "energy_usage": energy_usage,
+                    "food_habits": food_habits,
+                    "consumer_goods": consumer_goods,
+                    "waste": waste
+                })
 
             # 계산 방법 설명
             st.subheader("ℹ️ 탄소발자국 계산 방법")
+            st.write(explain_calculation())
             st.write("""
-            각 항목별 CO2e 환산 계산 방법:\n
-            🚗 교통: (주간 km * 52주 * 0.12 kg CO2/km) / 1000 = 연간 톤 CO2e\n
-            💡 에너지: (월간 kWh * 12개월 * 0.4 kg CO2/kWh) / 1000 = 연간 톤 CO2e\n
-            🍖 식습관: (주간 육류 소비 횟수 * 52주 * 3.3 kg CO2e/식사) / 1000 = 연간 톤 CO2e\n
-            🛍️ 소비재: (월간 구매 횟수 * 12개월 * 10 kg CO2e/구매) / 1000 = 연간 톤 CO2e\n
-            🗑️ 폐기물: (주간 kg * 52주 * 0.5 kg CO2e/kg) / 1000 = 연간 톤 CO2e\n\n
-            
             이 계산 방법은 일반적인 추정치를 사용한 것으로, 실제 상황에 따라 다를 수 있습니다.
             더 정확한 계산을 위해서는 지역별, 상황별 특성을 고려한 세부적인 데이터가 필요합니다.
             """)
@@ -182,9 +236,13 @@ def show():
     with tabs[1]:  # 히스토리 탭
         st.subheader("📊 탄소 발자국 히스토리")
         user_data = load_user_data()
-        if user_data:
-            df = pd.DataFrame(user_data)
-            fig = px.line(df, x="date", y="footprint", title="탄소 발자국 변화 추이")
+        if not user_data.empty:
+            # 기록이 많으면 일/주/월 등 구간 평균으로 줄인 시계열을 그립니다.
+            df, bucket = load_history_series()
+            # 저장된 입력값을 현재 배출계수 표로 한 번에 다시 계산 (계수 개정 시 기록 전체에 반영)
+            df = df.assign(footprint=recompute_footprints(df)[TOTAL_COLUMN])
+            title = f"탄소 발자국 변화 추이 ({bucket} 평균)" if bucket else "탄소 발자국 변화 추이"
+            fig = px.line(df, x="date", y="footprint", title=title)
             st.plotly_chart(fig)
 
             # 항목별 추이 그래프
@@ -196,35 +254,35 @@ def show():
             st.plotly_chart(fig)
 
             # 데이터 테이블 표시
-            st.subheader("상세 데이터")
-            st.dataframe(df)
+            st.subheader("상세 데이터 (최근 100건)")
+            st.dataframe(user_data.tail(100))
         else:
             st.write("아직 저장된 데이터가 없습니다.")
 
     with tabs[2]:  # 통계 탭
         st.subheader("📈 탄소 발자국 통계")
-        user_data = load_user_data()
-        if user_data:
-            df = pd.DataFrame(user_data)
-            avg_footprint = df['footprint'].mean()
-            max_footprint = df['footprint'].max()
-            min_footprint = df['footprint'].min()
-
-            st.write(f"평균 탄소 발자국: {avg_footprint:.2f} 톤 CO2e")
-            st.write(f"최대 탄소 발자국: {max_footprint:.2f} 톤 CO2e")
-            st.write(f"최소 탄소 발자국: {min_footprint:.2f} 톤 CO2e")
-
-            # 탄소 발자국 분포 히스토그램
-            fig = px.histogram(df, x="footprint", nbins=20, title="탄소 발자국 분포")
+        # 기록 세그먼트에 저장된 누적 통계를 합쳐 읽으므로 기록 수와 무관하게 바로 표시됩니다.
+        # 발자국은 히스토리 탭과 같이 현재 배출계수로 계산한 값입니다.
+        stats = load_user_stats()
+        if stats.count:
+            summary = stats.summary()
+
+            st.write(f"평균 탄소 발자국: {summary['mean']:.2f} 톤 CO2e")
+            st.write(f"최대 탄소 발자국: {summary['max']:.2f} 톤 CO2e")
+            st.write(f"최소 탄소 발자국: {summary['min']:.2f} 톤 CO2e")
+
+            # 탄소 발자국 분포 히스토그램 (고정 구간)
+            fig = px.bar(stats.histogram_frame(), x="footprint", y="count", title="탄소 발자국 분포")
+            fig.update_layout(bargap=0)
             st.plotly_chart(fig)
 
             # 항목별 평균 기여도
-            avg_breakdown = df[["transportation", "energy_usage", "food_habits", "consumer_goods", "waste"]].mean()
+            avg_breakdown = stats.column_means()
             fig = px.pie(values=avg_breakdown.values, names=avg_breakdown.index, title="항목별 평균 기여도")
             st.plotly_chart(fig)
 
             # 상관관계 히트맵
-            corr_matrix = df[["footprint", "transportation", "energy_usage", "food_habits", "consumer_goods", "waste"]].corr()
+            corr_matrix = stats.correlation()
             fig = px.imshow(corr_matrix, title="항목간 상관관계")
             st.plotly_chart(fig)
         else:
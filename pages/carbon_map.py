@@ -1,131 +1,126 @@
 import streamlit as st
 import pandas as pd
-import geopandas as gpd
 import plotly.express as px
-import os
-import requests
-import json
-from utils.data_processor import analyze_emissions_trend
-
-# Groq API 설정
-MODEL = "llama-3.1-70b-versatile"
-URL = "https://api.groq.com/openai/v1/chat/completions"
-GROQ_API_KEY = st.secrets["GROQ_API_KEY"]
-
-@st.cache_data
+import plotly.graph_objects as go
+from utils.ai_jobs import show_ai_job, submit_ai_job
+from utils.ai_stats import show_ai_stats
+from utils.catalog import get_province_catalog
+from utils.data_processor import analyze_region_trend
+from utils.dataset import dataset_version, load_gyeonggi_emissions, load_national_emissions
+from utils.figure_cache import get_figure_cache
+from utils.geometry import join_layer_data, level_for_zoom, load_simplified_layer
+from utils.regions import get_region_registry
+from utils.rollup import get_rollup_cube
+from utils.suggestions import build_emissions_data, fallback_policy_suggestions, stream_policy_suggestions
+
+# 지도 초기 zoom. 경계 단순화 단계도 이 값으로 고릅니다.
+NATIONAL_MAP_ZOOM = 5.5
+GYEONGGI_MAP_ZOOM = 8
+
+# 경기도 광역 코드
+GYEONGGI_CODE = 41
+
+# 데이터 로더는 프로세스 공용 데이터셋의 읽기 전용 뷰를 돌려줍니다 (재실행마다 복사하지 않음).
 def load_national_data():
-    file_path = os.path.join(os.path.dirname(__file__), "..", "data", "carbon_emissions_by_region(2022).csv")
-    df = pd.read_csv(file_path)
-    df['순배출량'] = df['탄소배출량'] - df['탄소흡수량']
-    return df
+    return load_national_emissions()
 
-@st.cache_data
 def load_korea_shapefile():
-    file_path = os.path.join(os.path.dirname(__file__), "..", "data", "ctprvn.shp")
-    if not os.path.exists(file_path):
-        st.error(f"Shapefile이 존재하지 않습니다: {file_path}")
-        return None
-    gdf = gpd.read_file(file_path)
-    return gdf.to_crs(epsg=4326)
-
-@st.cache_data
-def load_gyeonggi_data():
-    file_path = os.path.join(os.path.dirname(__file__), "..", "data", "gyeonggi_carbon_data_2022.csv")
-    try:
-        df = pd.read_csv(file_path, encoding='utf-8')
-    except UnicodeDecodeError:
-        df = pd.read_csv(file_path, encoding='cp949')
-    
-    numeric_columns = ['배출_건물_전기', '배출_건물_지역난방', '배출_건물_가스', '탄소배출_수송', '탄소흡수_산림']
-    
-    for col in numeric_columns:
-        df[col] = pd.to_numeric(df[col].replace(',', '', regex=True), errors='coerce')
-    
-    df['총배출량'] = df[numeric_columns[:4]].sum(axis=1)
-    df['순배출량'] = df['총배출량'] - df['탄소흡수_산림']
-    
-    if '연도' not in df.columns:
-        df['연도'] = 2022
-    
-    return df
+    return load_simplified_layer('ctprvn', level_for_zoom(NATIONAL_MAP_ZOOM))
 
-@st.cache_data
-def load_gyeonggi_geojson():
-    file_path = os.path.join(os.path.dirname(__file__), "..", "data", "LARD_ADM_SECT_SGG_41_202405.shp")
-    gdf = gpd.read_file(file_path)
-    return gdf.to_crs(epsg=4326)
-
-def clean_region_name(name):
-    return name.replace('특별시', '').replace('광역시', '').replace('특별자치시', '').replace('도', '').strip()
-
-def preprocess_name(name):
-    return name.replace('경기도 ', '').replace(' ', '')
+def load_gyeonggi_data():
+    return load_gyeonggi_emissions()
+
+
+@st.cache_resource
+def build_national_map_data():
+    # 경계 feature와 광역 데이터를 지역코드로 프로세스당 한 번만 조인
+    layer = load_korea_shapefile()
+    return layer, join_layer_data(layer, load_national_data(), how='left')
+
+def build_gyeonggi_map_data():
+    # 광역 카탈로그가 경계를 처음 열 때 읽고 조인 결과를 LRU로 보관합니다.
+    entry = get_province_catalog().get(GYEONGGI_CODE, level_for_zoom(GYEONGGI_MAP_ZOOM))
+    return entry.layer, entry.data
+
+def plot_national_map(layer, merged_data):
+    fig = px.choropleth_mapbox(merged_data,
+                               geojson=layer.geojson,
+                               locations="_feature_id",
+                               color="순배출량",
+                               color_continuous_scale="RdYlGn_r",
+                               mapbox_style="carto-positron",
+                               zoom=NATIONAL_MAP_ZOOM,
+                               center={"lat": 35.9, "lon": 127.8},
+                               opacity=0.7,
+                               labels={"순배출량": "순 탄소 배출량 (톤CO2eq)"},
+                               hover_name="시도별",
+                               hover_data=["탄소배출량", "탄소흡수량", "순배출량"])
+    fig.update_layout(margin={"r": 0, "t": 0, "l": 0, "b": 0}, height=600)
+    return fig
+
+def plot_national_bar(df):
+    df_sorted = df.sort_values(by="순배출량", ascending=False)
+    fig = px.bar(df_sorted, 
+                 x="시도별", 
+                 y=["탄소배출량", "탄소흡수량", "순배출량"],
+                 title="광역단위별 탄소 배출, 흡수 및 순배출량",
+                 labels={"value": "톤CO2eq", "variable": "구분"},
+                 height=500,
+                 color_discrete_map={"탄소배출량": "red", "탄소흡수량": "green", "순배출량": "blue"})
+    fig.update_layout(legend_title_text="구분")
+    return fig
+
+def plot_gyeonggi_map(layer, merged_data):
+    # 자기 값이 없고 상위 시 합계만 있는 구(예: 부천시의 구)는 합계를 나눠 칠하지 않고 '자료 없음'으로 표시합니다.
+    no_data = merged_data['_parent_only'].notna()
+    fig = px.choropleth_mapbox(merged_data[~no_data], 
+                               geojson=layer.geojson,
+                               locations='_feature_id',
+                               color='순배출량',
+                               color_continuous_scale="Viridis",
+                               mapbox_style="carto-positron",
+                               zoom=GYEONGGI_MAP_ZOOM, 
+                               center = {"lat": 37.41, "lon": 127.52},
+                               opacity=0.5,
+                               labels={'순배출량':'순 탄소 배출량'},
+                               hover_name='SGG_NM'
+                              )
+    if no_data.any():
+        registry = get_region_registry()
+        parents = merged_data.loc[no_data, '_parent_only'].map(registry.name_for)
+        fig.add_trace(go.Choroplethmapbox(
+            geojson=layer.geojson, locations=merged_data.loc[no_data, '_feature_id'], z=[0] * int(no_data.sum()),
+            colorscale=[[0, 'lightgray'], [1, 'lightgray']], showscale=False, marker_opacity=0.5,
+            name=f"자료 없음 ({', '.join(parents.unique())} 전체 값만 있음)", showlegend=True,
+            hovertext=merged_data.loc[no_data, 'SGG_NM'] + " (자료 없음: " + parents + " 전체 값만 있음)",
+            hoverinfo='text'))
+        fig.update_layout(legend={"yanchor": "top", "y": 0.99, "xanchor": "left", "x": 0.01})
+    fig.update_layout(margin={"r":0,"t":0,"l":0,"b":0})
+    return fig
 
 def get_ai_policy_suggestions(region, emissions_data):
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
-    prompt = f"""
-    지역: {region}
-    총 탄소 배출량: {emissions_data['total_emissions']}
-    배출 트렌드: {emissions_data['trend']}
-    부문별 배출 비중: {emissions_data['sector_breakdown']}
-
-    위 정보를 바탕으로 {region}의 탄소 배출량을 줄이기 위한 구체적인 정책을 5개 제안해주세요. 
-    각 정책은 지역 특성을 고려하고, 실행 가능해야 합니다. 
-    천천히 답변해도 좋으니 모든 답변 내용을 리뷰해서 100퍼센트 한글로만 답변해 주세요. 특히 한자와 일본어는 반드시 한글로 번역해서 답변해줘.
-    """
-
-    data = {
-        "model": MODEL,
-        "messages": [{"role": "user", "content": prompt}]
-    }
-
-    response = requests.post(URL, headers=headers, data=json.dumps(data))
-    if response.status_code == 200:
-        return response.json()['choices'][0]['message']['content']
-    else:
-        return "API 요청 중 오류가 발생했습니다."
+    # 일괄 생성(python -m utils.suggestions)으로 저장된 제안이 있으면 바로 보여주고, 없을 때만 LLM을 호출합니다.
+    # 실패하면 LLMError (결과 칸이 로컬 템플릿 제안으로 대신합니다).
+    yield from stream_policy_suggestions(region, emissions_data)
 
 def show_national_map():
     st.title("대한민국 광역단위별 탄소 배출 현황 (2022년)")
 
     df = load_national_data()
-    gdf = load_korea_shapefile()
-
-    if gdf is not None and not gdf.empty:
-        df['시도별'] = df['시도별'].apply(clean_region_name)
-        gdf['CTP_KOR_NM'] = gdf['CTP_KOR_NM'].apply(clean_region_name)
-
-        merged_data = gdf.merge(df, left_on="CTP_KOR_NM", right_on="시도별", how='left')
-
-        fig = px.choropleth_mapbox(merged_data,
-                                   geojson=merged_data.geometry,
-                                   locations=merged_data.index,
-                                   color="순배출량",
-                                   color_continuous_scale="RdYlGn_r",
-                                   mapbox_style="carto-positron",
-                                   zoom=5.5,
-                                   center={"lat": 35.9, "lon": 127.8},
-                                   opacity=0.7,
-                                   labels={"순배출량": "순 탄소 배출량 (톤CO2eq)"},
-                                   hover_name="시도별",
-                                   hover_data=["탄소배출량", "탄소흡수량", "순배출량"])
-
-        fig.update_layout(margin={"r": 0, "t": 0, "l": 0, "b": 0}, height=600)
+    try:
+        layer, merged_data = build_national_map_data()
+    except FileNotFoundError as e:
+        st.error(str(e))
+        layer = None
+
+    if layer is not None and not merged_data.empty:
+        figure_cache = get_figure_cache()
+        fig = figure_cache.get_or_build("carbon_map.national", lambda: plot_national_map(layer, merged_data),
+                                        dataset_version=dataset_version(), layer=layer.fingerprint)
         st.plotly_chart(fig, use_container_width=True)
 
-        df_sorted = df.sort_values(by="순배출량", ascending=False)
-        fig_bar = px.bar(df_sorted, 
-                         x="시도별", 
-                         y=["탄소배출량", "탄소흡수량", "순배출량"],
-                         title="광역단위별 탄소 배출, 흡수 및 순배출량",
-                         labels={"value": "톤CO2eq", "variable": "구분"},
-                         height=500,
-                         color_discrete_map={"탄소배출량": "red", "탄소흡수량": "green", "순배출량": "blue"})
-        fig_bar.update_layout(legend_title_text="구분")
+        fig_bar = figure_cache.get_or_build("carbon_map.national_bar", lambda: plot_national_bar(df),
+                                            dataset_version=dataset_version())
         st.plotly_chart(fig_bar, use_container_width=True)
 
         st.subheader("광역단위별 탄소 배출 데이터")
@@ -137,34 +132,24 @@ def show_gyeonggi_map():
     st.title("경기도 지자체별 카본 지도 및 정책 제안 (2022년)")
 
     df = load_gyeonggi_data()
-    gdf = load_gyeonggi_geojson()
+    layer, merged_data = build_gyeonggi_map_data()
 
-    gdf['처리된_지자체명'] = gdf['SGG_NM'].apply(preprocess_name)
-    df['처리된_지자체명'] = df['지자체명'].apply(preprocess_name)
-
-    merged_data = gdf.merge(df, on='처리된_지자체명', how='inner')
+    figure_cache = get_figure_cache()
 
     st.subheader("경기도 지자체별 순 탄소 배출량 지도")
     
-    fig = px.choropleth_mapbox(merged_data, 
-                               geojson=merged_data.geometry,
-                               locations=merged_data.index,
-                               color='순배출량',
-                               color_continuous_scale="Viridis",
-                               mapbox_style="carto-positron",
-                               zoom=8, 
-                               center = {"lat": 37.41, "lon": 127.52},
-                               opacity=0.5,
-                               labels={'순배출량':'순 탄소 배출량'},
-                               hover_name='SGG_NM'
-                              )
-    fig.update_layout(margin={"r":0,"t":0,"l":0,"b":0})
+    fig = figure_cache.get_or_build("carbon_map.gyeonggi", lambda: plot_gyeonggi_map(layer, merged_data),
+                                    dataset_version=dataset_version(), layer=layer.fingerprint)
     st.plotly_chart(fig)
 
     selected_municipality = st.selectbox("지자체를 선택하세요", df['지자체명'])
     if selected_municipality:
         st.subheader(f"{selected_municipality} 상세 정보")
-        municipality_data = df[df['지자체명'] == selected_municipality].iloc[0]
+        # 선택한 지자체와 상위 행정구역 값은 사전 집계 큐브에서 바로 조회
+        cube = get_rollup_cube()
+        year = cube.latest_year()
+        region_code = get_region_registry().code_for(selected_municipality)
+        municipality_data = cube.cell(region_code, year)
         
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -174,35 +159,44 @@ def show_gyeonggi_map():
         with col3:
             st.metric("순 배출량", f"{municipality_data['순배출량']:,.0f} tCO2eq")
 
+        parent_code, parent_data = cube.rollup(region_code, year)
+        if parent_data is not None:
+            share = municipality_data['총배출량'] / parent_data['총배출량'] * 100
+            st.caption(f"{get_region_registry().name_for(parent_code)} 전체 총 배출량 "
+                       f"{parent_data['총배출량']:,.0f} tCO2eq 중 {share:.1f}%")
+
         st.subheader("배출원별 비교")
         emission_sources = ['배출_건물_전기', '배출_건물_지역난방', '배출_건물_가스', '탄소배출_수송']
-        fig_sources = px.pie(values=municipality_data[emission_sources], names=emission_sources, title="배출원별 비중")
+        fig_sources = figure_cache.get_or_build(
+            "carbon_map.sources",
+            lambda: px.pie(values=municipality_data[emission_sources], names=emission_sources, title="배출원별 비중"),
+            dataset_version=dataset_version(), municipality=selected_municipality)
         st.plotly_chart(fig_sources)
 
         st.subheader("📈 배출 트렌드 분석")
-        trend_analysis = analyze_emissions_trend(df[df['지자체명'] == selected_municipality])
+        trend_analysis = analyze_region_trend(region_code)
         st.write(trend_analysis)
 
         if st.button("🤖 AI 정책 제안 생성"):
-            with st.spinner("AI가 정책을 생성 중입니다..."):
-                emissions_data = {
-                    'total_emissions': municipality_data['총배출량'],
-                    'trend': trend_analysis,
-                    'sector_breakdown': municipality_data[emission_sources].to_dict()
-                }
-                policy_suggestions = get_ai_policy_suggestions(selected_municipality, emissions_data)
-            
-            st.subheader("💡 AI 기반 정책 제안")
-            st.write(policy_suggestions)
+            emissions_data = build_emissions_data(municipality_data, trend_analysis)
+            submit_ai_job("carbon_map.policy", lambda: get_ai_policy_suggestions(selected_municipality, emissions_data),
+                          signature=selected_municipality,
+                          fallback=lambda: fallback_policy_suggestions(selected_municipality, emissions_data))
+        # 생성이 끝날 때까지 이 칸만 주기적으로 다시 그리며, 같은 지자체를 보는 동안 결과를 유지합니다.
+        show_ai_job("carbon_map.policy", signature=selected_municipality, title="💡 AI 기반 정책 제안",
+                    waiting_text="AI가 정책을 생성 중입니다...", error_text="API 요청 중 오류가 발생했습니다.")
 
         st.subheader("🔬 정책 효과 시뮬레이션")
         reduction_percentage = st.slider("예상 감축률 (%)", 0, 100, 10)
         current_emissions = municipality_data['총배출량']
         simulated_emissions = current_emissions * (1 - reduction_percentage / 100)
 
-        fig_simulation = px.bar(x=['현재 배출량', '정책 적용 후 예상 배출량'], 
-                                y=[current_emissions, simulated_emissions],
-                                title="정책 적용 효과 시뮬레이션")
+        fig_simulation = figure_cache.get_or_build(
+            "carbon_map.simulation",
+            lambda: px.bar(x=['현재 배출량', '정책 적용 후 예상 배출량'], 
+                           y=[current_emissions, simulated_emissions],
+                           title="정책 적용 효과 시뮬레이션"),
+            dataset_version=dataset_version(), municipality=selected_municipality, reduction=reduction_percentage)
         st.plotly_chart(fig_simulation)
 
         st.write(f"현재 배출량 {current_emissions:,.0f} tCO2eq에서 {simulated_emissions:,.0f} tCO2eq로")
@@ -211,6 +205,7 @@ def show_gyeonggi_map():
 def main():
     st.sidebar.title("탄소 배출 현황 대시보드")
     tab_selection = st.sidebar.radio("보기 선택", ["전국", "지자체 상세"])
+    show_ai_stats()
 
     if tab_selection == "전국":
         show_national_map()
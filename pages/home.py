@@ -2,17 +2,19 @@ import streamlit as st
 import pandas as pd
 import os
 import sys
-import urllib.request
 import urllib.parse
-import json
 import re
 from dotenv import load_dotenv
 from utils.data_processor import get_latest_national_data
 from utils.ai_helper import get_daily_eco_tip
+from utils.cassette import cassette_mode, get_cassette_session
 
 # 환경 변수 로드
 load_dotenv()
 
+# 뉴스 API 제한 시간 (연결, 읽기 초)
+NEWS_TIMEOUT = (3.05, 10)
+
 def remove_html_tags(text):
     """HTML 태그를 제거하는 함수"""
     clean = re.compile('<.*?>')
@@ -23,22 +25,23 @@ def get_naver_news(query):
     client_id = os.getenv("NAVER_CLIENT_ID")
     client_secret = os.getenv("NAVER_CLIENT_SECRET")
     
-    if not client_id or not client_secret:
+    # 재생 모드(CASSETTE_MODE=replay)는 녹화된 응답을 쓰므로 키가 없어도 됩니다.
+    if (not client_id or not client_secret) and cassette_mode() != 'replay':
         raise ValueError("Naver API 키가 설정되지 않았습니다.")
 
     encText = urllib.parse.quote(query)
     url = f"https://openapi.naver.com/v1/search/news.json?query={encText}&display=5&start=1&sort=date"
 
-    request = urllib.request.Request(url)
-    request.add_header("X-Naver-Client-Id", client_id)
-    request.add_header("X-Naver-Client-Secret", client_secret)
+    headers = {
+        "X-Naver-Client-Id": client_id,
+        "X-Naver-Client-Secret": client_secret,
+    }
     
     try:
-        response = urllib.request.urlopen(request)
-        rescode = response.getcode()
+        response = get_cassette_session("naver").get(url, headers=headers, timeout=NEWS_TIMEOUT)
+        rescode = response.status_code
         if rescode == 200:
-            response_body = response.read()
-            return json.loads(response_body.decode('utf-8'))
+            return response.json()
         else:
             raise Exception(f"Error Code: {rescode}")
     except Exception as e:
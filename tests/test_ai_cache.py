@@ -0,0 +1,41 @@
+import os
+
+from utils.ai_cache import AIResponseCache, make_key
+
+
+def test_memory_tier_evicts_least_recently_used(tmp_path):
+    cache = AIResponseCache(path=os.path.join(tmp_path, "cache.sqlite"), memory_entries=2)
+    cache.put("a", "model", "A")
+    cache.put("b", "model", "B")
+    assert cache.get("a") == "A"        # a가 최근 사용
+    cache.put("c", "model", "C")        # b가 밀려남
+    assert list(cache._memory) == ["a", "c"]
+    # 디스크 계층에는 남아 있으므로 다시 읽으면 디스크 적중입니다.
+    assert cache.get("b") == "B"
+    assert cache.stats()['disk_hits'] == 1
+
+
+def test_disk_tier_evicts_oldest_access_first(tmp_path, monkeypatch):
+    clock = iter(range(1_000, 2_000))
+    monkeypatch.setattr("utils.ai_cache.time.time", lambda: next(clock))
+    cache = AIResponseCache(path=os.path.join(tmp_path, "cache.sqlite"), memory_entries=0, disk_max_bytes=30)
+    for key in "abc":
+        cache.put(key, "model", key * 10)
+    assert cache.get("a") == "a" * 10   # a의 접근 시각 갱신 -> b가 가장 오래됨
+    cache.put("d", "model", "d" * 10)
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["a" * 10, "c" * 10, "d" * 10]
+
+
+def test_expired_entries_are_misses(tmp_path, monkeypatch):
+    now = [1_000.0]
+    monkeypatch.setattr("utils.ai_cache.time.time", lambda: now[0])
+    cache = AIResponseCache(path=os.path.join(tmp_path, "cache.sqlite"), ttl=60)
+    cache.put("a", "model", "A")
+    now[0] += 61
+    assert cache.get("a") is None
+
+
+def test_key_ignores_prompt_indentation():
+    assert make_key("m", "  지역: 수원\n    배출량: 1 ") == make_key("m", "지역: 수원\n배출량:  1")
+    assert make_key("m", "prompt", "v1") != make_key("m", "prompt", "v2")
@@ -0,0 +1,47 @@
+import numpy as np
+
+from utils.quantile_sketch import NATIONAL, KLLSketch, PercentileSketches
+
+# k=200 KLL 스케치의 순위 오차 허용치 (이론상 오차는 1% 안팎)
+RANK_TOLERANCE = 0.02
+
+
+def _max_rank_error(sketch, values):
+    values = np.sort(values)
+    probes = np.quantile(values, np.linspace(0.01, 0.99, 99))
+    exact = np.searchsorted(values, probes, side='right') / len(values)
+    return max(abs(sketch.rank(probe) - true) for probe, true in zip(probes, exact))
+
+
+def test_rank_error_within_bound():
+    values = np.random.default_rng(0).lognormal(1.5, 0.5, 100_000)
+    sketch = KLLSketch()
+    for value in values:
+        sketch.update(value)
+    assert sketch.n == len(values)
+    assert sketch._size() < 2_000
+    assert _max_rank_error(sketch, values) < RANK_TOLERANCE
+
+
+def test_merged_shards_keep_error_bound():
+    values = np.random.default_rng(1).normal(5, 2, 60_000)
+    merged = KLLSketch()
+    for shard in np.array_split(values, 6):
+        sketch = KLLSketch()
+        for value in shard:
+            sketch.update(value)
+        merged.merge(KLLSketch.from_dict(sketch.to_dict()))
+    assert merged.n == len(values)
+    assert _max_rank_error(merged, values) < RANK_TOLERANCE
+    assert abs(merged.quantile(0.5) - np.median(values)) < 0.1
+
+
+def test_workers_use_separate_slots_and_merge(tmp_path):
+    first = PercentileSketches(root=str(tmp_path), flush_interval=0)
+    second = PercentileSketches(root=str(tmp_path), flush_interval=0)
+    assert first.worker_path != second.worker_path
+    for value in range(10):
+        first.record(None, value)
+        second.record(None, value + 10)
+    assert first.sketch(NATIONAL).n == 20
+    assert first.percentile(9.5)[0] == 50
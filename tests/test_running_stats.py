@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from utils.running_stats import STATS_COLUMNS, RunningStats
+
+
+def _values(n, seed):
+    return np.random.default_rng(seed).normal(5, 3, size=(n, len(STATS_COLUMNS)))
+
+
+def _assert_matches(stats, values):
+    assert stats.count == len(values)
+    np.testing.assert_allclose(stats.mean, values.mean(axis=0))
+    np.testing.assert_allclose(stats.variance(), values.var(axis=0, ddof=1))
+    np.testing.assert_allclose(stats.minimum, values.min(axis=0))
+    np.testing.assert_allclose(stats.maximum, values.max(axis=0))
+    np.testing.assert_allclose(stats.correlation().to_numpy(), np.corrcoef(values.T), atol=1e-12)
+    expected, _ = np.histogram(np.clip(values[:, 0], stats.edges[0], stats.edges[-1]), bins=stats.edges)
+    np.testing.assert_array_equal(stats.histogram, expected)
+
+
+def test_update_matches_numpy():
+    values = _values(500, 0)
+    stats = RunningStats()
+    for row in values:
+        stats.update(row)
+    _assert_matches(stats, values)
+
+
+def test_merge_matches_numpy():
+    values = _values(1000, 1)
+    merged = RunningStats()
+    for part in np.array_split(values, [1, 200, 201, 700]):
+        merged.merge(RunningStats.from_frame(pd.DataFrame(part, columns=STATS_COLUMNS)))
+    _assert_matches(merged, values)
+
+
+def test_dict_round_trip():
+    stats = RunningStats.from_frame(pd.DataFrame(_values(50, 2), columns=STATS_COLUMNS))
+    restored = RunningStats.from_dict(stats.to_dict())
+    assert restored.count == stats.count
+    np.testing.assert_array_equal(restored.comoment, stats.comoment)
+    np.testing.assert_array_equal(restored.histogram, stats.histogram)
@@ -0,0 +1,73 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.single_flight import SingleFlight
+
+CALLERS = 16
+
+
+def _run_concurrently(flight, call):
+    barrier = threading.Barrier(CALLERS)
+
+    def caller():
+        barrier.wait()
+        return flight.do("key", call)
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as pool:
+        return [pool.submit(caller) for _ in range(CALLERS)]
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    def call():
+        calls.append(1)
+        time.sleep(0.2)
+        return "answer"
+
+    results = [future.result() for future in _run_concurrently(flight, call)]
+    assert len(calls) == 1
+    assert results == ["answer"] * CALLERS
+    assert flight.stats()['flights'] == 1
+    assert flight.stats()['coalesced'] == CALLERS - 1
+
+
+def test_error_reaches_every_caller_and_is_not_kept():
+    flight = SingleFlight()
+    calls = []
+
+    def call():
+        calls.append(1)
+        time.sleep(0.2)
+        raise RuntimeError("upstream failed")
+
+    for future in _run_concurrently(flight, call):
+        with pytest.raises(RuntimeError, match="upstream failed"):
+            future.result()
+    assert len(calls) == 1
+    # 실패한 요청은 남지 않으므로 다음 호출은 새로 실행됩니다.
+    assert flight.do("key", lambda: "retry") == "retry"
+
+
+def test_stream_delivers_parts_to_late_joiner():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def factory():
+        yield "a"
+        started.set()
+        release.wait()
+        yield "b"
+
+    first = flight.stream("key", factory)
+    assert next(first) == "a"
+    started.wait()
+    second = flight.stream("key", factory)
+    release.set()
+    assert list(first) == ["b"]
+    assert list(second) == ["a", "b"]
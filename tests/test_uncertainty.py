@@ -0,0 +1,21 @@
+import numpy as np
+
+from utils.footprint import TOTAL_COLUMN, calculate_footprint
+from utils.uncertainty import simulate_footprint
+
+INPUTS = [100, 300, 7, 10, 5]
+
+
+def test_interval_brackets_the_point_estimate():
+    footprint, _ = calculate_footprint(*INPUTS)
+    interval = simulate_footprint(INPUTS, draws=50_000)
+    total = interval.loc[TOTAL_COLUMN]
+    assert total['하한'] < footprint < total['상한']
+    # 로그정규 계수는 평균을 보존하고, 입력 오차는 0에서만 잘리므로 평균은 점추정과 거의 같습니다.
+    assert np.isclose(total['평균'], footprint, rtol=0.02)
+
+
+def test_total_is_sum_of_categories_and_zero_inputs_stay_zero():
+    interval = simulate_footprint(INPUTS, draws=10_000)
+    assert np.isclose(interval['평균'].iloc[:-1].sum(), interval.at[TOTAL_COLUMN, '평균'])
+    assert (simulate_footprint([0, 0, 0, 0, 0], draws=1_000).to_numpy() == 0).all()
@@ -0,0 +1,237 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from utils.dataset import CACHE_DIR
+from utils.llm_client import get_llm_client
+from utils.single_flight import get_single_flight
+
+logger = logging.getLogger(__name__)
+
+AI_CACHE_PATH = os.path.join(CACHE_DIR, "ai_responses.sqlite")
+
+# 응답 유효 기간 (초). 원본 데이터가 바뀌면 데이터셋 지문이 달라져 기간과 무관하게 새로 받습니다.
+TTL = 7 * 24 * 3600
+
+# 메모리 계층 항목 수, 디스크 계층 응답 총 바이트 상한
+MEMORY_ENTRIES = 256
+DISK_MAX_BYTES = 64 * 1024 * 1024
+
+
+def normalize_prompt(prompt):
+    """
+    줄마다 앞뒤 공백을 지우고 연속 공백을 하나로 줄입니다 (코드 들여쓰기 차이로 키가 달라지지 않도록).
+    """
+    lines = (re.sub(r'\s+', ' ', line).strip() for line in prompt.strip().splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def make_key(model, prompt, dataset_version=None, **options):
+    parts = [model, normalize_prompt(prompt), dataset_version or '']
+    parts += [f"{name}={options[name]}" for name in sorted(options)]
+    return hashlib.sha256("\x1f".join(map(str, parts)).encode('utf-8')).hexdigest()
+
+
+class AIResponseCache:
+    """
+    LLM 응답 2단 캐시: 프로세스 내 LRU + 디스크 SQLite (워커 프로세스와 재시작 간 공유).
+    키는 (모델, 정규화한 프롬프트, 데이터셋 지문, 생성 옵션)이며, 유효 기간이 지난 항목은 무시하고
+    디스크 용량을 넘으면 가장 오래 쓰이지 않은 응답부터 지웁니다. 실패한 호출은 저장하지 않습니다.
+    """
+
+    def __init__(self, path=AI_CACHE_PATH, ttl=TTL, memory_entries=MEMORY_ENTRIES, disk_max_bytes=DISK_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.disk_max_bytes = disk_max_bytes
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()   # 키 -> (저장 시각, 응답)
+        self._db = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _connect(self):
+        # 잠금을 잡은 상태에서 호출됩니다. 디스크를 쓸 수 없으면 메모리 계층만 사용합니다.
+        if self._db is None:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                db = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("""
+                    CREATE TABLE IF NOT EXISTS responses (
+                        key TEXT PRIMARY KEY,
+                        model TEXT NOT NULL,
+                        response TEXT NOT NULL,
+                        size INTEGER NOT NULL,
+                        created REAL NOT NULL,
+                        accessed REAL NOT NULL
+                    )""")
+                db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+                self._db = db
+            except sqlite3.Error as e:
+                logger.warning(f"AI 응답 캐시 파일을 열지 못했습니다. 메모리 캐시만 사용합니다 ({self.path}): {e}")
+                self._db = False
+        return self._db or None
+
+    def _remember(self, key, created, response):
+        self._memory[key] = (created, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[1]
+            self._memory.pop(key, None)
+
+            db = self._connect()
+            if db is not None:
+                try:
+                    row = db.execute("SELECT response, created FROM responses WHERE key = ? AND created > ?",
+                                     (key, now - self.ttl)).fetchone()
+                    if row is not None:
+                        db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+                        self._remember(key, row[1], row[0])
+                        self.disk_hits += 1
+                        return row[0]
+                except sqlite3.Error as e:
+                    logger.warning(f"AI 응답 캐시를 읽지 못했습니다: {e}")
+            self.misses += 1
+        return None
+
+    def put(self, key, model, response):
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, response)
+            db = self._connect()
+            if db is None:
+                return
+            try:
+                db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                           (key, model, response, len(response.encode('utf-8')), now, now))
+                self._evict(db, now)
+            except sqlite3.Error as e:
+                logger.warning(f"AI 응답 캐시에 저장하지 못했습니다: {e}")
+
+    def _evict(self, db, now):
+        db.execute("DELETE FROM responses WHERE created <= ?", (now - self.ttl,))
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.disk_max_bytes:
+            return
+        freed = 0
+        stale = []
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            if total - freed <= self.disk_max_bytes:
+                break
+            stale.append((key,))
+            freed += size
+        db.executemany("DELETE FROM responses WHERE key = ?", stale)
+
+    def get_or_call(self, prompt, call, model, dataset_version=None, **options):
+        """
+        캐시에 있으면 저장된 응답을, 없으면 call()의 결과를 저장한 뒤 반환합니다.
+        call()이 예외를 내면 그대로 전달하고 아무것도 저장하지 않습니다.
+        """
+        key = make_key(model, prompt, dataset_version, **options)
+        response = self.get(key)
+        if response is None:
+            response = call()
+            self.put(key, model, response)
+        return response
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            db = self._connect()
+            if db is not None:
+                db.execute("DELETE FROM responses")
+
+    def stats(self):
+        with self._lock:
+            db = self._connect()
+            disk_entries, disk_bytes = (0, 0)
+            if db is not None:
+                disk_entries, disk_bytes = db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            total = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'memory_entries': len(self._memory),
+                'disk_entries': disk_entries,
+                'disk_bytes': disk_bytes,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.memory_hits + self.disk_hits) / total if total else 0.0,
+            }
+
+
+@lru_cache(maxsize=None)
+def get_ai_cache():
+    """
+    프로세스 공용 AI 응답 캐시.
+    """
+    return AIResponseCache()
+
+
+def cached_chat(prompt, dataset_version=None, **options):
+    """
+    같은 모델/프롬프트/데이터셋 지문/옵션의 응답이 캐시에 있으면 LLM을 호출하지 않습니다.
+    캐시에 없으면 다른 세션이 같은 키로 이미 호출 중일 때 그 결과를 함께 받습니다.
+    실패하면 get_llm_client().chat()과 같이 LLMError를 냅니다.
+    """
+    client = get_llm_client()
+    cache = get_ai_cache()
+    key = make_key(client.model, prompt, dataset_version, **options)
+    response = cache.get(key)
+    if response is not None:
+        return response
+
+    def call():
+        response = client.chat(prompt, **options)
+        cache.put(key, client.model, response)
+        return response
+
+    return get_single_flight().do(key, call)
+
+
+def cached_chat_stream(prompt, dataset_version=None, **options):
+    """
+    cached_chat()의 스트리밍 버전. 캐시에 있으면 응답 전체를 한 조각으로, 없으면 LLM 응답을
+    도착하는 대로 내보내고 끝까지 받은 응답만 캐시에 저장합니다. 같은 키의 동시 호출은 한 번만 보냅니다.
+    """
+    key = make_key(get_llm_client().model, prompt, dataset_version, **options)
+    response = get_ai_cache().get(key)
+    if response is not None:
+        yield response
+        return
+    yield from stream_and_cache(key, prompt, **options)
+
+
+def stream_and_cache(key, prompt, **options):
+    """
+    캐시를 조회하지 않고 LLM 응답을 도착하는 대로 내보내며, 끝까지 받은 응답만 key로 캐시에 저장합니다.
+    캐시를 먼저 직접 확인한 호출자가 씁니다. 같은 키의 동시 호출은 한 번만 보냅니다.
+    """
+    client = get_llm_client()
+    cache = get_ai_cache()
+
+    def produce():
+        parts = []
+        for part in client.chat_stream(prompt, **options):
+            parts.append(part)
+            yield part
+        cache.put(key, client.model, "".join(parts))
+
+    yield from get_single_flight().stream(key, produce)
@@ -0,0 +1,225 @@
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import streamlit as st
+
+logger = logging.getLogger(__name__)
+
+# 동시에 실행하는 AI 작업 수 (LLM 연결 풀 크기보다 작게)
+JOB_WORKERS = 8
+
+# 이 시간(초) 동안 조회가 없던 세션의 작업 결과는 지웁니다.
+SESSION_TTL = 30 * 60
+
+# 작업이 끝날 때까지 결과 칸을 다시 그리는 주기 (초)
+POLL_INTERVAL = 0.5
+
+# 대체 결과가 있는 작업에서 LLM 첫 응답을 기다리는 시간 (초). 넘기면 대체 결과를 먼저 보여 줍니다.
+HEDGE_DEADLINE = 2.0
+
+# 첫 내용 표시 지연 분위수 계산에 쓰는 최근 작업 수
+LATENCY_WINDOW = 1000
+
+
+class AIJob:
+    """
+    백그라운드에서 실행되는 AI 호출 하나. 스트리밍 조각이 도착하는 대로 parts에 쌓입니다.
+    대체 결과(fallback)가 있으면 LLM 첫 조각이 deadline 안에 오지 않았을 때 그것을 먼저 보여 주고,
+    LLM 응답이 끝까지 도착하면 그 응답으로 바꿉니다.
+    """
+
+    def __init__(self, signature, fallback=None, deadline=HEDGE_DEADLINE):
+        self.signature = signature
+        self.fallback = fallback
+        self.deadline = deadline
+        self.parts = []
+        self.done = False
+        self.error = None
+        self.created = time.time()
+        self.started = time.monotonic()
+        self.first_part = None   # 첫 조각까지 걸린 시간 (초)
+
+    def text(self):
+        return "".join(self.parts)
+
+    def missed_deadline(self):
+        """
+        LLM 첫 조각이 기한 안에 오지 않았는지 (대체 결과를 보여 줘야 하는지).
+        """
+        return (time.monotonic() - self.started >= self.deadline
+                and (self.first_part is None or self.first_part > self.deadline))
+
+    def view(self):
+        """
+        지금 보여 줄 (텍스트, 상태). 상태는 done / fallback / streaming / error / waiting.
+        """
+        if self.done and self.error is None:
+            return self.text(), 'done'
+        if self.fallback is not None and (self.error is not None or self.missed_deadline()):
+            return self.fallback, 'fallback'
+        if self.error is not None:
+            return None, 'error'
+        if self.parts:
+            return self.text(), 'streaming'
+        return None, 'waiting'
+
+
+class AIJobExecutor:
+    """
+    세션별 AI 작업 실행기. 페이지는 작업을 제출만 하고 바로 나머지 화면을 그리며,
+    결과 칸은 (세션, 칸 이름)으로 작업을 찾아 진행 상황을 다시 그립니다.
+    같은 칸에 같은 입력(signature)으로 다시 제출하면 새로 호출하지 않고 기존 작업을 돌려줍니다.
+    """
+
+    def __init__(self, max_workers=JOB_WORKERS, session_ttl=SESSION_TTL):
+        self.session_ttl = session_ttl
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ai-job")
+        self._lock = threading.Lock()
+        self._sessions = {}   # 세션 -> {칸 이름: AIJob}
+        self._accessed = {}   # 세션 -> 마지막 조회 시각
+        self._first_content = deque(maxlen=LATENCY_WINDOW)
+        self.fallbacks = 0
+        self.swapped = 0
+
+    def submit(self, session, slot, factory, signature=None, fallback=None, deadline=HEDGE_DEADLINE):
+        """
+        factory()가 내보내는 텍스트 조각을 모으는 작업을 시작하고 AIJob을 반환합니다.
+        fallback은 LLM이 늦거나 실패할 때 대신 보여 줄 텍스트를 만드는 함수입니다 (로컬 템플릿 생성기 등).
+        """
+        with self._lock:
+            self._expire()
+            self._accessed[session] = time.time()
+            jobs = self._sessions.setdefault(session, {})
+            job = jobs.get(slot)
+            if job is not None and job.signature == signature and job.error is None:
+                return job
+            job = jobs[slot] = AIJob(signature, fallback() if fallback else None, deadline)
+        self._pool.submit(self._run, job, factory)
+        return job
+
+    def _run(self, job, factory):
+        try:
+            for part in factory():
+                with self._lock:
+                    if job.first_part is None:
+                        job.first_part = time.monotonic() - job.started
+                    job.parts.append(part)
+        except Exception as e:
+            logger.warning(f"AI 작업이 실패했습니다: {e}")
+            job.error = e
+        finally:
+            job.done = True
+            self._record(job)
+
+    def _record(self, job):
+        # 첫 내용이 보인 시점: LLM 첫 조각, 또는 기한을 넘겼고 대체 결과가 있으면 기한
+        first_part = job.first_part if job.first_part is not None else time.monotonic() - job.started
+        hedged = job.fallback is not None and first_part > job.deadline
+        with self._lock:
+            self._first_content.append(min(first_part, job.deadline) if hedged else first_part)
+            if hedged or (job.fallback is not None and job.error is not None):
+                self.fallbacks += 1
+                if job.error is None:
+                    self.swapped += 1
+
+    def job(self, session, slot):
+        with self._lock:
+            self._accessed[session] = time.time()
+            return self._sessions.get(session, {}).get(slot)
+
+    def _expire(self):
+        # 잠금을 잡은 상태에서 호출됩니다.
+        cutoff = time.time() - self.session_ttl
+        for session in [s for s, accessed in self._accessed.items() if accessed < cutoff]:
+            self._accessed.pop(session, None)
+            self._sessions.pop(session, None)
+
+    def stats(self):
+        with self._lock:
+            jobs = [job for slots in self._sessions.values() for job in slots.values()]
+            latencies = sorted(self._first_content)
+            stats = {
+                'sessions': len(self._sessions),
+                'jobs': len(jobs),
+                'running': sum(not job.done for job in jobs),
+                'failed': sum(job.error is not None for job in jobs),
+                'fallbacks': self.fallbacks,
+                'swapped': self.swapped,
+            }
+        for name, q in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+            stats[f'first_content_{name}'] = (latencies[min(int(q * len(latencies)), len(latencies) - 1)]
+                                              if latencies else None)
+        return stats
+
+
+@lru_cache(maxsize=None)
+def get_job_executor():
+    """
+    프로세스 공용 AI 작업 실행기.
+    """
+    return AIJobExecutor()
+
+
+def session_id():
+    """
+    현재 브라우저 세션의 작업 키 (로그인 여부와 무관하게 탭마다 다름).
+    """
+    if 'ai_job_session' not in st.session_state:
+        st.session_state.ai_job_session = uuid.uuid4().hex
+    return st.session_state.ai_job_session
+
+
+def submit_ai_job(slot, factory, signature=None, fallback=None, deadline=HEDGE_DEADLINE):
+    return get_job_executor().submit(session_id(), slot, factory, signature, fallback, deadline)
+
+
+def show_ai_job(slot, signature=None, title=None, waiting_text="AI가 답변을 생성하고 있습니다...",
+                error_text="AI 응답을 가져오는 중 오류가 발생했습니다. 나중에 다시 시도해주세요."):
+    """
+    칸의 작업 결과를 (title이 있으면 제목과 함께) 그립니다. 진행 중이면 그때까지 받은 내용을 보여 주며 POLL_INTERVAL마다
+    이 칸만 다시 그리므로(st.fragment) 페이지의 나머지는 LLM 응답을 기다리지 않습니다.
+    칸에 작업이 없거나 입력이 다르면 아무것도 그리지 않고 False를 반환합니다.
+    """
+    session = session_id()
+    executor = get_job_executor()
+    job = executor.job(session, slot)
+    if job is None or job.signature != signature:
+        return False
+    if title:
+        st.subheader(title)
+
+    # 이미 끝난 작업은 자동 새로 고침 없이 한 번만 그립니다.
+    polling = not job.done
+
+    @st.fragment(run_every=POLL_INTERVAL if polling else None)
+    def render():
+        current = executor.job(session, slot)
+        if current is None:
+            return
+        # run_every는 정의할 때 정해지므로, 주기적으로 다시 그리던 중 작업이 끝나면 페이지 전체를 한 번
+        # 다시 실행해 새로 고침 없이 정의되게 합니다 (끝난 작업은 다시 호출하지 않으므로 바로 끝납니다).
+        if polling and current.done:
+            st.rerun(scope="app")
+        text, state = current.view()
+        if state == 'done':
+            st.markdown(text)
+        elif state == 'fallback':
+            st.markdown(text)
+            if current.done:
+                st.caption("AI 응답을 받지 못해 기본 제안을 보여드립니다.")
+            else:
+                st.caption("AI 응답이 늦어 기본 제안을 먼저 보여드립니다. AI 답변이 도착하면 바꿔서 보여드립니다.")
+        elif state == 'streaming':
+            st.markdown(text + " ▌")
+        elif state == 'error':
+            st.error(error_text)
+        else:
+            st.caption(waiting_text)
+
+    render()
+    return True
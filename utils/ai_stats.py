@@ -0,0 +1,82 @@
+import json
+import logging
+import os
+import threading
+import time
+from functools import lru_cache
+
+import streamlit as st
+
+from utils.ai_cache import get_ai_cache
+from utils.ai_jobs import get_job_executor
+from utils.llm_client import get_llm_client
+from utils.semantic_cache import get_semantic_cache
+from utils.single_flight import get_single_flight
+from utils.suggestions import get_suggestion_store
+
+logger = logging.getLogger(__name__)
+
+# 통계를 로그로 남기는 주기 (초)
+STATS_LOG_INTERVAL = 5 * 60
+
+# 이 환경 변수가 1이면 사이드바에 통계를 보여 줍니다 (운영 환경에서는 꺼 둡니다).
+DEBUG_ENV = "AI_STATS_DEBUG"
+
+# (표시 이름, 프로세스 공용 객체를 돌려주는 함수)
+COMPONENTS = [
+    ("LLM 호출", get_llm_client),
+    ("AI 응답 캐시", get_ai_cache),
+    ("사전 생성 정책 제안", get_suggestion_store),
+    ("유사 요청 캐시", get_semantic_cache),
+    ("동시 요청 합치기", get_single_flight),
+    ("AI 작업", get_job_executor),
+]
+
+
+def collect_ai_stats():
+    """
+    이 프로세스에서 이미 만들어진 AI 구성 요소의 stats()를 모읍니다 ({표시 이름: 통계}).
+    아직 쓰이지 않은 구성 요소는 통계를 보려고 새로 만들지 않습니다 (API 키가 없는 환경 등).
+    """
+    stats = {}
+    for name, getter in COMPONENTS:
+        if getter.cache_info().currsize == 0:
+            continue
+        try:
+            stats[name] = getter().stats()
+        except Exception as e:
+            logger.warning(f"{name} 통계를 읽지 못했습니다: {e}")
+    return stats
+
+
+def _log_periodically(interval):
+    while True:
+        time.sleep(interval)
+        stats = collect_ai_stats()
+        if stats:
+            logger.info("AI 통계: " + json.dumps(stats, ensure_ascii=False, default=str))
+
+
+@lru_cache(maxsize=None)
+def start_stats_logger(interval=STATS_LOG_INTERVAL):
+    """
+    AI 통계를 interval초마다 로그로 남기는 백그라운드 스레드를 (프로세스당 한 번) 시작합니다.
+    """
+    threading.Thread(target=_log_periodically, args=(interval,), name="ai-stats", daemon=True).start()
+
+
+def show_ai_stats():
+    """
+    사이드바 디버그 영역에 캐시 적중률, 아낀 LLM 시간, 요청 합치기와 작업 통계를 보여 줍니다.
+    AI_STATS_DEBUG=1일 때만 그리며, 주기적인 통계 로그는 설정과 관계없이 남깁니다.
+    """
+    start_stats_logger()
+    if os.environ.get(DEBUG_ENV) != "1":
+        return
+    with st.sidebar.expander("🔧 AI 캐시/작업 통계"):
+        stats = collect_ai_stats()
+        if not stats:
+            st.caption("아직 AI 호출이 없습니다.")
+        for name, values in stats.items():
+            st.write(f"**{name}**")
+            st.json(values, expanded=False)
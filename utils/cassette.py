@@ -0,0 +1,233 @@
+import hashlib
+import io
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from utils.dataset import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# 녹화 파일 위치: data/cassettes/<서비스>/<요청 키>.json
+CASSETTE_DIR = os.path.join(DATA_DIR, "cassettes")
+
+# 모드: off(실제 호출), record(실제 호출 후 응답 저장), replay(저장된 응답만 사용, 네트워크 없음)
+MODES = ('off', 'record', 'replay')
+
+# 응답 헤더 중 녹화에 남기는 것
+KEPT_HEADERS = ('content-type',)
+
+
+def cassette_mode():
+    """
+    CASSETTE_MODE 환경 변수 (기본 off).
+    """
+    mode = os.environ.get("CASSETTE_MODE", "off").lower()
+    if mode not in MODES:
+        raise ValueError(f"CASSETTE_MODE는 {', '.join(MODES)} 중 하나여야 합니다: {mode}")
+    return mode
+
+
+def request_key(method, url, body):
+    """
+    요청 키: 메서드, 경로와 쿼리, 본문 (호스트와 인증 헤더는 제외).
+    호스트를 빼므로 로컬 스텁이나 프록시를 거쳐 녹화한 응답도 실제 주소로 재생됩니다.
+    JSON 본문은 키 순서와 공백에 영향받지 않도록 정규화합니다.
+    """
+    parts = urlsplit(url)
+    if isinstance(body, bytes):
+        body = body.decode('utf-8')
+    if body:
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+        except ValueError:
+            pass
+    text = "\n".join([method.upper(), parts.path + ("?" + parts.query if parts.query else ""), body or ""])
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class LatencyModel:
+    """
+    재생할 때 주입하는 응답 지연 (초).
+        none                  지연 없음
+        recorded              녹화 당시 지연 그대로
+        fixed:0.3             항상 0.3초
+        uniform:0.1,2         0.1~2초 균등 분포
+        lognormal:0.8,0.5     중앙값 0.8초, 로그 표준편차 0.5 (긴 꼬리)
+    seed를 주면 같은 순서의 요청에 같은 지연을 줍니다.
+    """
+
+    def __init__(self, spec='none', seed=None):
+        self.spec = spec
+        self.kind, _, params = spec.partition(':')
+        self.params = [float(p) for p in params.split(',')] if params else []
+        if self.kind not in ('none', 'recorded', 'fixed', 'uniform', 'lognormal'):
+            raise ValueError(f"알 수 없는 지연 분포입니다: {spec}")
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self, recorded=0.0):
+        if self.kind == 'none':
+            return 0.0
+        if self.kind == 'recorded':
+            return recorded
+        if self.kind == 'fixed':
+            return self.params[0]
+        with self._lock:
+            if self.kind == 'uniform':
+                return self._random.uniform(*self.params)
+            median, sigma = self.params
+            return self._random.lognormvariate(math.log(median), sigma)
+
+
+class CassetteAdapter(BaseAdapter):
+    """
+    requests 전송 계층을 대신하는 녹화/재생 어댑터.
+    record 모드에서는 실제 어댑터로 보낸 뒤 성공 응답(2xx)을 파일로 저장하고,
+    replay 모드에서는 네트워크 없이 저장된 응답을 주입한 지연 뒤에 돌려줍니다.
+    주입한 지연이 요청의 읽기 제한 시간보다 길면 실제와 같이 ReadTimeout을 냅니다.
+    녹화에 없는 요청은 404 응답 (X-Cassette: miss) 으로 돌려줍니다.
+    """
+
+    def __init__(self, service, mode, root=CASSETTE_DIR, latency=None, inner=None):
+        super().__init__()
+        self.service = service
+        self.mode = mode
+        self.directory = os.path.join(root, service)
+        self.latency = latency or LatencyModel()
+        self.inner = inner or HTTPAdapter()
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load(self, key):
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+        try:
+            with open(self._path(key), encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            entry = None
+        except (OSError, ValueError) as e:
+            logger.warning(f"녹화된 응답을 읽지 못했습니다 ({self._path(key)}): {e}")
+            entry = None
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def _save(self, key, entry):
+        path = self._path(key)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"응답을 녹화하지 못했습니다 ({path}): {e}")
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self.recorded += 1
+
+    @staticmethod
+    def _build(request, status, headers, body):
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        response.reason = "OK" if status < 400 else "Cassette Miss"
+        return response
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        key = request_key(request.method, request.url, request.body)
+        if self.mode == 'replay':
+            return self._replay(request, key, timeout)
+
+        start = time.monotonic()
+        response = self.inner.send(request, stream=True, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        first_byte = time.monotonic() - start
+        body = response.content
+        if 200 <= response.status_code < 300:
+            self._save(key, {
+                'request': {'method': request.method, 'url': request.url},
+                'status': response.status_code,
+                'headers': {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+                'body': body.decode('utf-8'),
+                'latency': first_byte,
+                'duration': time.monotonic() - start,
+            })
+        return self._build(request, response.status_code, dict(response.headers), body)
+
+    def _replay(self, request, key, timeout):
+        entry = self._load(key)
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            logger.warning(f"녹화에 없는 요청입니다 ({self.service} {request.method} {urlsplit(request.url).path})")
+            return self._build(request, 404, {'Content-Type': 'application/json', 'X-Cassette': 'miss'},
+                               b'{"error": {"message": "cassette miss"}}')
+        with self._lock:
+            self.hits += 1
+        delay = self.latency.sample(entry.get('latency', 0.0))
+        read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+        if read_timeout is not None and delay > read_timeout:
+            time.sleep(read_timeout)
+            raise requests.ReadTimeout(f"주입한 지연 {delay:.2f}초가 제한 시간 {read_timeout:.2f}초를 넘었습니다.")
+        if delay:
+            time.sleep(delay)
+        return self._build(request, entry['status'], entry['headers'], entry['body'].encode('utf-8'))
+
+    def close(self):
+        self.inner.close()
+
+    def stats(self):
+        with self._lock:
+            return {'mode': self.mode, 'hits': self.hits, 'misses': self.misses, 'recorded': self.recorded}
+
+
+def mount_cassette(session, service, inner=None, mode=None, root=None, latency=None):
+    """
+    세션에 녹화/재생 어댑터를 붙입니다. 모드가 off면 아무것도 하지 않고 None을 반환합니다.
+    설정은 인자가 없으면 CASSETTE_MODE, CASSETTE_DIR, CASSETTE_LATENCY, CASSETTE_SEED 환경 변수에서 읽습니다.
+    """
+    mode = mode or cassette_mode()
+    if mode == 'off':
+        return None
+    if latency is None:
+        seed = os.environ.get("CASSETTE_SEED")
+        latency = LatencyModel(os.environ.get("CASSETTE_LATENCY", "none"), int(seed) if seed else None)
+    adapter = CassetteAdapter(service, mode, root or os.environ.get("CASSETTE_DIR", CASSETTE_DIR), latency, inner)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return adapter
+
+
+@lru_cache(maxsize=None)
+def get_cassette_session(service):
+    """
+    서비스별 공용 HTTP 세션 (CASSETTE_MODE에 따라 녹화/재생 어댑터 사용).
+    """
+    session = requests.Session()
+    mount_cassette(session, service)
+    return session
@@ -0,0 +1,109 @@
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from utils.dataset import load_gyeonggi_emissions
+from utils.geometry import LAYERS, join_layer_data, read_simplified_layer, sigungu_layer_name
+
+logger = logging.getLogger(__name__)
+
+# 메모리에 동시에 보관하는 광역 수와 총 크기 상한 (경계 GeoJSON + 조인된 표)
+MAX_PROVINCES = 4
+MAX_BYTES = 64 * 1024 * 1024
+
+# 시군구 단위 배출량 자료가 있는 광역 (광역코드 -> 로더)
+PROVINCE_DATA_LOADERS = {
+    41: load_gyeonggi_emissions,
+}
+
+
+class ProvinceEntry:
+    """
+    한 광역의 시군구 경계 레이어와 배출량 자료를 조인한 결과.
+    """
+
+    def __init__(self, province_code, level, layer, data):
+        self.province_code = province_code
+        self.level = level
+        self.layer = layer
+        self.data = data
+        self.nbytes = layer.payload_bytes + int(data.memory_usage(deep=True).sum())
+
+
+class ProvinceCatalog:
+    """
+    광역별 시군구 경계/자료 카탈로그.
+    경계 파일은 사용자가 해당 광역을 열 때 처음 읽고, 최근 사용한 광역만
+    개수와 크기 상한 안에서 LRU로 보관합니다. 전국 배포에서도 메모리 사용량이 일정하게 유지됩니다.
+    """
+
+    def __init__(self, max_provinces=MAX_PROVINCES, max_bytes=MAX_BYTES):
+        self.max_provinces = max_provinces
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def provinces(self):
+        """
+        경계 파일이 있는 광역코드 목록 (파일은 읽지 않습니다).
+        """
+        return sorted(int(name[len('sgg_'):]) for name in LAYERS if name.startswith('sgg_'))
+
+    def get(self, province_code, level='province'):
+        province_code = int(province_code)
+        key = (province_code, level)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        name = sigungu_layer_name(province_code)
+        if name not in LAYERS:
+            raise KeyError(f"광역코드 {province_code}의 시군구 경계 파일이 없습니다.")
+
+        # 읽기와 조인은 잠금 밖에서 수행해 이미 적재된 다른 광역 조회를 막지 않습니다.
+        layer = read_simplified_layer(name, level)
+        loader = PROVINCE_DATA_LOADERS.get(province_code)
+        data = join_layer_data(layer, loader()) if loader else layer.attributes.copy()
+        entry = ProvinceEntry(province_code, level, layer, data)
+
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+            self._entries[key] = entry
+            self._bytes += entry.nbytes
+            self.loads += 1
+            self._evict()
+        logger.info(f"광역 {province_code} ({level}) 경계를 적재했습니다: {entry.nbytes / 1024:.0f} KB")
+        return entry
+
+    def _evict(self):
+        # 방금 적재한 항목 하나는 상한을 넘더라도 남겨 둡니다.
+        while len(self._entries) > 1 and (len(self._entries) > self.max_provinces or self._bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.nbytes
+            self.evictions += 1
+
+    def loaded(self):
+        return list(self._entries)
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'loads': self.loads,
+            'evictions': self.evictions,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_province_catalog():
+    """
+    프로세스 공용 광역 카탈로그.
+    """
+    return ProvinceCatalog()
@@ -1,52 +1,225 @@
+import bisect
+import glob
+import logging
+import os
+import re
+import sys
+import threading
+from functools import lru_cache
+
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.dataset import (DATA_DIR, DATA_YEAR, GYEONGGI_CSV, NATIONAL_CSV, PARSERS, load_gyeonggi_emissions,
+                           load_national_emissions, parsed_fingerprint)
+
+logger = logging.getLogger(__name__)
+
+STORE_DIR = os.path.join(DATA_DIR, "store")
+
+# 파티션 파일 메타데이터에 기록하는 원본 지문 키
+SOURCE_METADATA_KEY = b"source"
+
+# 기준 연도 발표본의 (원본 CSV, 로더). 원본 지문이 파티션과 다르면 다시 적재합니다.
+SEED_SOURCES = {
+    'gyeonggi': (GYEONGGI_CSV, load_gyeonggi_emissions),
+    'national': (NATIONAL_CSV, load_national_emissions),
+}
+
+# 데이터셋별 지역 총배출량 컬럼
+TOTAL_COLUMNS = {
+    'gyeonggi': '총배출량',
+    'national': '탄소배출량',
+}
+
+
+class EmissionsStore:
+    """
+    연도별로 분할 저장되는 추가 전용(append-only) 배출량 저장소.
+    data/store/<데이터셋>/year=<연도>.parquet 파일 하나가 한 해의 발표본이며,
+    새 연도를 적재하면 그 연도의 집계만 색인에 추가합니다.
+    파티션에는 원본 지문(source)을 기록해 두고, 원본이 고쳐지면 그 연도만 다시 적재합니다.
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._partitions = {}   # (dataset, year) -> DataFrame
+        self._years = {}        # dataset -> 정렬된 연도 목록
+        self._totals = {}       # (dataset, year) -> 전체 총배출량
+        self._series = {}       # (dataset, 지역코드) -> ([연도...], [총배출량...]) 연도 순
+        self._sources = {}      # (dataset, year) -> 원본 지문 (기록되지 않았으면 None)
+        for path in sorted(glob.glob(os.path.join(root, "*", "year=*.parquet"))):
+            dataset = os.path.basename(os.path.dirname(path))
+            year = int(re.search(r"year=(\d+)", path).group(1))
+            metadata = pq.read_schema(path).metadata or {}
+            source = metadata.get(SOURCE_METADATA_KEY)
+            self._index_partition(dataset, year, pd.read_parquet(path, memory_map=True),
+                                  source.decode() if source else None)
+
+    def _partition_path(self, dataset, year):
+        return os.path.join(self.root, dataset, f"year={year}.parquet")
+
+    def _index_partition(self, dataset, year, df, source=None):
+        total_column = TOTAL_COLUMNS[dataset]
+        self._partitions[(dataset, year)] = df
+        self._sources[(dataset, year)] = source
+        bisect.insort(self._years.setdefault(dataset, []), year)
+        self._totals[(dataset, year)] = float(df[total_column].sum())
+        for code, total in zip(df['지역코드'], df[total_column]):
+            if pd.isna(code):
+                continue
+            years, totals = self._series.setdefault((dataset, int(code)), ([], []))
+            position = bisect.bisect(years, year)
+            years.insert(position, year)
+            totals.insert(position, float(total))
+
+    def _drop_partition(self, dataset, year):
+        df = self._partitions.pop((dataset, year))
+        self._years[dataset].remove(year)
+        del self._totals[(dataset, year)]
+        del self._sources[(dataset, year)]
+        for code in df['지역코드'].dropna().unique():
+            years, totals = self._series[(dataset, int(code))]
+            position = years.index(year)
+            del years[position]
+            del totals[position]
+
+    def ingest(self, dataset, year, df, source=None):
+        """
+        한 해의 발표본을 적재합니다. 이미 적재된 연도는 덮어쓰지 않지만, source(원본 지문)를 주었고
+        기록된 지문과 다르면 원본이 고쳐진 것으로 보고 그 연도를 다시 적재합니다.
+        """
+        if dataset not in TOTAL_COLUMNS:
+            raise ValueError(f"알 수 없는 데이터셋입니다: {dataset}")
+        df = df.assign(연도=year)
+
+        with self._lock:
+            if (dataset, year) in self._partitions:
+                if source is None or self._sources[(dataset, year)] == source:
+                    raise ValueError(f"{dataset} {year}년 데이터는 이미 적재되어 있습니다.")
+                logger.info(f"{dataset} {year}년 원본이 바뀌어 파티션을 다시 적재합니다.")
+                self._drop_partition(dataset, year)
+            path = self._partition_path(dataset, year)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if source is not None:
+                    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                                           SOURCE_METADATA_KEY: source.encode()})
+                pq.write_table(table, tmp_path)
+                os.replace(tmp_path, path)
+            except (OSError, pa.ArrowException) as e:
+                logger.warning(f"{dataset} {year}년 파티션을 기록하지 못했습니다. 메모리에만 적재합니다: {e}")
+            self._index_partition(dataset, year, df, source)
+
+    def source(self, dataset, year):
+        """
+        적재된 연도 파티션의 원본 지문 (없거나 기록되지 않았으면 None).
+        """
+        return self._sources.get((dataset, year))
+
+    def years(self, dataset):
+        return list(self._years.get(dataset, []))
+
+    def latest_year(self, dataset):
+        years = self._years.get(dataset)
+        return years[-1] if years else None
+
+    def partition(self, dataset, year):
+        return self._partitions.get((dataset, year))
+
+    def total(self, dataset, year):
+        return self._totals.get((dataset, year))
+
+    def region_series(self, dataset, region_code, last=None):
+        """
+        지역의 (연도 목록, 총배출량 목록). last를 주면 최근 N개 연도만 반환합니다.
+        """
+        years, totals = self._series.get((dataset, int(region_code)), ([], []))
+        if last:
+            return years[-last:], totals[-last:]
+        return list(years), list(totals)
+
+
+@lru_cache(maxsize=None)
+def get_emissions_store():
+    """
+    프로세스 공용 저장소. data 폴더의 기준 연도 발표본으로 초기화하며,
+    원본 CSV(또는 행정구역 속성표)가 바뀌어 지문이 다르면 그 연도를 다시 적재합니다.
+    """
+    store = EmissionsStore()
+    for dataset, (path, loader) in SEED_SOURCES.items():
+        source = parsed_fingerprint(path)
+        if store.source(dataset, DATA_YEAR) != source:
+            store.ingest(dataset, DATA_YEAR, loader(), source=source)
+    return store
+
 
 # 데이터가 담긴 파일이나 데이터베이스에서 데이터를 읽어오는 함수
 def load_data():
-    # 여기서는 예시로 DataFrame을 직접 생성합니다.
-    # 실제 사용 시에는 데이터 파일을 읽거나 데이터베이스에서 쿼리하는 코드로 대체됩니다.
-    data = {
-        '연도': [2019, 2020, 2021, 2022, 2023],
-        '총탄소배출량': [50000, 52000, 53000, 55000, 57000]
-    }
-    df = pd.DataFrame(data)
+    store = get_emissions_store()
+    years = store.years('national')
+    df = pd.DataFrame({
+        '연도': years,
+        '총탄소배출량': [store.total('national', year) for year in years]
+    })
     return df
 
 def get_latest_national_data():
-    df = load_data()
-    
+    store = get_emissions_store()
+
     # 최신 데이터와 전년 대비 변화량 계산
-    latest_year = df['연도'].max()
-    latest_data = df[df['연도'] == latest_year]
-    
-    previous_year = latest_year - 1
-    previous_data = df[df['연도'] == previous_year]
-    
-    total_emissions = latest_data['총탄소배출량'].values[0]
-    
+    latest_year = store.latest_year('national')
+    total_emissions = store.total('national', latest_year)
+    previous_emissions = store.total('national', latest_year - 1)
+
     emissions_change = 0
-    if not previous_data.empty:
-        previous_emissions = previous_data['총탄소배출량'].values[0]
+    if previous_emissions:
         emissions_change = ((total_emissions - previous_emissions) / previous_emissions) * 100
-    
+
     return {
-        'total_emissions': total_emissions,
+        'total_emissions': round(total_emissions),
         'emissions_change': emissions_change
     }
 
+def _describe_trend(years, totals):
+    if len(totals) < 2:
+        return "트렌드 분석을 위한 충분한 연도 데이터가 없습니다."
+
+    trend = "증가" if totals[-1] > totals[0] else "감소"
+    percent_change = ((totals[-1] - totals[0]) / totals[0]) * 100
+
+    analysis = f"최근 {len(years)}년간 총 배출량은 {trend} 추세입니다. "
+    analysis += f"첫 해 대비 마지막 해의 배출량 변화율은 {percent_change:.2f}%입니다."
+
+    return analysis
+
 def analyze_emissions_trend(region_data):
     if '연도' not in region_data.columns or len(region_data) <= 1:
         return "트렌드 분석을 위한 충분한 데이터가 없습니다."
-    
+
     recent_years = region_data.sort_values('연도').tail(5)
-    total_emissions = recent_years['총배출량']
-    
-    if len(total_emissions) < 2:
-        return "트렌드 분석을 위한 충분한 연도 데이터가 없습니다."
-    
-    trend = "증가" if total_emissions.iloc[-1] > total_emissions.iloc[0] else "감소"
-    percent_change = ((total_emissions.iloc[-1] - total_emissions.iloc[0]) / total_emissions.iloc[0]) * 100
-    
-    analysis = f"최근 {len(recent_years)}년간 총 배출량은 {trend} 추세입니다. "
-    analysis += f"첫 해 대비 마지막 해의 배출량 변화율은 {percent_change:.2f}%입니다."
-    
-    return analysis
+    return _describe_trend(recent_years['연도'].tolist(), recent_years['총배출량'].tolist())
+
+def analyze_region_trend(region_code, dataset='gyeonggi', last=5):
+    """
+    저장소 색인에서 지역의 최근 연도 시계열을 바로 꺼내 트렌드를 설명합니다.
+    """
+    years, totals = get_emissions_store().region_series(dataset, region_code, last=last)
+    if len(years) <= 1:
+        return "트렌드 분석을 위한 충분한 데이터가 없습니다."
+    return _describe_trend(years, totals)
+
+
+if __name__ == "__main__":
+    # 새 연도 발표본 적재: python -m utils.data_processor <gyeonggi|national> <연도> <CSV 경로>
+    if len(sys.argv) != 4 or sys.argv[1] not in PARSERS:
+        print("사용법: python -m utils.data_processor <gyeonggi|national> <연도> <CSV 경로>")
+        sys.exit(1)
+    logging.basicConfig(level=logging.INFO)
+    dataset, year, csv_path = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+    get_emissions_store().ingest(dataset, year, PARSERS[dataset](csv_path), source=parsed_fingerprint(csv_path))
+    print(f"{dataset} {year}년 데이터를 적재했습니다.")
@@ -0,0 +1,238 @@
+import glob
+import hashlib
+import logging
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from utils.regions import get_region_registry, registry_files
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+CACHE_DIR = os.path.join(DATA_DIR, "cache")
+
+GYEONGGI_CSV = os.path.join(DATA_DIR, "gyeonggi_carbon_data_2022.csv")
+NATIONAL_CSV = os.path.join(DATA_DIR, "carbon_emissions_by_region(2022).csv")
+
+EMISSION_COLUMNS = ['배출_건물_전기', '배출_건물_지역난방', '배출_건물_가스', '탄소배출_수송']
+ABSORPTION_COLUMN = '탄소흡수_산림'
+NUMERIC_COLUMNS = EMISSION_COLUMNS + [ABSORPTION_COLUMN]
+
+DATA_YEAR = 2022
+
+# 값이 없음을 뜻하는 자리표시자 (통계표의 '-' 등). 0으로 읽습니다.
+ZERO_PLACEHOLDERS = ['-', '－', '–', '—', '']
+
+NUMBER_PATTERN = r'^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$'
+
+# 파싱 규칙이나 파생 컬럼이 바뀌면 올려서 기존 캐시 파일을 무효화합니다.
+CACHE_SCHEMA_VERSION = 4
+
+
+def _update_digest(digest, path):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+
+
+def file_fingerprint(path):
+    """
+    원본 파일 내용과 캐시 스키마 버전으로 캐시 키를 만듭니다.
+    """
+    digest = hashlib.sha256(f"schema-{CACHE_SCHEMA_VERSION}".encode())
+    _update_digest(digest, path)
+    return digest.hexdigest()[:16]
+
+
+def registry_fingerprint():
+    """
+    '지역코드'를 채우는 행정구역 속성표(.dbf) 전체의 지문. 경계 파일이 바뀌면 달라집니다.
+    """
+    digest = hashlib.sha256()
+    for path in registry_files():
+        digest.update(os.path.basename(path).encode())
+        _update_digest(digest, path)
+    return digest.hexdigest()[:16]
+
+
+def parsed_fingerprint(path):
+    """
+    파싱 결과의 캐시 키: 원본 파일 지문과 행정구역 속성표 지문.
+    """
+    return hashlib.sha256(f"{file_fingerprint(path)}|{registry_fingerprint()}".encode()).hexdigest()[:16]
+
+
+def read_korean_csv(path):
+    """
+    UTF-8로 먼저 읽고, 실패하면 CP949(EUC-KR 확장)로 다시 읽습니다.
+    """
+    try:
+        return pd.read_csv(path, encoding='utf-8')
+    except UnicodeDecodeError:
+        return pd.read_csv(path, encoding='cp949')
+
+
+def parse_korean_numeric(values):
+    """
+    한국 통계표 형식의 숫자 컬럼을 Arrow 연산으로 한 번에 변환합니다.
+    천 단위 구분 쉼표, 단독 '-' 자리표시자(0), 음수('-1,234', '△1,234', '(1,234)')를 처리하며
+    변환할 수 없는 값은 NaN이 됩니다.
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype('float64')
+
+    text = pc.replace_substring(pa.array(series.astype('string[pyarrow]')), ',', '')
+    text = pc.if_else(pc.is_in(text, value_set=pa.array(ZERO_PLACEHOLDERS)), '0', text)
+
+    try:
+        numbers = pc.cast(text, pa.float64())
+    except pa.ArrowInvalid:
+        # 공백, 특수 음수 표기, 숫자가 아닌 값이 섞인 경우에만 느린 경로로 정리합니다.
+        text = pc.utf8_trim_whitespace(text)
+        text = pc.if_else(pc.is_in(text, value_set=pa.array(ZERO_PLACEHOLDERS)), '0', text)
+        text = pc.replace_substring_regex(text, r'^[△▲−]', '-')
+        text = pc.replace_substring_regex(text, r'^\((.+)\)$', r'-\1')
+        valid = pc.match_substring_regex(text, NUMBER_PATTERN)
+        numbers = pc.cast(pc.if_else(valid, text, pa.scalar(None, pa.string())), pa.float64())
+
+    return pd.Series(numbers.to_numpy(zero_copy_only=False), index=series.index, name=series.name)
+
+
+def add_derived_columns(df):
+    """
+    배출/흡수 컬럼으로 계산하는 파생 지표를 붙인 새 프레임을 반환합니다.
+    탄소중립달성도: 총배출량 대비 산림 흡수량 비율 (%, 최대 100).
+    """
+    return df.assign(탄소중립달성도=(df[ABSORPTION_COLUMN] / df['총배출량'] * 100).clip(upper=100))
+
+
+def _parse_gyeonggi(path):
+    df = read_korean_csv(path)
+
+    for col in NUMERIC_COLUMNS:
+        df[col] = parse_korean_numeric(df[col])
+
+    df['총배출량'] = df[EMISSION_COLUMNS].sum(axis=1)
+    df['순배출량'] = df['총배출량'] - df[ABSORPTION_COLUMN]
+
+    if '연도' not in df.columns:
+        df['연도'] = DATA_YEAR
+
+    df['지역코드'] = get_region_registry().codes_for(df['지자체명'])
+
+    return add_derived_columns(df)
+
+
+def _parse_national(path):
+    df = read_korean_csv(path)
+    df['순배출량'] = df['탄소배출량'] - df['탄소흡수량']
+    df['지역코드'] = get_region_registry().codes_for(df['시도별'])
+    return df
+
+
+# 데이터셋 이름 -> 원본 CSV 파서 (연도별 발표본 적재에도 사용)
+PARSERS = {
+    'gyeonggi': _parse_gyeonggi,
+    'national': _parse_national,
+}
+
+
+def read_only_frame(df):
+    """
+    numpy 컬럼 배열을 읽기 전용으로 잠근 프레임. 프로세스 공용 프레임을 얕은 복사본으로 나눠 줄 때 씁니다.
+    Copy-on-Write가 없는 pandas에서도 호출자가 공유 배열을 제자리에서 고치려 하면 ValueError가 나고,
+    컬럼 추가/교체는 호출자의 복사본에만 반영됩니다.
+    """
+    columns = {}
+    for name in df.columns:
+        column = df[name]
+        if isinstance(column.dtype, np.dtype):
+            values = column.to_numpy(copy=True)
+            values.flags.writeable = False
+            column = pd.Series(values, index=df.index, name=name, copy=False)
+        columns[name] = column
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def _cache_path(source_path, fingerprint):
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    return os.path.join(CACHE_DIR, f"{name}.{fingerprint}.parquet")
+
+
+def _remove_stale_caches(source_path, keep_path):
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    for path in glob.glob(os.path.join(CACHE_DIR, glob.escape(name) + ".*.parquet")):
+        if path != keep_path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _load_with_cache(source_path, parser):
+    """
+    원본 해시로 키가 매겨진 Parquet 캐시가 있으면 메모리 매핑으로 읽고,
+    없으면 CSV를 파싱한 뒤 캐시를 기록합니다.
+    """
+    cache_path = _cache_path(source_path, parsed_fingerprint(source_path))
+
+    if os.path.exists(cache_path):
+        try:
+            return pd.read_parquet(cache_path, memory_map=True)
+        except (OSError, ValueError, pa.ArrowException) as e:
+            logger.warning(f"캐시를 읽지 못해 원본을 다시 파싱합니다 ({cache_path}): {e}")
+
+    df = parser(source_path)
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+        _remove_stale_caches(source_path, cache_path)
+    except (OSError, ValueError, pa.ArrowException) as e:
+        logger.warning(f"데이터 캐시를 기록하지 못했습니다 ({cache_path}): {e}")
+
+    return df
+
+
+@lru_cache(maxsize=None)
+def _gyeonggi_emissions():
+    return read_only_frame(_load_with_cache(GYEONGGI_CSV, _parse_gyeonggi))
+
+
+@lru_cache(maxsize=None)
+def _national_emissions():
+    return read_only_frame(_load_with_cache(NATIONAL_CSV, _parse_national))
+
+
+def load_gyeonggi_emissions():
+    """
+    경기도 지자체별 배출 데이터 (숫자 정리 및 총배출량/순배출량/탄소중립달성도 파생 완료).
+    프로세스당 한 번만 로드하며, 호출자는 공유 프레임의 얕은 복사본(복사 없는 읽기 전용 뷰)을 받습니다.
+    공유 배열은 읽기 전용이므로 호출자가 컬럼을 추가하거나 바꿔도 자기 복사본만 바뀝니다.
+    """
+    return _gyeonggi_emissions().copy(deep=False)
+
+
+def load_national_emissions():
+    """
+    광역단위별 배출 데이터 (순배출량 파생 완료).
+    """
+    return _national_emissions().copy(deep=False)
+
+
+@lru_cache(maxsize=None)
+def dataset_version():
+    """
+    현재 원본 데이터 파일 전체와 행정구역 속성표의 지문. 캐시 키 등에 사용합니다.
+    """
+    return hashlib.sha256(
+        "|".join([file_fingerprint(path) for path in (GYEONGGI_CSV, NATIONAL_CSV)] + [registry_fingerprint()]).encode()
+    ).hexdigest()[:16]
@@ -0,0 +1,103 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset import DATA_DIR, file_fingerprint, read_korean_csv
+
+# 배출계수 표 (컬럼: 연도, 전력권역, 항목, 배출계수, 단위). 한 (연도, 전력권역) 묶음이 하나의 계수 버전입니다.
+FACTORS_CSV = os.path.join(DATA_DIR, "emission_factors.csv")
+
+# 전력권역을 따로 지정하지 않은 계수 (전국 평균 전력 믹스)
+DEFAULT_REGION = '전국'
+
+
+class EmissionFactorRegistry:
+    """
+    버전별(연도 x 전력권역) 배출계수 색인.
+    모든 버전을 (버전 수, 항목 수) 밀집 행렬로 컴파일해 두므로, 저장된 기록마다 버전 번호만
+    정하면 전체 기록을 한 번의 배열 연산으로 다시 계산할 수 있습니다.
+    권역 계수에 없는 항목은 같은 연도의 전국 계수를, 전국 계수에 없는 항목은 직전 연도의 전국 계수를 물려받습니다.
+    """
+
+    def __init__(self, table, items):
+        self.items = list(items)
+        table = table.assign(연도=table['연도'].astype(int), 전력권역=table['전력권역'].fillna(DEFAULT_REGION))
+
+        years = sorted(int(year) for year in table['연도'].unique())
+        regions = [DEFAULT_REGION] + sorted(set(table['전력권역']) - {DEFAULT_REGION})
+        self.versions = [(year, region) for year in years for region in regions]
+        self._index = {version: i for i, version in enumerate(self.versions)}
+
+        given = table.set_index(['연도', '전력권역', '항목'])['배출계수']
+        self.factors = np.full((len(self.versions), len(self.items)), np.nan)
+        for i, (year, region) in enumerate(self.versions):
+            for j, item in enumerate(self.items):
+                if (year, region, item) in given.index:
+                    self.factors[i, j] = given[(year, region, item)]
+                elif region != DEFAULT_REGION:
+                    self.factors[i, j] = self.factors[self._index[(year, DEFAULT_REGION)], j]
+                elif i >= len(regions):
+                    self.factors[i, j] = self.factors[i - len(regions), j]
+        if np.isnan(self.factors[0]).any():
+            missing = [item for item, value in zip(self.items, self.factors[0]) if np.isnan(value)]
+            raise ValueError(f"가장 이른 연도의 전국 배출계수가 없는 항목이 있습니다: {missing}")
+        self.factors.flags.writeable = False
+
+        self.units = table.drop_duplicates('항목', keep='last').set_index('항목')['단위'].to_dict()
+        self.years = years
+
+    def resolve(self, year=None, region=DEFAULT_REGION):
+        """
+        (연도, 전력권역)에 적용할 버전 번호. 연도가 없거나 등록 범위 밖이면 가장 가까운 연도를,
+        모르는 권역이면 전국 계수를 씁니다.
+        """
+        if year is None:
+            year = self.years[-1]
+        position = np.searchsorted(self.years, int(year), side='right') - 1
+        year = self.years[max(position, 0)]
+        return self._index.get((year, region), self._index[(year, DEFAULT_REGION)])
+
+    def resolve_many(self, years, regions=None):
+        """
+        기록별 버전 번호 배열. 서로 다른 (연도, 권역) 조합마다 한 번씩만 조회합니다.
+        """
+        years = pd.Series(np.asarray(years, dtype='int64'))
+        regions = pd.Series(DEFAULT_REGION if regions is None else np.asarray(regions, dtype=object), index=years.index)
+        keys = pd.MultiIndex.from_arrays([years, regions])
+        unique = keys.unique()
+        lookup = np.array([self.resolve(year, region) for year, region in unique], dtype='int64')
+        return lookup[unique.get_indexer(keys)]
+
+    def factors_for(self, year=None, region=DEFAULT_REGION):
+        return self.factors[self.resolve(year, region)]
+
+    def version_label(self, year=None, region=DEFAULT_REGION):
+        year, region = self.versions[self.resolve(year, region)]
+        return f"{year}년 {region}"
+
+
+@lru_cache(maxsize=8)
+def _fingerprint(path, mtime_ns, size):
+    return file_fingerprint(path)
+
+
+def factors_fingerprint():
+    """
+    배출계수 파일의 내용 지문. 파일이 바뀌지 않았으면 다시 해시하지 않습니다.
+    """
+    stat = os.stat(FACTORS_CSV)
+    return _fingerprint(FACTORS_CSV, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=None)
+def _registry(path, fingerprint, items):
+    return EmissionFactorRegistry(read_korean_csv(path), items)
+
+
+def get_factor_registry(items):
+    """
+    프로세스 공용 배출계수 색인. 계수 파일 내용이 바뀌면 다시 컴파일합니다.
+    """
+    return _registry(FACTORS_CSV, factors_fingerprint(), tuple(items))
@@ -0,0 +1,97 @@
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+# 캐시 상한 (항목 수, 직렬화된 JSON 총 바이트)
+MAX_ENTRIES = 256
+MAX_BYTES = 128 * 1024 * 1024
+
+
+def _freeze(value):
+    """
+    위젯 값(리스트, 딕셔너리 등)을 캐시 키로 쓸 수 있는 불변 값으로 바꿉니다.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_freeze(v) for v in value]
+        return tuple(sorted(items, key=repr)) if isinstance(value, (set, frozenset)) else tuple(items)
+    if hasattr(value, 'item'):  # numpy 스칼라
+        return value.item()
+    return value
+
+
+class FigureCache:
+    """
+    Plotly Figure를 JSON으로 직렬화해 보관하는 LRU 캐시.
+    키는 (데이터셋 지문, Figure 종류, 관련 위젯 값)이며, 적중 시 Figure를 다시 만들지 않고
+    st.plotly_chart에 바로 넘길 수 있는 Figure dict를 돌려줍니다.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(kind, dataset_version=None, **widgets):
+        return (dataset_version, kind, _freeze(widgets))
+
+    def get_or_build(self, kind, builder, dataset_version=None, **widgets):
+        """
+        캐시에 있으면 저장된 JSON을, 없으면 builder()로 Figure를 만들어 저장한 뒤 반환합니다.
+        """
+        key = self.make_key(kind, dataset_version, **widgets)
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(payload)
+            self.misses += 1
+
+        # 빌드는 잠금 밖에서 수행해 다른 세션의 조회를 막지 않습니다.
+        payload = builder().to_json()
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = payload
+                self._bytes += len(payload)
+                self._evict()
+        return json.loads(payload)
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, payload = self._entries.popitem(last=False)
+            self._bytes -= len(payload)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_figure_cache():
+    """
+    프로세스 공용 Figure 캐시 (모든 세션과 페이지가 공유).
+    """
+    return FigureCache()
@@ -0,0 +1,169 @@
+import os
+import sys
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+from utils.emission_factors import DEFAULT_REGION, factors_fingerprint, get_factor_registry
+
+# 계산기 입력 항목 (컬럼 이름) 과 단위
+INPUT_COLUMNS = ['transportation', 'energy_usage', 'food_habits', 'consumer_goods', 'waste']
+
+# 결과 항목 (입력 항목과 같은 순서)
+CATEGORIES = ['교통', '에너지', '식습관', '소비재', '폐기물']
+TOTAL_COLUMN = '총탄소발자국'
+
+# 입력 항목별 연간 환산 횟수 (배출계수는 data/emission_factors.csv의 버전별 표)
+ANNUAL_PERIODS = [52, 12, 52, 12, 52]
+
+# 계산 방법 설명용 (아이콘과 항목 이름, 입력 단위, 연간 환산 표기)
+EXPLANATION_LABELS = [
+    ('🚗 교통', '주간 km', '52주'),
+    ('💡 에너지', '월간 kWh', '12개월'),
+    ('🍖 식습관', '주간 육류 소비 횟수', '52주'),
+    ('🛍️ 소비재', '월간 구매 횟수', '12개월'),
+    ('🗑️ 폐기물', '주간 kg', '52주'),
+]
+
+# 스트리밍 계산 시 한 번에 읽는 CSV 블록 크기 (바이트)
+BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def factor_registry():
+    return get_factor_registry(INPUT_COLUMNS)
+
+
+def build_coefficient_matrix(factors, periods=ANNUAL_PERIODS):
+    """
+    입력(행) -> 항목별 발자국 + 총계(열) 계수 행렬 (톤 CO2e).
+    마지막 열이 모든 항목 계수의 합이므로 행렬곱 한 번으로 총계까지 계산됩니다.
+    """
+    per_category = np.diag(np.asarray(periods, dtype='float64') * np.asarray(factors, dtype='float64') / 1000)
+    return np.hstack([per_category, per_category.sum(axis=1, keepdims=True)])
+
+
+@lru_cache(maxsize=32)
+def _compiled_coefficients(fingerprint, year, region):
+    matrix = build_coefficient_matrix(factor_registry().factors_for(year, region))
+    matrix.flags.writeable = False
+    return matrix
+
+
+def coefficient_matrix(year=None, region=DEFAULT_REGION):
+    """
+    (연도, 전력권역) 배출계수 버전의 계수 행렬. 연도를 생략하면 최신 버전입니다.
+    """
+    return _compiled_coefficients(factors_fingerprint(), year, region)
+
+
+def _as_input_matrix(inputs):
+    if isinstance(inputs, pd.DataFrame):
+        return inputs[INPUT_COLUMNS].to_numpy(dtype='float64')
+    if isinstance(inputs, dict):
+        return np.column_stack([np.asarray(inputs[column], dtype='float64') for column in INPUT_COLUMNS])
+    return np.atleast_2d(np.asarray(inputs, dtype='float64'))
+
+
+def footprint_matrix(inputs, coefficients=None):
+    """
+    (n, 5) 입력 -> (n, 6) [교통, 에너지, 식습관, 소비재, 폐기물, 총계] 배열.
+    inputs: DataFrame(INPUT_COLUMNS 포함), 컬럼 이름 -> 배열 dict, 또는 (n, 5) 배열.
+    """
+    if coefficients is None:
+        coefficients = coefficient_matrix()
+    return _as_input_matrix(inputs) @ coefficients
+
+
+def calculate_footprints(inputs, coefficients=None):
+    """
+    여러 가구의 탄소 발자국을 한 번에 계산해 항목별 값과 총계를 담은 DataFrame으로 반환합니다.
+    """
+    index = inputs.index if isinstance(inputs, pd.DataFrame) else None
+    return pd.DataFrame(footprint_matrix(inputs, coefficients), columns=CATEGORIES + [TOTAL_COLUMN], index=index)
+
+
+def calculate_footprint(transportation, energy_usage, food_habits, consumer_goods, waste, year=None, region=DEFAULT_REGION):
+    """
+    한 사람의 (총 탄소 발자국, 항목별 발자국 dict). 계산기 페이지용.
+    """
+    row = footprint_matrix([[transportation, energy_usage, food_habits, consumer_goods, waste]],
+                           coefficient_matrix(year, region))[0]
+    return float(row[-1]), {category: float(value) for category, value in zip(CATEGORIES, row[:-1])}
+
+
+def recompute_footprints(history, year_column='date', region_column=None):
+    """
+    저장된 발자국 기록 전체를 현재 배출계수 표로 다시 계산합니다.
+    기록마다 (기록 연도, 전력권역) 계수 버전을 고른 뒤, 버전별 계수 행을 모아 한 번의 배열 연산으로 계산합니다.
+    history: INPUT_COLUMNS와 날짜(또는 연도) 컬럼이 있는 DataFrame.
+    """
+    registry = factor_registry()
+    years = history[year_column]
+    if not pd.api.types.is_integer_dtype(years):
+        years = pd.to_datetime(years).dt.year
+    regions = history[region_column] if region_column else None
+    versions = registry.resolve_many(years, regions)
+
+    per_unit = registry.factors[versions] * np.asarray(ANNUAL_PERIODS, dtype='float64') / 1000
+    breakdown = _as_input_matrix(history) * per_unit
+    result = pd.DataFrame(breakdown, columns=CATEGORIES, index=history.index)
+    result[TOTAL_COLUMN] = breakdown.sum(axis=1)
+    return result
+
+
+def explain_calculation(year=None, region=DEFAULT_REGION):
+    """
+    계산기 페이지의 '계산 방법' 설명. 배출계수 표에서 만들어 계수가 바뀌면 설명도 함께 바뀝니다.
+    """
+    registry = factor_registry()
+    factors = registry.factors_for(year, region)
+    lines = [f"각 항목별 CO2e 환산 계산 방법 ({registry.version_label(year, region)} 배출계수):"]
+    for (label, unit, period), column, factor in zip(EXPLANATION_LABELS, INPUT_COLUMNS, factors):
+        lines.append(f"{label}: ({unit} * {period} * {factor:g} {registry.units.get(column, '')}) / 1000 = 연간 톤 CO2e")
+    return "\n\n".join(lines)
+
+
+def score_csv(input_path, output_path, block_size=BLOCK_SIZE):
+    """
+    설문/인사 자료 CSV를 블록 단위로 읽어 발자국 컬럼을 붙여 씁니다. 처리한 행 수를 반환합니다.
+    Arrow 스트리밍 읽기/쓰기를 쓰므로 메모리 사용량은 파일 크기와 무관하게 블록 하나 분량입니다.
+    """
+    # 첫 블록에서 입력 컬럼 타입을 추론하면 뒤 블록의 소수(예: 12.5)가 정수 컬럼에 맞지 않으므로 float64로 고정합니다.
+    reader = pa_csv.open_csv(
+        input_path, read_options=pa_csv.ReadOptions(block_size=block_size),
+        convert_options=pa_csv.ConvertOptions(column_types={column: pa.float64() for column in INPUT_COLUMNS}))
+    output_columns = CATEGORIES + [TOTAL_COLUMN]
+    schema = reader.schema
+    for column in output_columns:
+        schema = schema.append(pa.field(column, pa.float64()))
+
+    rows = 0
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        with pa_csv.CSVWriter(tmp_path, schema) as writer:
+            for batch in reader:
+                inputs = {column: batch.column(column).to_numpy(zero_copy_only=False) for column in INPUT_COLUMNS}
+                result = footprint_matrix(inputs)
+                arrays = batch.columns + [pa.array(result[:, i]) for i in range(len(output_columns))]
+                writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+                rows += batch.num_rows
+        os.replace(tmp_path, output_path)
+    finally:
+        # 중간에 실패하면 쓰다 만 임시 파일을 남기지 않습니다.
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return rows
+
+
+if __name__ == "__main__":
+    # 대량 계산: python -m utils.footprint <입력 CSV> <출력 CSV> [블록 크기 MB]
+    if len(sys.argv) not in (3, 4):
+        print("사용법: python -m utils.footprint <입력 CSV> <출력 CSV> [블록 크기 MB]")
+        print(f"입력 CSV에는 {', '.join(INPUT_COLUMNS)} 컬럼이 있어야 합니다.")
+        sys.exit(1)
+    block_size = int(float(sys.argv[3]) * 1024 * 1024) if len(sys.argv) == 4 else BLOCK_SIZE
+    count = score_csv(sys.argv[1], sys.argv[2], block_size)
+    print(f"{count:,}행의 탄소 발자국을 계산했습니다: {sys.argv[2]}")
@@ -0,0 +1,89 @@
+import logging
+import os
+from functools import lru_cache
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+from pyproj import Transformer
+
+from utils.geometry import LAYERS
+
+logger = logging.getLogger(__name__)
+
+
+class RegionLocator:
+    """
+    시군구/광역 경계 폴리곤에 대한 STRtree 공간 색인.
+    좌표(경도, 위도)를 원본 좌표계로 변환해 포함하는 행정구역 코드를 찾습니다.
+    시군구 경계에서 찾지 못한 점은 광역 경계(있는 경우)에서 다시 찾습니다.
+    """
+
+    def __init__(self, layers):
+        self._trees = []
+        for gdf, id_column in layers:
+            transformer = Transformer.from_crs("EPSG:4326", gdf.crs, always_xy=True)
+            codes = gdf[id_column].astype(int).to_numpy()
+            geometries = gdf.geometry.values.copy()
+            # 준비된(prepared) 폴리곤은 점 포함 판정에 내부 색인을 재사용합니다.
+            shapely.prepare(geometries)
+            self._trees.append((transformer, shapely.STRtree(geometries), geometries, codes))
+
+    def resolve_many(self, lons, lats):
+        """
+        여러 좌표를 한 번에 조회합니다. 찾지 못한 점은 -1.
+        """
+        lons = np.asarray(lons, dtype=float)
+        lats = np.asarray(lats, dtype=float)
+        result = np.full(lons.shape, -1, dtype=np.int64)
+
+        for transformer, tree, geometries, codes in self._trees:
+            pending = np.flatnonzero(result == -1)
+            if pending.size == 0:
+                break
+            x, y = transformer.transform(lons[pending], lats[pending])
+            # 1단계: 경계 상자 후보, 2단계: 후보 폴리곤에 대해서만 정밀 포함 판정
+            point_index, geometry_index = tree.query(shapely.points(x, y))
+            inside = shapely.contains_xy(geometries[geometry_index], x[point_index], y[point_index])
+            point_index, geometry_index = point_index[inside], geometry_index[inside]
+            # 경계선 위의 점은 여러 폴리곤에 걸칠 수 있으므로 첫 번째만 사용합니다.
+            first_point, first = np.unique(point_index, return_index=True)
+            result[pending[first_point]] = codes[geometry_index[first]]
+
+        return result
+
+    def resolve(self, lon, lat):
+        """
+        좌표 하나를 조회합니다 (배열 변환 없이 스칼라 경로). 찾지 못하면 None.
+        """
+        for transformer, tree, geometries, codes in self._trees:
+            x, y = transformer.transform(lon, lat)
+            candidates = tree.query(shapely.Point(x, y))
+            inside = candidates[shapely.contains_xy(geometries[candidates], x, y)]
+            if inside.size:
+                return int(codes[inside[0]])
+        return None
+
+    def resolve_frame(self, df, lon_column='경도', lat_column='위도'):
+        """
+        설문 등 좌표 컬럼이 있는 표에 '지역코드' 컬럼을 붙여 반환합니다.
+        """
+        codes = self.resolve_many(df[lon_column].to_numpy(), df[lat_column].to_numpy())
+        return df.assign(지역코드=pd.array(np.where(codes == -1, None, codes), dtype='Int64'))
+
+
+@lru_cache(maxsize=None)
+def get_region_locator():
+    layers = []
+    for name in ('sgg_41', 'ctprvn'):
+        path = LAYERS[name]['path']
+        if not os.path.exists(path):
+            logger.warning(f"{name} 경계 파일이 없어 공간 색인에서 제외합니다: {path}")
+            continue
+        if LAYERS[name]['encoding']:
+            gdf = gpd.read_file(path, encoding=LAYERS[name]['encoding'])
+        else:
+            gdf = gpd.read_file(path)
+        layers.append((gdf, LAYERS[name]['id_column']))
+    return RegionLocator(layers)
@@ -0,0 +1,219 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+from functools import lru_cache
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from utils.dataset import CACHE_DIR, DATA_DIR, file_fingerprint
+from utils.regions import get_region_registry
+
+logger = logging.getLogger(__name__)
+
+# 지도 축척별 단순화 허용 오차 (원본 좌표계 EPSG:5186 기준, 미터 단위)
+SIMPLIFY_LEVELS = {
+    'national': 500,      # 전국 보기 (zoom ~5-6)
+    'province': 100,      # 광역 보기 (zoom ~7-9)
+    'municipality': 20,   # 시군구 확대 (zoom 10 이상)
+}
+
+# GeoJSON 좌표 소수점 자릿수 (약 1m 정밀도)
+COORDINATE_PRECISION = 5
+
+LAYERS = {
+    'ctprvn': {
+        'path': os.path.join(DATA_DIR, "ctprvn.shp"),
+        'id_column': 'CTPRVN_CD',
+        'encoding': 'cp949',
+    },
+    'sgg_41': {
+        'path': os.path.join(DATA_DIR, "LARD_ADM_SECT_SGG_41_202405.shp"),
+        'id_column': 'ADM_SECT_C',
+        'encoding': None,
+    },
+}
+
+# 광역별 시군구 경계 파일 (LARD_ADM_SECT_SGG_<광역코드>_<기준월>.shp)
+SIGUNGU_SHP_PATTERN = os.path.join(DATA_DIR, "LARD_ADM_SECT_SGG_*.shp")
+
+
+def sigungu_layer_name(province_code):
+    return f"sgg_{int(province_code)}"
+
+
+def _register_sigungu_layers():
+    # 데이터 폴더에 있는 광역별 경계를 모두 등록합니다 (같은 광역이면 최신 기준월 파일).
+    # 파일 목록만 확인하며 경계는 실제로 요청될 때 읽습니다.
+    for path in sorted(glob.glob(SIGUNGU_SHP_PATTERN)):
+        match = re.search(r"_SGG_(\d+)_", os.path.basename(path))
+        if match:
+            LAYERS[sigungu_layer_name(match.group(1))] = {
+                'path': path,
+                'id_column': 'ADM_SECT_C',
+                'encoding': None,
+            }
+
+
+_register_sigungu_layers()
+
+
+class SimplifiedLayer:
+    """
+    단순화된 경계 레이어. 속성 표와 지도에 바로 넘길 수 있는 GeoJSON을 함께 보관합니다.
+    각 feature의 id는 행정구역 코드 문자열이며, attributes의 '_feature_id' 컬럼과 같습니다.
+    fingerprint는 원본 경계와 단순화 설정의 지문이므로 이 레이어로 만든 Figure 캐시 키에 씁니다.
+    """
+
+    def __init__(self, name, level, geojson, fingerprint):
+        self.name = name
+        self.level = level
+        self.geojson = geojson
+        self.fingerprint = fingerprint
+        self.attributes = pd.DataFrame(
+            [dict(feature['properties'], _feature_id=feature['id']) for feature in geojson['features']]
+        )
+
+    @property
+    def payload_bytes(self):
+        return len(json.dumps(self.geojson, ensure_ascii=False).encode('utf-8'))
+
+
+def level_for_zoom(zoom):
+    """
+    mapbox zoom 값에 맞는 단순화 단계를 고릅니다.
+    """
+    if zoom < 7:
+        return 'national'
+    if zoom < 10:
+        return 'province'
+    return 'municipality'
+
+
+def _read_layer(name):
+    layer = LAYERS[name]
+    if not os.path.exists(layer['path']):
+        raise FileNotFoundError(f"Shapefile이 존재하지 않습니다: {layer['path']}")
+    if layer['encoding']:
+        return gpd.read_file(layer['path'], encoding=layer['encoding'])
+    return gpd.read_file(layer['path'])
+
+
+def _simplify(geometries, tolerance):
+    """
+    인접 경계를 공유하는 폴리곤들이 틈이나 겹침 없이 함께 단순화되도록
+    coverage 단순화를 사용합니다. GEOS 3.12 미만에서는 개별 폴리곤 단순화로 대체합니다.
+    """
+    if hasattr(shapely, 'coverage_simplify'):
+        return shapely.coverage_simplify(geometries, tolerance)
+    return shapely.simplify(geometries, tolerance, preserve_topology=True)
+
+
+def _round_coordinates(geometries):
+    return shapely.transform(geometries, lambda coords: np.round(coords, COORDINATE_PRECISION))
+
+
+def build_simplified_geojson(name, level):
+    """
+    원본 Shapefile을 읽어 지정한 단계로 단순화한 뒤 WGS84 GeoJSON(dict)으로 반환합니다.
+    """
+    layer = LAYERS[name]
+    gdf = _read_layer(name)
+    gdf = gdf.set_geometry(_simplify(gdf.geometry.values, SIMPLIFY_LEVELS[level]))
+    gdf = gdf.to_crs(epsg=4326)
+    gdf = gdf.set_geometry(_round_coordinates(gdf.geometry.values))
+    gdf.index = gdf[layer['id_column']].astype(str)
+    return json.loads(gdf.to_json(drop_id=False))
+
+
+def layer_fingerprint(name, level):
+    """
+    단순화 레이어의 지문: 원본 경계 파일, 단계별 허용 오차, 좌표 자릿수.
+    """
+    settings = f"{file_fingerprint(LAYERS[name]['path'])}|{SIMPLIFY_LEVELS[level]}|{COORDINATE_PRECISION}"
+    return hashlib.sha256(settings.encode()).hexdigest()[:16]
+
+
+def _cache_path(name, fingerprint, level):
+    return os.path.join(CACHE_DIR, f"{name}.{fingerprint}.{level}.geojson")
+
+
+def read_simplified_layer(name, level):
+    """
+    단순화된 레이어를 읽습니다. 원본 해시로 키가 매겨진 디스크 캐시가 있으면
+    다시 단순화하지 않고 그대로 읽습니다. 메모리에 보관하지 않으므로
+    보관 정책은 호출하는 쪽(load_simplified_layer, 광역 카탈로그)이 정합니다.
+    """
+    fingerprint = layer_fingerprint(name, level)
+    cache_path = _cache_path(name, fingerprint, level)
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, encoding='utf-8') as f:
+                return SimplifiedLayer(name, level, json.load(f), fingerprint)
+        except (OSError, ValueError) as e:
+            logger.warning(f"단순화 경계 캐시를 읽지 못해 다시 생성합니다 ({cache_path}): {e}")
+
+    geojson = build_simplified_geojson(name, level)
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(geojson, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, cache_path)
+        stale = glob.glob(os.path.join(CACHE_DIR, f"{name}.*.{level}.geojson"))
+        for path in stale:
+            if path != cache_path:
+                os.remove(path)
+    except OSError as e:
+        logger.warning(f"단순화 경계 캐시를 기록하지 못했습니다 ({cache_path}): {e}")
+
+    return SimplifiedLayer(name, level, geojson, fingerprint)
+
+
+@lru_cache(maxsize=None)
+def load_simplified_layer(name, level):
+    """
+    프로세스 수명 동안 보관하는 단순화 레이어 (전국 광역 경계처럼 항상 쓰는 레이어용).
+    """
+    return read_simplified_layer(name, level)
+
+
+def join_layer_data(layer, data, how='inner'):
+    """
+    경계 feature마다 데이터 행을 '지역코드'(정수)로 붙입니다. 문자열 가공 없이 코드 색인만 사용합니다.
+    feature 코드가 데이터에 없고 상위 행정구역에만 행이 있으면(예: 데이터는 '부천시' 합계, 경계는 구별)
+    상위 합계를 구마다 칠하지 않도록 값은 비워 두고 '_parent_only' 컬럼에 그 상위 코드를 적습니다.
+    how='inner'이면 자기 행도 상위 행도 없는 feature를 빼고, how='left'이면 NaN 값으로 남깁니다.
+    """
+    features = layer.attributes['_feature_id'].astype(int).to_numpy()
+    matched = get_region_registry().match_codes(features, data['지역코드'])
+    own = matched == features
+    rows = data.set_index('지역코드').reindex(np.where(own, matched, -1)).reset_index(drop=True)
+    joined = pd.concat([layer.attributes.reset_index(drop=True), rows], axis=1)
+    joined['_parent_only'] = pd.Series(matched).where(~own & (matched != -1)).astype('Int64')
+    if how == 'inner':
+        joined = joined[matched != -1].reset_index(drop=True)
+    return joined
+
+
+def precompute_all():
+    """
+    모든 레이어의 모든 단계를 미리 생성합니다 (배포 시 캐시 예열용).
+    """
+    for name, layer in LAYERS.items():
+        if not os.path.exists(layer['path']):
+            logger.warning(f"{name} 레이어 원본이 없어 건너뜁니다: {layer['path']}")
+            continue
+        for level in SIMPLIFY_LEVELS:
+            load_simplified_layer(name, level)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    precompute_all()
@@ -0,0 +1,300 @@
+import atexit
+import glob
+import itertools
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.dataset import DATA_DIR
+from utils.emission_factors import factors_fingerprint
+from utils.footprint import INPUT_COLUMNS
+from utils.running_stats import RunningStats
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DIR = os.path.join(DATA_DIR, "history")
+
+# 저장 컬럼 (항목별 발자국은 입력값과 배출계수 표로 다시 계산하므로 저장하지 않습니다)
+HISTORY_COLUMNS = ['date', 'footprint'] + INPUT_COLUMNS
+
+# 세그먼트 파일 메타데이터에 기록하는 누적 통계 키 (배출계수 지문과 RunningStats)
+STATS_METADATA_KEY = b"stats"
+
+# 쓰기 묶음: 사용자별로 이만큼 쌓이거나 FLUSH_INTERVAL초가 지나면 세그먼트 파일 하나로 기록
+BATCH_SIZE = 16
+FLUSH_INTERVAL = 30
+
+# 사용자별 세그먼트 파일이 이보다 많아지면 하나로 합칩니다.
+MAX_SEGMENTS = 32
+
+# 읽은 기록을 메모리에 들고 있는 사용자 수. 넘으면 가장 오래 조회하지 않은 사용자부터 내립니다.
+MAX_CACHED_USERS = 256
+
+# 히스토리 차트 최대 점 수와 다운샘플 구간 (짧은 구간부터 시도)
+MAX_POINTS = 200
+BUCKETS = [('D', '일'), ('W', '주'), ('MS', '월'), ('QS', '분기'), ('YS', '연')]
+BUCKET_DAYS = {'D': 1, 'W': 7, 'MS': 30, 'QS': 91, 'YS': 365}
+
+
+def history_frame(rows):
+    """
+    기록 dict 목록을 저장 형식(HISTORY_COLUMNS, 날짜/실수형)의 DataFrame으로 바꿉니다.
+    """
+    frame = pd.DataFrame([{column: row.get(column) for column in HISTORY_COLUMNS} for row in rows],
+                         columns=HISTORY_COLUMNS)
+    frame['date'] = pd.to_datetime(frame['date'])
+    return frame.astype({column: 'float64' for column in HISTORY_COLUMNS[1:]})
+
+
+def downsample(df, max_points=MAX_POINTS):
+    """
+    기록이 max_points를 넘으면 점 수가 그 이하가 되는 가장 짧은 구간(일/주/월/분기/연)의 평균으로 줄입니다.
+    (DataFrame, 구간 이름) 반환. 줄이지 않았으면 구간 이름은 None.
+    """
+    if len(df) <= max_points:
+        return df, None
+    span_days = max((df['date'].iloc[-1] - df['date'].iloc[0]).days, 1)
+    for freq, label in BUCKETS:
+        if span_days / BUCKET_DAYS[freq] <= max_points or freq == BUCKETS[-1][0]:
+            return df.set_index('date').resample(freq).mean().dropna(how='all').reset_index(), label
+
+
+class FootprintHistoryStore:
+    """
+    사용자별 탄소 발자국 기록 저장소.
+    기록은 data/history/user=<id>/ 아래 추가 전용 Parquet 세그먼트로 쌓이며, 새 기록은 메모리에
+    모았다가 묶음으로 기록합니다. 아직 기록되지 않은 항목도 조회 결과에는 바로 포함됩니다.
+    다른 워커 프로세스가 기록한 세그먼트는 조회할 때 새 파일만 추가로 읽습니다.
+    대기 중인 기록은 새 기록이 없어도 백그라운드 스레드가 FLUSH_INTERVAL 안에 기록하므로,
+    프로세스가 비정상 종료되어도 잃는 기록은 최근 FLUSH_INTERVAL초 분량뿐입니다.
+    세그먼트마다 그 행의 누적 통계(RunningStats)를 쓸 당시 배출계수 지문과 함께 Parquet 메타데이터에 넣어 두므로,
+    어느 워커든 세그먼트 통계를 합치기만 하면 통계 탭을 그릴 수 있습니다.
+    """
+
+    def __init__(self, root=HISTORY_DIR, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL,
+                 max_cached_users=MAX_CACHED_USERS):
+        self.root = root
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_cached_users = max_cached_users
+        self._lock = threading.Lock()
+        self._pending = {}        # 사용자 -> 기록 대기 중인 행 목록
+        self._pending_since = {}  # 사용자 -> 가장 오래된 대기 행의 시각
+        self._recent = OrderedDict()   # 최근 조회 순서 (아래 세 캐시의 LRU 기준)
+        self._frames = {}         # 사용자 -> 세그먼트에서 읽은 행
+        self._stats = {}          # 사용자 -> (배출계수 지문, 읽은 세그먼트 전체의 누적 통계)
+        self._segments = {}       # 사용자 -> 읽은 세그먼트 경로 집합
+        self._downsampled = {}    # 사용자 -> ((행 수, 최대 점 수), 결과)
+        self._sequence = itertools.count()
+        atexit.register(self.flush)
+        threading.Thread(target=self._flush_periodically, name="history-flush", daemon=True).start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_interval / 2)
+            now = time.monotonic()
+            with self._lock:
+                due = [user for user, since in self._pending_since.items() if now - since >= self.flush_interval]
+            for user in due:
+                self.flush(user)
+
+    def _touch(self, user_id):
+        # 잠금을 잡은 상태에서 호출됩니다. 오래 조회하지 않은 사용자의 읽기 캐시를 내립니다 (대기 행은 유지).
+        self._recent[user_id] = None
+        self._recent.move_to_end(user_id)
+        while len(self._recent) > self.max_cached_users:
+            user, _ = self._recent.popitem(last=False)
+            self._frames.pop(user, None)
+            self._stats.pop(user, None)
+            self._segments.pop(user, None)
+            self._downsampled.pop(user, None)
+
+    def _user_dir(self, user_id):
+        return os.path.join(self.root, "user=" + re.sub(r'[^0-9A-Za-z_-]', '_', str(user_id)))
+
+    def append(self, user_id, entry):
+        """
+        기록 하나를 추가합니다. 묶음이 차거나 오래되면 세그먼트로 기록합니다.
+        """
+        row = {column: entry.get(column) for column in HISTORY_COLUMNS}
+        row['date'] = pd.Timestamp(row['date'] if row['date'] is not None else pd.Timestamp.now())
+        with self._lock:
+            pending = self._pending.setdefault(user_id, [])
+            pending.append(row)
+            self._pending_since.setdefault(user_id, time.monotonic())
+            self._downsampled.pop(user_id, None)
+            due = (len(pending) >= self.batch_size
+                   or time.monotonic() - self._pending_since[user_id] >= self.flush_interval)
+        if due:
+            self.flush(user_id)
+
+    def flush(self, user_id=None):
+        """
+        대기 중인 기록을 세그먼트 파일로 씁니다 (user_id가 없으면 모든 사용자).
+        """
+        with self._lock:
+            users = [user_id] if user_id is not None else list(self._pending)
+            for user in users:
+                rows = self._pending.get(user)
+                if not rows:
+                    continue
+                frame = history_frame(rows)
+                fingerprint = factors_fingerprint()
+                stats = RunningStats.from_history(frame)
+                path = self._write_segment(user, frame, fingerprint, stats)
+                if path is None:
+                    continue
+                del self._pending[user]
+                self._pending_since.pop(user, None)
+                if user in self._frames:
+                    self._frames[user] = pd.concat([self._frames[user], frame], ignore_index=True)
+                    self._segments[user].add(path)
+                    cached = self._stats.get(user)
+                    if cached is not None and cached[0] == fingerprint:
+                        cached[1].merge(stats)
+                    else:
+                        self._stats.pop(user, None)
+                    if len(self._segments[user]) > MAX_SEGMENTS:
+                        self._compact(user)
+
+    def _write_segment(self, user_id, frame, fingerprint, stats, prefix='part'):
+        directory = self._user_dir(user_id)
+        name = f"{prefix}-{time.time_ns()}-{os.getpid()}-{next(self._sequence)}.parquet"
+        path = os.path.join(directory, name)
+        summary = json.dumps({'factors': fingerprint, 'stats': stats.to_dict()}, separators=(',', ':'))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}), STATS_METADATA_KEY: summary.encode()})
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, path)
+        except (OSError, pa.ArrowException) as e:
+            logger.warning(f"발자국 기록을 저장하지 못했습니다. 다음 기록 때 다시 시도합니다 ({path}): {e}")
+            return None
+        return path
+
+    def _compact(self, user_id):
+        # 잠금을 잡은 상태에서 호출됩니다. 합친 파일을 먼저 쓰고 나서 기존 세그먼트를 지웁니다.
+        self._refresh(user_id)
+        fingerprint, stats = self._stats[user_id]
+        path = self._write_segment(user_id, self._frames[user_id], fingerprint, stats, prefix='compact')
+        if path is None:
+            return
+        for old_path in self._segments[user_id]:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+        self._segments[user_id] = {path}
+
+    def _refresh(self, user_id):
+        # 다른 프로세스가 쓴 새 세그먼트만 추가로 읽습니다.
+        # 다른 프로세스가 합친 파일이 생겼으면 이미 읽은 행과 겹치므로 처음부터 다시 읽습니다.
+        paths = set(glob.glob(os.path.join(self._user_dir(user_id), "*.parquet")))
+        seen = self._segments.setdefault(user_id, set())
+        new_paths = sorted(paths - seen)
+        if any(os.path.basename(path).startswith('compact-') for path in new_paths):
+            seen.clear()
+            self._frames.pop(user_id, None)
+            new_paths = sorted(paths)
+
+        # 누적 통계는 세그먼트에 저장된 값을 합칩니다. 배출계수가 바뀌었으면 읽어 둔 기록으로 한 번 다시 계산합니다.
+        fingerprint = factors_fingerprint()
+        if user_id in self._frames:
+            frames = [self._frames[user_id]]
+            stats = self._stats.get(user_id)
+            if stats is None or stats[0] != fingerprint:
+                stats = (fingerprint, RunningStats.from_history(self._frames[user_id]))
+        else:
+            frames = [history_frame([])]
+            stats = (fingerprint, RunningStats())
+        for path in new_paths:
+            try:
+                table = pq.read_table(path, memory_map=True)
+            except (OSError, pa.ArrowException) as e:
+                logger.warning(f"발자국 기록 세그먼트를 읽지 못했습니다 ({path}): {e}")
+                continue
+            frame = table.to_pandas()
+            frames.append(frame)
+            stats[1].merge(self._segment_stats(table.schema.metadata, frame, fingerprint))
+            seen.add(path)
+        if new_paths or user_id not in self._frames:
+            self._frames[user_id] = pd.concat(frames, ignore_index=True)
+            self._downsampled.pop(user_id, None)
+        self._stats[user_id] = stats
+
+    @staticmethod
+    def _segment_stats(metadata, frame, fingerprint):
+        """
+        세그먼트에 저장된 누적 통계. 없거나 다른 배출계수로 계산된 통계면 세그먼트 행으로 다시 계산합니다.
+        """
+        try:
+            summary = json.loads((metadata or {})[STATS_METADATA_KEY])
+        except (KeyError, ValueError):
+            summary = None
+        if summary is not None and summary.get('factors') == fingerprint:
+            return RunningStats.from_dict(summary['stats'])
+        return RunningStats.from_history(frame)
+
+    def history(self, user_id):
+        """
+        사용자의 전체 기록 (날짜순). 아직 기록되지 않은 대기 행도 포함합니다.
+        """
+        with self._lock:
+            self._touch(user_id)
+            self._refresh(user_id)
+            frames = [self._frames[user_id]]
+            if self._pending.get(user_id):
+                frames.append(history_frame(self._pending[user_id]))
+        return pd.concat(frames, ignore_index=True).sort_values('date', ignore_index=True)
+
+    def stats(self, user_id):
+        """
+        통계 탭용 누적 통계 (RunningStats). 세그먼트 통계의 합에 대기 행만 더하므로 기록 수와 무관하게 읽히고,
+        다른 워커가 쓴 세그먼트도 조회할 때 반영됩니다. 발자국은 현재 배출계수로 다시 계산한 값입니다.
+        """
+        with self._lock:
+            self._touch(user_id)
+            self._refresh(user_id)
+            result = RunningStats()
+            result.merge(self._stats[user_id][1])
+            pending = list(self._pending.get(user_id, []))
+        if pending:
+            result.merge(RunningStats.from_history(history_frame(pending)))
+        return result
+
+    def downsampled(self, user_id, max_points=MAX_POINTS):
+        """
+        히스토리 차트용 시계열. 기록이 max_points를 넘으면 점 수가 그 이하가 되는
+        가장 짧은 구간(일/주/월/분기/연)의 평균으로 줄입니다 (downsample). (DataFrame, 구간 이름) 반환.
+        """
+        df = self.history(user_id)
+        key = (len(df), max_points)
+        with self._lock:
+            cached = self._downsampled.get(user_id)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        result = downsample(df, max_points)
+        with self._lock:
+            if user_id in self._recent:
+                self._downsampled[user_id] = (key, result)
+        return result
+
+
+@lru_cache(maxsize=None)
+def get_history_store():
+    """
+    프로세스 공용 발자국 기록 저장소.
+    """
+    return FootprintHistoryStore()
@@ -0,0 +1,307 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+from utils.cassette import cassette_mode, mount_cassette
+
+logger = logging.getLogger(__name__)
+
+# Groq (OpenAI 호환) 설정. GROQ_API_BASE 환경 변수로 로컬 스텁 서버를 가리킬 수 있습니다.
+DEFAULT_MODEL = "llama-3.1-70b-versatile"
+API_BASE = "https://api.groq.com/openai/v1"
+
+# 연결 수립 제한 시간과 호출 전체 기한 (초). 재시도 대기까지 모두 기한 안에서 끝납니다.
+CONNECT_TIMEOUT = 3.05
+DEFAULT_DEADLINE = 60
+
+# 재시도: 연결 오류와 아래 상태 코드만, 지터를 섞은 지수 백오프로
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# keep-alive 연결 풀 크기 (동시에 LLM을 호출하는 세션 수 상한에 맞춤)
+POOL_SIZE = 16
+
+# 지연 시간 분위수 계산에 쓰는 최근 호출 수
+LATENCY_WINDOW = 1000
+
+# 제공자 한도 아래로 요청 속도를 맞추는 토큰 버킷 (분당 요청 수, 순간 최대 요청 수).
+# 워커 프로세스마다 버킷이 따로 있으므로 여러 워커로 띄우면 GROQ_REQUESTS_PER_MINUTE를 나눠 설정합니다.
+REQUESTS_PER_MINUTE = 30
+RATE_BURST = 10
+
+
+class LLMError(Exception):
+    """
+    재시도와 기한을 모두 소진한 뒤에도 LLM 응답을 받지 못했을 때 발생합니다.
+    """
+
+
+def _quantile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(int(q * len(sorted_values)), len(sorted_values) - 1)]
+
+
+class TokenBucket:
+    """
+    초당 rate개씩 최대 burst개까지 채워지는 토큰 버킷. 요청마다 토큰 하나를 씁니다.
+    토큰이 모자라면 차례를 예약하고 기다리므로 몰린 요청은 도착 순서대로 한도에 맞춰 나갑니다.
+    """
+
+    def __init__(self, rate, burst=RATE_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self, timeout=None):
+        """
+        토큰 하나를 얻을 때까지 기다립니다. timeout초 안에 차례가 오지 않으면 기다리지 않고 False.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(-(self._tokens - 1) / self.rate, 0.0)
+            if timeout is not None and wait > timeout:
+                return False
+            self._tokens -= 1
+            if wait:
+                self.waits += 1
+                self.wait_seconds += wait
+        if wait:
+            time.sleep(wait)
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {'rate_waits': self.waits, 'rate_wait_seconds': self.wait_seconds}
+
+
+class LLMMetrics:
+    """
+    호출 수, 실패/재시도 수, 토큰 사용량, 최근 호출 지연 시간 분위수.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._first_tokens = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, latency, usage=None, failed=False, retries=0, first_token=None):
+        with self._lock:
+            self.calls += 1
+            self.retries += retries
+            if failed:
+                self.failures += 1
+                return
+            self._latencies.append(latency)
+            if first_token is not None:
+                self._first_tokens.append(first_token)
+            if usage:
+                self.prompt_tokens += usage.get('prompt_tokens', 0)
+                self.completion_tokens += usage.get('completion_tokens', 0)
+
+    def snapshot(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            first_tokens = sorted(self._first_tokens)
+            stats = {
+                'calls': self.calls,
+                'failures': self.failures,
+                'retries': self.retries,
+                'prompt_tokens': self.prompt_tokens,
+                'completion_tokens': self.completion_tokens,
+            }
+        for prefix, values in (('latency', latencies), ('first_token', first_tokens)):
+            for name, q in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+                stats[f'{prefix}_{name}'] = _quantile(values, q)
+        return stats
+
+
+class LLMClient:
+    """
+    모든 페이지가 공유하는 chat completions 클라이언트.
+    keep-alive 연결 풀을 재사용하므로 클릭마다 TLS 핸드셰이크를 다시 하지 않으며,
+    호출마다 전체 기한 안에서 지터 백오프로 재시도하고 지연 시간/토큰 사용량을 집계합니다.
+    requests_per_minute를 주면 모든 호출이 토큰 버킷 하나로 요청 속도를 나눠 씁니다.
+    """
+
+    def __init__(self, api_key, base_url=API_BASE, model=DEFAULT_MODEL, pool_size=POOL_SIZE, max_retries=MAX_RETRIES,
+                 requests_per_minute=None):
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.max_retries = max_retries
+        self.rate_limiter = TokenBucket(requests_per_minute / 60) if requests_per_minute else None
+        self.metrics = LLMMetrics()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # CASSETTE_MODE가 record/replay면 응답을 녹화하거나 녹화본으로 대신합니다 (utils.cassette).
+        self.cassette = mount_cassette(self.session, 'groq', inner=adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        })
+
+    @property
+    def url(self):
+        return f"{self.base_url}/chat/completions"
+
+    def build_payload(self, prompt, temperature=None, max_tokens=None, **options):
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+        if temperature is not None:
+            payload["temperature"] = temperature
+        if max_tokens is not None:
+            payload["max_tokens"] = max_tokens
+        payload.update(options)
+        return payload
+
+    @staticmethod
+    def _backoff(attempt, retry_after=None):
+        if retry_after is not None:
+            return retry_after
+        # full jitter: 0 ~ min(상한, 기본값 * 2^시도)
+        return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+    def post(self, payload, deadline=DEFAULT_DEADLINE, stream=False):
+        """
+        기한 안에서 재시도하며 요청을 보내고 성공한 응답을 (응답, 재시도 횟수)로 반환합니다.
+        """
+        expires = time.monotonic() + deadline
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            remaining = expires - time.monotonic()
+            if remaining <= 0:
+                break
+            if self.rate_limiter is not None and not self.rate_limiter.acquire(timeout=remaining):
+                last_error = last_error or "요청 한도 대기 기한 초과"
+                break
+            remaining = expires - time.monotonic()
+            retry_after = None
+            try:
+                response = self.session.post(self.url, json=payload, stream=stream,
+                                             timeout=(min(CONNECT_TIMEOUT, remaining), remaining))
+                if response.status_code == 200:
+                    return response, attempt
+                last_error = f"HTTP {response.status_code}"
+                if response.status_code not in RETRY_STATUSES:
+                    break
+                header = response.headers.get('Retry-After')
+                retry_after = float(header) if header and header.replace('.', '', 1).isdigit() else None
+                response.close()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                last_error = str(e)
+
+            if attempt < self.max_retries:
+                delay = self._backoff(attempt, retry_after)
+                if time.monotonic() + delay >= expires:
+                    break
+                time.sleep(delay)
+        raise LLMError(f"LLM 호출 실패 ({last_error or '기한 초과'})")
+
+    def chat(self, prompt, temperature=None, max_tokens=None, deadline=DEFAULT_DEADLINE):
+        """
+        프롬프트 하나를 보내고 응답 본문 문자열을 반환합니다. 실패하면 LLMError.
+        """
+        start = time.monotonic()
+        payload = self.build_payload(prompt, temperature, max_tokens)
+        try:
+            response, retries = self.post(payload, deadline)
+            body = response.json()
+            content = body['choices'][0]['message']['content']
+        except (LLMError, ValueError, KeyError, IndexError) as e:
+            self.metrics.record(time.monotonic() - start, failed=True)
+            logger.warning(f"LLM 응답을 받지 못했습니다: {e}")
+            raise LLMError(str(e)) from e
+        self.metrics.record(time.monotonic() - start, body.get('usage'), retries=retries)
+        return content
+
+    def chat_stream(self, prompt, temperature=None, max_tokens=None, deadline=DEFAULT_DEADLINE):
+        """
+        응답을 SSE(server-sent events)로 받아 도착하는 대로 텍스트 조각을 내보내는 제너레이터.
+        전체 생성이 끝날 때까지 기다리지 않으므로 첫 토큰 지연만에 화면에 내용이 나타납니다. 실패하면 LLMError.
+        """
+        start = time.monotonic()
+        payload = self.build_payload(prompt, temperature, max_tokens, stream=True)
+        first_token = None
+        usage = None
+        retries = 0
+        try:
+            response, retries = self.post(payload, deadline, stream=True)
+            with response:
+                for line in response.iter_lines():
+                    if time.monotonic() - start > deadline:
+                        raise LLMError("스트리밍 기한 초과")
+                    if not line.startswith(b'data:'):
+                        continue
+                    data = line[len(b'data:'):].strip()
+                    if data == b'[DONE]':
+                        break
+                    chunk = json.loads(data)
+                    # Groq는 마지막 조각의 x_groq.usage에 토큰 사용량을 담습니다.
+                    usage = chunk.get('usage') or chunk.get('x_groq', {}).get('usage') or usage
+                    if not chunk.get('choices'):
+                        continue
+                    text = chunk['choices'][0].get('delta', {}).get('content')
+                    if text:
+                        if first_token is None:
+                            first_token = time.monotonic() - start
+                        yield text
+        except (LLMError, requests.RequestException, ValueError, KeyError, IndexError) as e:
+            self.metrics.record(time.monotonic() - start, failed=True, retries=retries)
+            logger.warning(f"LLM 스트리밍 응답을 받지 못했습니다: {e}")
+            raise LLMError(str(e)) from e
+        self.metrics.record(time.monotonic() - start, usage, retries=retries, first_token=first_token)
+
+    def stats(self):
+        stats = self.metrics.snapshot()
+        if self.rate_limiter is not None:
+            stats.update(self.rate_limiter.stats())
+        if self.cassette is not None:
+            stats.update({f'cassette_{name}': value for name, value in self.cassette.stats().items()})
+        return stats
+
+
+def create_llm_client(requests_per_minute=None):
+    """
+    설정으로 새 LLM 클라이언트를 만듭니다. API 키는 GROQ_API_KEY 환경 변수, 없으면 Streamlit secrets에서 읽습니다.
+    requests_per_minute가 None이면 토큰 버킷 없이 호출자가 속도를 맞춥니다 (일괄 생성 등).
+    """
+    if cassette_mode() == 'replay':
+        api_key = os.environ.get("GROQ_API_KEY", "replay")  # 재생 모드는 네트워크를 쓰지 않으므로 키가 필요 없습니다.
+    else:
+        api_key = os.environ.get("GROQ_API_KEY") or st.secrets["GROQ_API_KEY"]
+    return LLMClient(api_key, base_url=os.environ.get("GROQ_API_BASE", API_BASE),
+                     requests_per_minute=requests_per_minute)
+
+
+@lru_cache(maxsize=None)
+def get_llm_client():
+    """
+    프로세스 공용 LLM 클라이언트. 모든 세션이 같은 요청 한도(토큰 버킷)를 나눠 씁니다.
+    """
+    return create_llm_client(float(os.environ.get("GROQ_REQUESTS_PER_MINUTE", REQUESTS_PER_MINUTE)))
@@ -0,0 +1,162 @@
+import json
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = "1. 대중교통 이용을 늘립니다.\n2. 건물 에너지 효율을 높입니다.\n3. 도시 숲을 확대합니다."
+
+
+def _pieces(content):
+    # 스트리밍 조각: 앞 공백을 포함한 단어 단위
+    return re.findall(r'\s*\S+', content) or ['']
+
+
+class StubLLMServer:
+    """
+    chat completions 엔드포인트를 흉내 내는 로컬 HTTP 서버 (테스트와 오프라인 벤치마크용).
+    응답 지연, 처음 몇 번의 실패 응답을 설정할 수 있고 받은 요청 본문을 기록합니다.
+    "stream": true 요청에는 단어 단위 조각을 token_interval초 간격의 SSE로 보냅니다.
+
+        with StubLLMServer(reply="...", latency=0.2) as server:
+            client = LLMClient("test-key", base_url=server.base_url)
+    """
+
+    def __init__(self, reply=DEFAULT_REPLY, latency=0.0, failures=0, failure_status=503, port=0,
+                 token_interval=0.0):
+        self.reply = reply            # 문자열 또는 요청 본문(dict)을 받아 문자열을 돌려주는 함수
+        self.latency = latency        # 응답(스트리밍이면 첫 조각)까지의 지연
+        self.token_interval = token_interval
+        self.failures = failures
+        self.failure_status = failure_status
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/openai/v1"
+
+    def _next_failure(self):
+        with self._lock:
+            if self.failures > 0:
+                self.failures -= 1
+                return True
+            return False
+
+    def _reply_for(self, payload):
+        return self.reply(payload) if callable(self.reply) else self.reply
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, body, headers=None):
+                data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_chunk(self, data):
+                self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+                self.wfile.flush()
+
+            def _send_stream(self, payload, content, usage):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Cache-Control', 'no-cache')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                for i, piece in enumerate(_pieces(content)):
+                    if i and stub.token_interval:
+                        time.sleep(stub.token_interval)
+                    chunk = {
+                        'id': 'stub-completion',
+                        'object': 'chat.completion.chunk',
+                        'model': payload.get('model'),
+                        'choices': [{'index': 0, 'delta': {'content': piece}, 'finish_reason': None}],
+                    }
+                    self._send_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode('utf-8'))
+                final = {'id': 'stub-completion', 'object': 'chat.completion.chunk', 'model': payload.get('model'),
+                         'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}],
+                         'x_groq': {'usage': usage}}
+                self._send_chunk(f"data: {json.dumps(final)}\n\n".encode('utf-8'))
+                self._send_chunk(b"data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                with stub._lock:
+                    stub.requests.append(payload)
+
+                if not self.path.endswith('/chat/completions'):
+                    self._send_json(404, {'error': {'message': 'not found'}})
+                    return
+                if stub._next_failure():
+                    self._send_json(stub.failure_status, {'error': {'message': 'stub failure'}}, {'Retry-After': '0'})
+                    return
+
+                if stub.latency:
+                    time.sleep(stub.latency)
+                content = stub._reply_for(payload)
+                usage = {
+                    'prompt_tokens': sum(len(m.get('content', '')) for m in payload.get('messages', [])),
+                    'completion_tokens': len(content),
+                }
+                if payload.get('stream'):
+                    self._send_stream(payload, content, usage)
+                    return
+                # 일반 호출은 모든 조각이 생성될 때까지 기다린 것처럼 응답합니다.
+                if stub.token_interval:
+                    time.sleep(stub.token_interval * max(len(_pieces(content)) - 1, 0))
+                self._send_json(200, {
+                    'id': 'stub-completion',
+                    'object': 'chat.completion',
+                    'model': payload.get('model'),
+                    'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content},
+                                 'finish_reason': 'stop'}],
+                    'usage': usage,
+                })
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    # 앱을 스텁에 연결: python -m utils.llm_stub [포트] 실행 후 GROQ_API_BASE=<출력된 주소>로 앱 실행
+    server = StubLLMServer(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8090)
+    print(f"LLM 스텁 서버: {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,305 @@
+import atexit
+import glob
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from utils.dataset import DATA_DIR
+from utils.regions import get_region_registry
+
+logger = logging.getLogger(__name__)
+
+SKETCH_DIR = os.path.join(DATA_DIR, "sketches")
+
+# KLL 정확도 매개변수 (k=200이면 순위 오차 약 1%)
+SKETCH_K = 200
+
+# 이 워커의 스케치를 파일로 내보내는 주기 (초)
+FLUSH_INTERVAL = 10
+
+# 전국 스케치 키
+NATIONAL = 'national'
+
+# 워커 슬롯 수. 워커는 비어 있는 슬롯 하나를 잠그고 그 슬롯 파일을 이어서 씁니다.
+MAX_SLOTS = 64
+
+
+def _try_lock(f):
+    """
+    파일에 배타적 잠금을 겁니다 (기다리지 않음). 다른 프로세스가 잡고 있으면 OSError.
+    프로세스가 어떻게 끝나든 운영체제가 잠금을 풀어 줍니다.
+    """
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+
+
+class KLLSketch:
+    """
+    KLL 분위수 스케치. 값 n개를 O(k log(n/k)) 크기로 요약하며, 두 스케치를 합쳐도
+    같은 오차 보장이 유지되므로 지역별/워커별 스케치를 자유롭게 병합할 수 있습니다.
+    높이 h의 압축기에 있는 값 하나는 원래 값 2^h개를 대표합니다.
+    """
+
+    def __init__(self, k=SKETCH_K, c=2 / 3):
+        self.k = k
+        self.c = c
+        self.n = 0
+        self.compactors = [[]]
+        self._sorted = None
+        self._random = random.Random()
+
+    def _capacity(self, height):
+        depth = len(self.compactors) - height - 1
+        return max(int(math.ceil(self.k * self.c ** depth)), 2)
+
+    def _max_size(self):
+        return sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def _size(self):
+        return sum(len(compactor) for compactor in self.compactors)
+
+    def update(self, value):
+        self.compactors[0].append(float(value))
+        self.n += 1
+        self._sorted = None
+        if len(self.compactors[0]) >= self._capacity(0):
+            self._compress()
+
+    def _compress(self):
+        while self._size() >= self._max_size():
+            for height, compactor in enumerate(self.compactors):
+                if len(compactor) >= self._capacity(height):
+                    if height + 1 == len(self.compactors):
+                        self.compactors.append([])
+                    compactor.sort()
+                    # 홀수 개면 마지막 값 하나는 같은 높이에 남깁니다.
+                    keep = compactor[-1:] if len(compactor) % 2 else []
+                    pairs = compactor[:len(compactor) - len(keep)]
+                    self.compactors[height + 1].extend(pairs[self._random.randint(0, 1)::2])
+                    self.compactors[height] = keep
+                    break
+
+    def merge(self, other):
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append([])
+        for height, compactor in enumerate(other.compactors):
+            self.compactors[height].extend(compactor)
+        self.n += other.n
+        self._sorted = None
+        self._compress()
+
+    def _sorted_view(self):
+        # (정렬된 값, 누적 가중치) - 갱신 전까지 재사용해 조회는 이진 탐색 한 번으로 끝납니다.
+        if self._sorted is None:
+            values = np.concatenate([np.asarray(c, dtype='float64') for c in self.compactors])
+            weights = np.concatenate([np.full(len(c), 2 ** h, dtype='float64') for h, c in enumerate(self.compactors)])
+            order = np.argsort(values, kind='stable')
+            self._sorted = (values[order], np.cumsum(weights[order]))
+        return self._sorted
+
+    def rank(self, value):
+        """
+        value 이하인 값의 비율 (0~1).
+        """
+        if self.n == 0:
+            return None
+        values, cumulative = self._sorted_view()
+        position = np.searchsorted(values, value, side='right')
+        return float(cumulative[position - 1] / cumulative[-1]) if position else 0.0
+
+    def quantile(self, q):
+        if self.n == 0:
+            return None
+        values, cumulative = self._sorted_view()
+        return float(values[min(np.searchsorted(cumulative, q * cumulative[-1]), len(values) - 1)])
+
+    def to_dict(self):
+        return {'k': self.k, 'n': self.n, 'compactors': self.compactors}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(k=data['k'])
+        sketch.n = data['n']
+        sketch.compactors = [list(compactor) for compactor in data['compactors']]
+        return sketch
+
+
+class PercentileSketches:
+    """
+    지역별/전국 탄소 발자국 분포 스케치.
+    각 워커는 잠근 슬롯 파일(data/sketches/worker-<슬롯>.json)에 자기 스케치를 주기적으로 내보내고,
+    조회할 때는 자기 스케치와 다른 슬롯 파일의 스케치를 병합한 결과를 씁니다.
+    병합 결과는 어느 쪽이든 바뀌었을 때만 다시 만듭니다.
+    재시작하거나 새로 뜬 워커는 빈 슬롯의 기존 스케치를 이어받으므로 파일 수는 동시 워커 수를 넘지 않습니다.
+    """
+
+    def __init__(self, root=SKETCH_DIR, flush_interval=FLUSH_INTERVAL):
+        self.root = root
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._local = {}          # 키 -> 이 워커의 스케치
+        self._peers = {}          # 파일 경로 -> (mtime, {키: 스케치})
+        self._merged = {}         # 키 -> 병합된 스케치
+        self._last_flush = time.monotonic()
+        self._dirty = False
+        self._slot_lock = None
+        self.worker_path = self._claim_slot()
+        atexit.register(self.flush)
+
+    def _claim_slot(self):
+        """
+        비어 있는 슬롯을 잠그고 그 슬롯 파일의 스케치를 이어받습니다. 슬롯 파일 경로 반환.
+        """
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            for slot in range(MAX_SLOTS):
+                f = open(os.path.join(self.root, f"worker-{slot}.lock"), 'a+')
+                try:
+                    _try_lock(f)
+                except OSError:
+                    f.close()
+                    continue
+                self._slot_lock = f
+                path = os.path.join(self.root, f"worker-{slot}.json")
+                self._local = self._read(path) or {}
+                return path
+        except OSError as e:
+            logger.warning(f"분위수 스케치 슬롯을 잡지 못했습니다 ({self.root}): {e}")
+        # 슬롯을 잡지 못하면 이 프로세스 전용 파일을 씁니다.
+        logger.warning(f"빈 분위수 스케치 슬롯이 없어 프로세스 전용 파일을 씁니다 (슬롯 {MAX_SLOTS}개 사용 중).")
+        return os.path.join(self.root, f"worker-{os.getpid()}-{time.time_ns()}.json")
+
+    @staticmethod
+    def _read(path):
+        """
+        슬롯 파일의 {키: 스케치}. 파일이 없으면 None.
+        """
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"분위수 스케치를 읽지 못했습니다 ({path}): {e}")
+            return None
+        return {(NATIONAL if key == NATIONAL else int(key)): KLLSketch.from_dict(value) for key, value in data.items()}
+
+    def _keys_for(self, region_code):
+        keys = [NATIONAL]
+        if region_code is None:
+            return keys
+        registry = get_region_registry()
+        code = int(region_code)
+        while code is not None:
+            keys.append(code)
+            code = registry.parent_of(code) if code in registry.regions.index else None
+        return keys
+
+    def record(self, region_code, footprint):
+        """
+        제출된 탄소 발자국 하나를 해당 지역과 모든 상위 지역, 전국 스케치에 반영합니다.
+        """
+        with self._lock:
+            for key in self._keys_for(region_code):
+                self._local.setdefault(key, KLLSketch()).update(footprint)
+                self._merged.pop(key, None)
+            self._dirty = True
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {str(key): sketch.to_dict() for key, sketch in self._local.items()}
+            self._dirty = False
+            self._last_flush = time.monotonic()
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            tmp_path = f"{self.worker_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, separators=(',', ':'))
+            os.replace(tmp_path, self.worker_path)
+        except OSError as e:
+            logger.warning(f"분위수 스케치를 내보내지 못했습니다 ({self.worker_path}): {e}")
+            with self._lock:
+                self._dirty = True
+
+    def _refresh_peers(self):
+        # 잠금을 잡은 상태에서 호출됩니다. 바뀐 워커 파일만 다시 읽습니다.
+        paths = set(glob.glob(os.path.join(self.root, "worker-*.json"))) - {self.worker_path}
+        for path in paths:
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            if path in self._peers and self._peers[path][0] == mtime:
+                continue
+            sketches = self._read(path)
+            if sketches is None:
+                continue
+            self._peers[path] = (mtime, sketches)
+            self._merged.clear()
+
+    def sketch(self, key):
+        """
+        모든 워커의 제출을 병합한 스케치. 제출이 없으면 None.
+        """
+        with self._lock:
+            self._refresh_peers()
+            merged = self._merged.get(key)
+            if merged is None:
+                parts = [self._local.get(key)] + [sketches.get(key) for _, sketches in self._peers.values()]
+                parts = [part for part in parts if part is not None]
+                if not parts:
+                    return None
+                merged = KLLSketch(k=parts[0].k)
+                for part in parts:
+                    merged.merge(part)
+                self._merged[key] = merged
+            return merged
+
+    def percentile(self, footprint, region_code=None):
+        """
+        지역(없으면 전국) 제출 중 footprint 이하인 비율 (%)과 표본 수. 제출이 없으면 (None, 0).
+        """
+        sketch = self.sketch(NATIONAL if region_code is None else int(region_code))
+        if sketch is None:
+            return None, 0
+        return sketch.rank(footprint) * 100, sketch.n
+
+    def median(self, region_code=None, min_samples=1):
+        """
+        지역 사용자 제출의 중앙값. 제출이 min_samples보다 적으면 상위 지역, 전국 순으로 올라갑니다.
+        (중앙값, 키(지역코드 또는 NATIONAL), 표본 수). 어디에도 충분한 제출이 없으면 None.
+        """
+        keys = self._keys_for(region_code)
+        for key in keys[1:] + keys[:1]:
+            sketch = self.sketch(key)
+            if sketch is not None and sketch.n >= min_samples:
+                return sketch.quantile(0.5), key, sketch.n
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_percentile_sketches():
+    """
+    프로세스 공용 분위수 스케치.
+    """
+    return PercentileSketches()
@@ -0,0 +1,177 @@
+import glob
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import pyogrio
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+PROVINCE_DBF = os.path.join(DATA_DIR, "ctprvn.dbf")
+SIGUNGU_DBF_PATTERN = os.path.join(DATA_DIR, "LARD_ADM_SECT_SGG_*.dbf")
+
+# 광역 행정구역 명칭 접미사 (긴 것부터 검사). 이름 끝에서만 제거합니다.
+PROVINCE_SUFFIXES = ['특별자치시', '특별자치도', '특별시', '광역시', '도']
+
+# 개편 전 명칭 및 통용 약칭
+PROVINCE_ALIASES = {
+    '강원도': 51,
+    '전라북도': 52,
+    '제주도': 50,
+    '충북': 43,
+    '충남': 44,
+    '전남': 46,
+    '경북': 47,
+    '경남': 48,
+    '전북': 52,
+}
+
+
+def normalize_name(name):
+    """
+    공백을 모두 제거한 비교용 이름.
+    """
+    return re.sub(r'\s+', '', str(name))
+
+
+def short_province_name(name):
+    """
+    '서울특별시' -> '서울', '경기도' -> '경기'. 접미사는 이름 끝에서만 한 번 제거합니다.
+    """
+    name = name.strip()
+    for suffix in PROVINCE_SUFFIXES:
+        if name.endswith(suffix) and len(name) > len(suffix) + 1:
+            return name[:-len(suffix)]
+    return name
+
+
+class RegionRegistry:
+    """
+    행정구역 코드(CTPRVN_CD, ADM_SECT_C)와 명칭 변형을 잇는 색인.
+    광역(2자리), 시(5자리, 구를 가진 시), 시군구(5자리) 코드는 서로 겹치지 않으므로
+    모두 하나의 정수 키 공간을 씁니다.
+    """
+
+    def __init__(self, regions):
+        # regions: code, name, level('province' | 'si' | 'sigungu'), parent_code, province_code
+        self.regions = regions.set_index('code', drop=False).sort_index()
+        self._aliases = {}
+        for row in regions.itertuples(index=False):
+            for alias in self._name_variants(row):
+                self._aliases.setdefault(normalize_name(alias), row.code)
+        for alias, code in PROVINCE_ALIASES.items():
+            if code in self.regions.index:
+                self._aliases.setdefault(normalize_name(alias), code)
+
+    def _name_variants(self, row):
+        yield row.name
+        if row.level == 'province':
+            yield short_province_name(row.name)
+        else:
+            province_name = self.regions.at[row.province_code, 'name'] if row.province_code in self.regions.index else ''
+            yield f"{province_name} {row.name}"
+            yield f"{short_province_name(province_name)} {row.name}"
+
+    def code_for(self, name):
+        """
+        명칭 변형 하나를 코드로 바꿉니다. 모르는 이름이면 None.
+        """
+        return self._aliases.get(normalize_name(name))
+
+    def codes_for(self, names):
+        """
+        명칭 컬럼 전체를 코드(Int64)로 바꿉니다. 고유값 단위로만 조회합니다.
+        """
+        names = pd.Series(names)
+        unique = names.drop_duplicates()
+        lookup = dict(zip(unique, (self.code_for(name) for name in unique)))
+        return names.map(lookup).astype('Int64')
+
+    def name_for(self, code):
+        return self.regions.at[code, 'name']
+
+    def parent_of(self, code):
+        parent = self.regions.at[code, 'parent_code']
+        return None if pd.isna(parent) else int(parent)
+
+    def children_of(self, code):
+        return self.regions.index[self.regions['parent_code'] == code].tolist()
+
+    def match_codes(self, feature_codes, data_codes):
+        """
+        지도 feature 코드마다 대응하는 데이터 코드를 찾습니다.
+        feature 자신의 코드가 데이터에 없으면 상위 행정구역 코드로 대체합니다
+        (예: 데이터는 '부천시' 한 행, 경계는 원미구/소사구/오정구).
+        대응이 없으면 -1.
+        """
+        feature_codes = np.asarray(feature_codes, dtype=np.int64)
+        data_codes = np.asarray(pd.Series(data_codes).dropna(), dtype=np.int64)
+        parents = self.regions['parent_code'].reindex(feature_codes).fillna(-1).to_numpy(dtype=np.int64)
+
+        matched = np.where(np.isin(feature_codes, data_codes), feature_codes, -1)
+        fallback = (matched == -1) & np.isin(parents, data_codes)
+        matched[fallback] = parents[fallback]
+        return matched
+
+
+def _read_provinces():
+    frame = pyogrio.read_dataframe(PROVINCE_DBF, read_geometry=False, encoding='cp949')
+    return pd.DataFrame({
+        'code': frame['CTPRVN_CD'].astype(int),
+        'name': frame['CTP_KOR_NM'].str.strip(),
+        'level': 'province',
+        'parent_code': pd.NA,
+        'province_code': frame['CTPRVN_CD'].astype(int),
+    })
+
+
+def _read_sigungu(path):
+    frame = pyogrio.read_dataframe(path, read_geometry=False)
+    code = frame['ADM_SECT_C'].astype(int)
+    parent = frame['COL_ADM_SE'].astype(int)
+    # 'SGG_NM'은 '경기도 수원시 장안구' 형식이므로 광역 명칭을 떼어냅니다.
+    parts = frame['SGG_NM'].str.strip().str.split(' ', n=1)
+    local_name = parts.str[1].fillna(parts.str[0])
+    province_code = code // 1000
+
+    sigungu = pd.DataFrame({
+        'code': code,
+        'name': local_name,
+        'level': 'sigungu',
+        'parent_code': parent.where(parent != code, province_code),
+        'province_code': province_code,
+    })
+
+    # 구를 가진 시(예: 수원시 41110)는 경계 파일에 별도 행이 없으므로 구 명칭에서 만듭니다.
+    districts = sigungu[parent != code]
+    si = pd.DataFrame({
+        'code': parent[parent != code],
+        'name': districts['name'].str.split(' ').str[0],
+        'level': 'si',
+        'parent_code': districts['province_code'],
+        'province_code': districts['province_code'],
+    }).drop_duplicates('code')
+
+    return pd.concat([sigungu, si], ignore_index=True)
+
+
+def registry_files():
+    """
+    행정구역 색인을 만드는 속성표(.dbf) 파일 목록 (광역, 시군구 순).
+    """
+    return [PROVINCE_DBF] + sorted(glob.glob(SIGUNGU_DBF_PATTERN))
+
+
+@lru_cache(maxsize=None)
+def get_region_registry():
+    """
+    데이터 폴더의 Shapefile 속성표(.dbf)로 만든 행정구역 색인 (프로세스당 한 번 생성).
+    """
+    frames = [_read_provinces()]
+    for path in sorted(glob.glob(SIGUNGU_DBF_PATTERN)):
+        frames.append(_read_sigungu(path))
+    regions = pd.concat(frames, ignore_index=True)
+    regions['parent_code'] = regions['parent_code'].astype('Int64')
+    return RegionRegistry(regions)
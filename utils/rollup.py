@@ -0,0 +1,125 @@
+import threading
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from utils.data_processor import get_emissions_store
+from utils.dataset import ABSORPTION_COLUMN, EMISSION_COLUMNS, add_derived_columns, read_only_frame
+from utils.regions import get_region_registry
+
+# 집계 대상 지표. 모두 합산 가능한 값이므로 상위 행정구역 값은 하위 값의 합입니다.
+ROLLUP_MEASURES = EMISSION_COLUMNS + [ABSORPTION_COLUMN, '총배출량', '순배출량']
+
+
+class RollupCube:
+    """
+    행정구역 계층(시군구 -> 시 -> 광역) x 부문 x 연도 사전 집계 큐브.
+    연도를 추가할 때 각 행을 자신과 모든 상위 코드에 한 번씩 더해 두므로,
+    지도/시각화 페이지의 드릴다운과 롤업은 렌더링 시점에 groupby 없이 사전 조회로 끝납니다.
+    """
+
+    def __init__(self, registry, measures=ROLLUP_MEASURES):
+        self.registry = registry
+        self.measures = list(measures)
+        self._lock = threading.Lock()
+        self._years = []
+        self._cells = {}      # (지역코드, 연도) -> 지표 값 Series
+        self._children = {}   # (지역코드, 연도) -> 하위 지역 DataFrame
+
+    def _ancestors(self, code):
+        while code is not None:
+            yield code
+            code = self.registry.parent_of(code) if code in self.registry.regions.index else None
+
+    def add_year(self, year, df):
+        """
+        한 해의 지역별 데이터(지역코드 + 지표 컬럼)를 큐브에 적재합니다.
+        """
+        rows = df.dropna(subset=['지역코드'])
+        values = rows[self.measures].to_numpy(dtype='float64')
+
+        sums = {}
+        parents = {}
+        for code, row in zip(rows['지역코드'].astype(int), values):
+            child = None
+            for ancestor in self._ancestors(code):
+                if ancestor in sums:
+                    sums[ancestor] += row
+                else:
+                    sums[ancestor] = row.copy()
+                if child is not None:
+                    parents.setdefault(ancestor, set()).add(child)
+                child = ancestor
+
+        cells = {}
+        for code, total in sums.items():
+            total.flags.writeable = False
+            cells[(code, year)] = pd.Series(total, index=self.measures, name=code)
+
+        children = {}
+        for parent, codes in parents.items():
+            codes = sorted(codes)
+            frame = pd.DataFrame(np.vstack([sums[code] for code in codes]), columns=self.measures)
+            frame.insert(0, '지자체명', [self.registry.name_for(code) for code in codes])
+            frame.insert(0, '지역코드', pd.array(codes, dtype='Int64'))
+            children[(parent, year)] = read_only_frame(add_derived_columns(frame))
+
+        with self._lock:
+            if year in self._years:
+                return
+            self._cells.update(cells)
+            self._children.update(children)
+            self._years = sorted(self._years + [year])
+
+    def years(self):
+        return list(self._years)
+
+    def latest_year(self):
+        return self._years[-1] if self._years else None
+
+    def cell(self, region_code, year):
+        """
+        지역(시군구/시/광역)의 연도별 지표 값. 데이터가 없으면 None.
+        """
+        return self._cells.get((int(region_code), year))
+
+    def value(self, region_code, year, measure):
+        cell = self.cell(region_code, year)
+        return None if cell is None else float(cell[measure])
+
+    def children(self, region_code, year):
+        """
+        바로 아래 단계 지역들의 지표 표 (예: 경기도 -> 시군, 수원시 -> 구). 없으면 빈 표.
+        비율 지표(탄소중립달성도)는 합산하지 않고 집계된 값으로 다시 계산해 둡니다.
+        """
+        frame = self._children.get((int(region_code), year))
+        if frame is None:
+            return pd.DataFrame(columns=['지역코드', '지자체명'] + self.measures)
+        return frame.copy(deep=False)
+
+    def rollup(self, region_code, year):
+        """
+        상위 행정구역의 (코드, 지표 값). 최상위면 (None, None).
+        """
+        parent = self.registry.parent_of(int(region_code))
+        if parent is None:
+            return None, None
+        return parent, self.cell(parent, year)
+
+
+@lru_cache(maxsize=None)
+def _gyeonggi_cube():
+    return RollupCube(get_region_registry())
+
+
+def get_rollup_cube():
+    """
+    프로세스 공용 경기도 큐브. 저장소에 새 연도가 적재되었으면 그 연도만 추가로 집계합니다.
+    """
+    cube = _gyeonggi_cube()
+    store = get_emissions_store()
+    for year in store.years('gyeonggi'):
+        if year not in cube.years():
+            cube.add_year(year, store.partition('gyeonggi', year))
+    return cube
@@ -0,0 +1,142 @@
+import numpy as np
+import pandas as pd
+
+from utils.footprint import INPUT_COLUMNS, TOTAL_COLUMN, recompute_footprints
+
+# 누적 통계 대상 컬럼
+STATS_COLUMNS = ['footprint'] + INPUT_COLUMNS
+
+# 탄소 발자국 분포 히스토그램 고정 구간 (톤 CO2e). 범위를 벗어난 값은 양 끝 구간에 넣습니다.
+HISTOGRAM_EDGES = np.linspace(0, 20, 41)
+
+
+class RunningStats:
+    """
+    기록 하나가 추가될 때마다 O(1)로 갱신되는 누적 통계.
+    Welford 방식의 평균/공동 적률 행렬(분산과 상관계수), 최솟값/최댓값, 고정 구간 히스토그램을 유지하므로
+    통계 탭은 기록 수와 무관하게 일정한 시간에 읽힙니다.
+    """
+
+    def __init__(self, size=len(STATS_COLUMNS), edges=HISTOGRAM_EDGES):
+        self.count = 0
+        self.mean = np.zeros(size)
+        self.comoment = np.zeros((size, size))
+        self.minimum = np.full(size, np.inf)
+        self.maximum = np.full(size, -np.inf)
+        self.edges = edges
+        self.histogram = np.zeros(len(edges) - 1, dtype=np.int64)
+
+    def _bin(self, value):
+        return min(max(np.searchsorted(self.edges, value, side='right') - 1, 0), len(self.histogram) - 1)
+
+    def update(self, values):
+        """
+        기록 하나 (STATS_COLUMNS 순서의 값) 를 반영합니다.
+        """
+        values = np.asarray(values, dtype='float64')
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self.comoment += np.outer(delta, values - self.mean)
+        np.minimum(self.minimum, values, out=self.minimum)
+        np.maximum(self.maximum, values, out=self.maximum)
+        self.histogram[self._bin(values[0])] += 1
+
+    def merge(self, other):
+        """
+        다른 누적 통계(예: 다른 묶음에서 계산한 값)를 합칩니다 (Chan의 병렬 공식).
+        """
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.comoment += other.comoment + np.outer(delta, delta) * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        np.minimum(self.minimum, other.minimum, out=self.minimum)
+        np.maximum(self.maximum, other.maximum, out=self.maximum)
+        self.histogram += other.histogram
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        기존 기록 전체로 한 번에 초기화합니다 (배열 연산).
+        """
+        stats = cls()
+        values = df[STATS_COLUMNS].to_numpy(dtype='float64')
+        if len(values) == 0:
+            return stats
+        stats.count = len(values)
+        stats.mean = values.mean(axis=0)
+        centered = values - stats.mean
+        stats.comoment = centered.T @ centered
+        stats.minimum = values.min(axis=0)
+        stats.maximum = values.max(axis=0)
+        bins = np.clip(np.searchsorted(stats.edges, values[:, 0], side='right') - 1, 0, len(stats.histogram) - 1)
+        stats.histogram = np.bincount(bins, minlength=len(stats.histogram))
+        return stats
+
+    @classmethod
+    def from_history(cls, df):
+        """
+        저장된 기록으로 초기화합니다. 발자국은 저장 당시 값이 아니라 현재 배출계수 표로 다시 계산한 값이므로
+        히스토리 탭(recompute_footprints)과 같은 수치가 나옵니다.
+        """
+        if len(df) == 0:
+            return cls()
+        return cls.from_frame(df.assign(footprint=recompute_footprints(df)[TOTAL_COLUMN]))
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mean': self.mean.tolist(),
+            'comoment': self.comoment.tolist(),
+            'minimum': self.minimum.tolist(),
+            'maximum': self.maximum.tolist(),
+            'histogram': self.histogram.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(len(data['mean']))
+        stats.count = data['count']
+        stats.mean = np.array(data['mean'], dtype='float64')
+        stats.comoment = np.array(data['comoment'], dtype='float64')
+        stats.minimum = np.array(data['minimum'], dtype='float64')
+        stats.maximum = np.array(data['maximum'], dtype='float64')
+        stats.histogram = np.array(data['histogram'], dtype=np.int64)
+        return stats
+
+    def variance(self):
+        if self.count < 2:
+            return np.full(len(self.mean), np.nan)
+        return np.diag(self.comoment) / (self.count - 1)
+
+    def correlation(self):
+        """
+        STATS_COLUMNS 간 상관계수 행렬 (DataFrame). 분산이 0인 컬럼은 NaN.
+        """
+        scale = np.sqrt(np.diag(self.comoment))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            matrix = self.comoment / np.outer(scale, scale)
+        return pd.DataFrame(matrix, index=STATS_COLUMNS, columns=STATS_COLUMNS)
+
+    def summary(self, column='footprint'):
+        i = STATS_COLUMNS.index(column)
+        return {
+            'count': self.count,
+            'mean': float(self.mean[i]),
+            'std': float(np.sqrt(self.variance()[i])),
+            'min': float(self.minimum[i]),
+            'max': float(self.maximum[i]),
+        }
+
+    def histogram_frame(self):
+        return pd.DataFrame({
+            'footprint': (self.edges[:-1] + self.edges[1:]) / 2,
+            'count': self.histogram,
+        })
+
+    def column_means(self, columns=INPUT_COLUMNS):
+        return pd.Series([self.mean[STATS_COLUMNS.index(column)] for column in columns], index=columns)
+
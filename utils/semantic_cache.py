@@ -0,0 +1,144 @@
+import logging
+import math
+import os
+import re
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 이 거리(특징마다 데이터셋 표준편차로 나눈 눈금) 안의 이전 요청이 있으면 LLM을 부르지 않고
+# 그 응답을 (출처를 밝혀) 재사용합니다. 0이면 끕니다.
+# 재사용한 답은 다른 지역에 대한 제안이므로 모든 성분이 거의 같은 경우만 허용합니다. 경기도 지자체의
+# 최근접 이웃 거리는 0.37~2.1이라 재사용되지 않고, 광역 단위에서는 충청북도와 전라남도(0.03)가 해당합니다.
+MAX_DISTANCE = 0.1
+
+# 응답 공간(이름공간)마다 기억하는 요청 수. 넘치면 가장 먼저 넣은 것부터 지웁니다.
+MAX_ENTRIES = 1024
+
+# 배출 트렌드 설명에서 변화율(%)을 꺼내는 패턴 (utils.data_processor._describe_trend 문구)
+TREND_PATTERN = re.compile(r'(-?\d+(?:\.\d+)?)%')
+
+
+def _raw_features(emissions_data):
+    # 부문별 비중(합이 1), 총배출량의 log10, 트렌드 변화율(비율)
+    sectors = np.array([float(v) for v in emissions_data['sector_breakdown'].values()])
+    total_share = np.abs(sectors).sum()
+    shares = sectors / total_share if total_share else sectors
+    match = TREND_PATTERN.search(emissions_data['trend'])
+    trend = float(match.group(1)) / 100 if match else 0.0
+    return np.r_[shares, math.log10(max(emissions_data['total_emissions'], 1.0)), trend]
+
+
+def feature_scales(inputs):
+    """
+    데이터셋 전체 입력(emissions_data 목록)에서 구한 특징별 표준편차.
+    """
+    return np.vstack([_raw_features(emissions_data) for emissions_data in inputs]).std(axis=0)
+
+
+def emissions_features(emissions_data, scales):
+    """
+    정책 제안 입력(emissions_data)의 특징 벡터: 부문별 비중, 총배출량의 log10, 트렌드 변화율을
+    각각 데이터셋 전체의 표준편차(scales, feature_scales)로 나눈 값.
+    눈금이 다른 성분(합이 1인 비중과 log 규모) 중 하나가 거리를 좌우하지 않게 맞추며,
+    모든 지역에서 값이 같은 특징(연도가 하나뿐일 때의 트렌드 등)은 뺍니다.
+    """
+    keep = scales > 0
+    return _raw_features(emissions_data)[keep] / scales[keep]
+
+
+class VectorIndex:
+    """
+    작은 메모리 내 최근접 이웃 색인 (행렬 하나에 전수 비교). 수백~수천 개 벡터에서는 밀리초 이하입니다.
+    """
+
+    def __init__(self, dimension, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._vectors = np.empty((0, dimension))
+        self._items = []
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, vector, item):
+        self._vectors = np.vstack([self._vectors, vector])[-self.max_entries:]
+        self._items = (self._items + [item])[-self.max_entries:]
+
+    def nearest(self, vector):
+        """
+        가장 가까운 (항목, 거리). 비어 있으면 (None, inf).
+        """
+        if not self._items:
+            return None, math.inf
+        distances = np.linalg.norm(self._vectors - vector, axis=1)
+        i = int(distances.argmin())
+        return self._items[i], float(distances[i])
+
+
+class SemanticCache:
+    """
+    입력 특징 벡터가 가까운 이전 요청의 응답을 재사용하는 캐시.
+    이름공간(모델, 프롬프트 버전, 데이터셋 지문, 부문 구성)마다 색인을 따로 두고, 적중하면 원래 응답과
+    그 응답을 받은 지역을 그대로 돌려줍니다 (지역별 수치가 다르므로 고쳐 쓰지 않습니다).
+    적중률과 아낀 LLM 시간(재사용한 응답을 LLM이 생성하는 데 걸린 시간의 합)을 셉니다.
+    """
+
+    def __init__(self, max_distance=MAX_DISTANCE, max_entries=MAX_ENTRIES):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._indexes = {}   # 이름공간 -> VectorIndex of (지역, 응답, LLM 시간)
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    def lookup(self, namespace, vector):
+        """
+        거리 안에 이전 응답이 있으면 (응답, 응답을 받은 지역, 거리), 없으면 None.
+        """
+        if self.max_distance <= 0:
+            return None
+        with self._lock:
+            index = self._indexes.get(namespace)
+            item, distance = index.nearest(vector) if index is not None else (None, math.inf)
+            if item is None or distance > self.max_distance:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.saved_seconds += item[2]
+        source, response, _ = item
+        return response, source, distance
+
+    def add(self, namespace, vector, region, response, seconds):
+        """
+        LLM이 seconds초 걸려 생성한 region의 응답을 색인에 넣습니다.
+        """
+        with self._lock:
+            index = self._indexes.get(namespace)
+            if index is None:
+                index = self._indexes[namespace] = VectorIndex(len(vector), self.max_entries)
+            index.add(vector, (region, response, seconds))
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': sum(len(index) for index in self._indexes.values()),
+                'max_distance': self.max_distance,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'saved_seconds': self.saved_seconds,
+            }
+
+
+@lru_cache(maxsize=None)
+def get_semantic_cache():
+    """
+    프로세스 공용 유사 요청 캐시. 거리 기준은 SEMANTIC_CACHE_DISTANCE 환경 변수로 바꿀 수 있습니다 (0이면 끔).
+    """
+    distance = os.environ.get("SEMANTIC_CACHE_DISTANCE")
+    return SemanticCache(float(distance) if distance else MAX_DISTANCE)
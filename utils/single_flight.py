@@ -0,0 +1,100 @@
+import threading
+from functools import lru_cache
+
+
+class _Flight:
+    """
+    진행 중인 요청 하나. 생산 스레드가 받은 조각을 쌓고, 기다리는 호출자들은 같은 조각을 차례로 읽습니다.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.done = False
+        self.error = None
+        self.condition = threading.Condition()
+
+
+class SingleFlight:
+    """
+    같은 키의 동시 요청 합치기 (single-flight).
+    키마다 처음 온 요청만 실제로 실행하고, 그 사이 같은 키로 들어온 호출자는 새 요청을 보내지 않고
+    진행 중인 결과를 함께 받습니다. 스트리밍 응답은 도착한 조각부터 모든 호출자에게 전달됩니다.
+    실행은 별도 스레드에서 하므로 한 호출자가 중간에 읽기를 그만둬도 나머지는 끝까지 받습니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.flights = 0      # 실제로 실행한 요청 수
+        self.coalesced = 0    # 진행 중인 요청에 합류한 호출 수
+
+    def stream(self, key, factory):
+        """
+        factory()가 내보내는 조각을 차례로 내보내는 반복자. 같은 키가 진행 중이면 그 결과에 합류합니다.
+        factory()가 예외를 내면 합류한 모든 호출자에게 같은 예외를 냅니다.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                self.flights += 1
+                threading.Thread(target=self._run, args=(key, flight, factory), daemon=True).start()
+            else:
+                self.coalesced += 1
+        return self._follow(flight)
+
+    def do(self, key, call):
+        """
+        stream()의 단일 값 버전: call()의 결과를 반환합니다.
+        """
+        return "".join(self.stream(key, lambda: iter([call()])))
+
+    def _run(self, key, flight, factory):
+        try:
+            for part in factory():
+                with flight.condition:
+                    flight.parts.append(part)
+                    flight.condition.notify_all()
+        except Exception as e:
+            flight.error = e
+        finally:
+            # 키를 먼저 비워 이후 요청은 (캐시에 저장된) 새 결과를 쓰게 합니다.
+            with self._lock:
+                self._flights.pop(key, None)
+            with flight.condition:
+                flight.done = True
+                flight.condition.notify_all()
+
+    @staticmethod
+    def _follow(flight):
+        position = 0
+        while True:
+            with flight.condition:
+                while position >= len(flight.parts) and not flight.done:
+                    flight.condition.wait()
+                parts = flight.parts[position:]
+                position = len(flight.parts)
+                done, error = flight.done, flight.error
+            yield from parts
+            if done:
+                if error is not None:
+                    raise error
+                return
+
+    def stats(self):
+        with self._lock:
+            total = self.flights + self.coalesced
+            return {
+                'in_flight': len(self._flights),
+                'flights': self.flights,
+                'coalesced': self.coalesced,
+                'coalesce_rate': self.coalesced / total if total else 0.0,
+            }
+
+
+@lru_cache(maxsize=None)
+def get_single_flight():
+    """
+    프로세스 공용 요청 합치기 (모든 세션이 공유).
+    """
+    return SingleFlight()
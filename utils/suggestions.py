@@ -0,0 +1,329 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from functools import lru_cache
+
+from utils.ai_cache import get_ai_cache, make_key, stream_and_cache
+from utils.ai_helper import get_policy_suggestions
+from utils.data_processor import STORE_DIR, analyze_region_trend, get_emissions_store
+from utils.dataset import dataset_version
+from utils.llm_client import LLMError, create_llm_client, get_llm_client
+from utils.semantic_cache import emissions_features, feature_scales, get_semantic_cache
+
+logger = logging.getLogger(__name__)
+
+SUGGESTIONS_PATH = os.path.join(STORE_DIR, "suggestions.sqlite")
+
+# 프롬프트 문구를 바꾸면 올려서 기존 사전 생성 결과를 새 버전과 구분합니다.
+PROMPT_VERSION = 1
+
+# 데이터셋별 (지역명 컬럼, 총배출량 컬럼, 부문별 비중에 넣을 컬럼)
+POLICY_COLUMNS = {
+    'gyeonggi': ('지자체명', '총배출량', ['배출_건물_전기', '배출_건물_지역난방', '배출_건물_가스', '탄소배출_수송']),
+    'national': ('시도별', '탄소배출량', ['탄소흡수량', '순배출량']),
+}
+
+# 일괄 생성 기본값: 초당 요청 수, 동시 요청 수 (초당 요청 수는 제공자 한도 안에서 정합니다)
+BATCH_RATE = 2.0
+BATCH_CONCURRENCY = 8
+
+
+def build_emissions_data(row, trend, dataset='gyeonggi'):
+    """
+    지역 한 행과 트렌드 설명으로 정책 제안 프롬프트에 넣을 값을 만듭니다.
+    페이지와 일괄 생성이 같은 프롬프트를 만들도록 숫자는 모두 float로 맞춥니다.
+    """
+    _, total_column, sector_columns = POLICY_COLUMNS[dataset]
+    return {
+        'total_emissions': float(row[total_column]),
+        'trend': trend,
+        'sector_breakdown': {column: float(row[column]) for column in sector_columns},
+    }
+
+
+def policy_prompt(region, emissions_data):
+    return f"""
+    지역: {region}
+    총 탄소 배출량: {emissions_data['total_emissions']}
+    배출 트렌드: {emissions_data['trend']}
+    부문별 배출 비중: {emissions_data['sector_breakdown']}
+
+    위 정보를 바탕으로 {region}의 탄소 배출량을 줄이기 위한 구체적인 정책을 5개 제안해주세요.
+    각 정책은 지역 특성을 고려하고, 실행 가능해야 합니다.
+    천천히 답변해도 좋으니 모든 답변 내용을 리뷰해서 100퍼센트 한글로만 답변해 주세요. 특히 한자와 일본어는 반드시 한글로 번역해서 답변해줘.
+    """
+
+
+def dataset_for(emissions_data):
+    """
+    부문 구성으로 알아낸 emissions_data의 데이터셋 이름.
+    """
+    sectors = list(emissions_data['sector_breakdown'])
+    for dataset, (_, _, columns) in POLICY_COLUMNS.items():
+        if columns == sectors:
+            return dataset
+    raise ValueError(f"부문 구성에 맞는 데이터셋이 없습니다: {sectors}")
+
+
+def policy_namespace(model, emissions_data):
+    """
+    유사 요청 캐시의 이름공간: 모델, 프롬프트 버전, 데이터셋 지문, 부문 구성.
+    데이터가 갱신되면 지문이 바뀌므로 이전 데이터로 만든 제안을 재사용하지 않습니다.
+    """
+    return (model, PROMPT_VERSION, dataset_version(), tuple(emissions_data['sector_breakdown']))
+
+
+def suggestions_version(model):
+    """
+    사전 생성 결과의 버전: 데이터셋 지문, 모델, 프롬프트 버전.
+    """
+    return f"{dataset_version()}-{model}-p{PROMPT_VERSION}"
+
+
+class SuggestionStore:
+    """
+    지역별 사전 생성 정책 제안 표 (SQLite).
+    행마다 버전과 프롬프트 키(모델/정규화한 프롬프트/데이터셋 지문의 해시)를 함께 저장하므로,
+    페이지가 만든 프롬프트가 생성 당시와 정확히 같을 때만 저장된 제안을 돌려줍니다.
+    """
+
+    def __init__(self, path=SUGGESTIONS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self):
+        # 잠금을 잡은 상태에서 호출됩니다.
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS suggestions (
+                    version TEXT NOT NULL,
+                    dataset TEXT NOT NULL,
+                    region_code INTEGER NOT NULL,
+                    region TEXT NOT NULL,
+                    prompt_key TEXT NOT NULL,
+                    suggestion TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    PRIMARY KEY (version, dataset, region_code)
+                )""")
+            db.execute("CREATE INDEX IF NOT EXISTS suggestions_prompt_key ON suggestions (prompt_key)")
+            self._db = db
+        return self._db
+
+    def put(self, version, dataset, region_code, region, prompt_key, suggestion):
+        with self._lock:
+            self._connect().execute("INSERT OR REPLACE INTO suggestions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                    (version, dataset, int(region_code), region, prompt_key, suggestion, time.time()))
+
+    def region_codes(self, version, dataset):
+        with self._lock:
+            rows = self._connect().execute("SELECT region_code FROM suggestions WHERE version = ? AND dataset = ?",
+                                           (version, dataset)).fetchall()
+        return {row[0] for row in rows}
+
+    def lookup(self, prompt_key):
+        """
+        프롬프트 키에 해당하는 사전 생성 제안. 없으면 None.
+        """
+        try:
+            with self._lock:
+                row = self._connect().execute("SELECT suggestion FROM suggestions WHERE prompt_key = ? LIMIT 1",
+                                              (prompt_key,)).fetchone()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"사전 생성 정책 제안을 읽지 못했습니다 ({self.path}): {e}")
+            row = None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0]
+
+    def versions(self):
+        with self._lock:
+            return self._connect().execute(
+                "SELECT version, dataset, COUNT(*) FROM suggestions GROUP BY version, dataset").fetchall()
+
+    def prune(self, keep_version):
+        """
+        keep_version이 아닌 버전의 제안을 지웁니다.
+        """
+        with self._lock:
+            self._connect().execute("DELETE FROM suggestions WHERE version != ?", (keep_version,))
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / total if total else 0.0}
+
+
+@lru_cache(maxsize=None)
+def get_suggestion_store():
+    """
+    프로세스 공용 사전 생성 정책 제안 표.
+    """
+    return SuggestionStore()
+
+
+def stream_policy_suggestions(region, emissions_data):
+    """
+    사전 생성된 제안, 같은 프롬프트의 캐시된 응답, 입력이 거의 같은 지역의 제안 순으로 찾아 있으면 바로,
+    없으면 LLM 응답을 스트리밍으로 내보냅니다. 실패하면 LLMError.
+    """
+    prompt = policy_prompt(region, emissions_data)
+    model = get_llm_client().model
+    key = make_key(model, prompt, dataset_version())
+    suggestion = get_suggestion_store().lookup(key)
+    if suggestion is None:
+        suggestion = get_ai_cache().get(key)
+    if suggestion is not None:
+        yield suggestion
+        return
+
+    # 부문 구성과 규모, 트렌드가 거의 같은 지역의 제안이 있으면 그 지역의 제안임을 밝히고 그대로 보여줍니다.
+    semantic_cache = get_semantic_cache()
+    namespace = policy_namespace(model, emissions_data)
+    scales = policy_feature_scales(dataset_for(emissions_data), dataset_version())
+    vector = emissions_features(emissions_data, scales)
+    similar = semantic_cache.lookup(namespace, vector)
+    if similar is not None:
+        response, source, _ = similar
+        if source != region:
+            response = (f"*{region}이 아니라 배출 구성이 비슷한 **{source}**에 대해 만든 제안입니다. "
+                        f"제안 속 수치와 지역 특성은 {source} 기준입니다.*\n\n{response}")
+        yield response
+        return
+
+    # LLM이 실제로 끝까지 생성한 응답만 생성 시간과 함께 색인에 넣습니다.
+    start = time.monotonic()
+    parts = []
+    for part in stream_and_cache(key, prompt):
+        parts.append(part)
+        yield part
+    semantic_cache.add(namespace, vector, region, "".join(parts), time.monotonic() - start)
+
+
+def fallback_policy_suggestions(region, emissions_data):
+    """
+    LLM이 늦거나 실패할 때 보여 줄 로컬 템플릿 정책 제안 (utils.ai_helper).
+    부문별 배출량을 템플릿이 쓰는 부문 이름과 천톤 단위로 묶어 넘깁니다.
+    """
+    sectors = {}
+    for column, value in emissions_data['sector_breakdown'].items():
+        sector = '건물' if column.startswith('배출_건물') else '수송' if column.endswith('수송') else column
+        sectors[sector] = round(sectors.get(sector, 0) + value / 1000, 1)
+    return "\n".join(f"- {policy}" for policy in get_policy_suggestions(region, sectors))
+
+
+def policy_inputs(dataset='gyeonggi'):
+    """
+    저장소 최신 연도의 모든 지역에 대해 (지역코드, 지역명, emissions_data) 목록을 만듭니다.
+    """
+    store = get_emissions_store()
+    df = store.partition(dataset, store.latest_year(dataset))
+    name_column = POLICY_COLUMNS[dataset][0]
+    inputs = []
+    for _, row in df.dropna(subset=['지역코드']).iterrows():
+        code = int(row['지역코드'])
+        inputs.append((code, row[name_column],
+                       build_emissions_data(row, analyze_region_trend(code, dataset=dataset), dataset)))
+    return inputs
+
+
+def policy_jobs(dataset='gyeonggi'):
+    """
+    저장소 최신 연도의 모든 지역에 대해 (지역코드, 지역명, 프롬프트) 목록을 만듭니다.
+    """
+    return [(code, region, policy_prompt(region, emissions_data))
+            for code, region, emissions_data in policy_inputs(dataset)]
+
+
+@lru_cache(maxsize=None)
+def policy_feature_scales(dataset, version):
+    """
+    데이터셋 모든 지역 입력의 특징별 표준편차 (유사 요청 캐시의 거리 눈금). version은 데이터셋 지문입니다.
+    """
+    return feature_scales([emissions_data for _, _, emissions_data in policy_inputs(dataset)])
+
+
+class AsyncRateLimiter:
+    """
+    요청 시작 간격을 1/rate초 이상으로 벌리는 asyncio용 속도 제한기.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1 / rate
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+async def precompute(dataset='gyeonggi', rate=BATCH_RATE, concurrency=BATCH_CONCURRENCY, refresh=False):
+    """
+    모든 지역의 정책 제안을 동시에 생성해 현재 버전으로 저장합니다.
+    이미 현재 버전으로 저장된 지역은 refresh가 아니면 건너뜁니다. 결과 요약 dict 반환.
+    요청 속도는 rate 하나로만 제한합니다. 페이지용 공용 클라이언트의 토큰 버킷(GROQ_REQUESTS_PER_MINUTE)을
+    거치면 rate보다 느려지고 뒤쪽 요청이 기한 안에 차례를 받지 못하므로, 버킷 없는 전용 클라이언트를 씁니다.
+    """
+    client = create_llm_client()
+    store = get_suggestion_store()
+    version = suggestions_version(client.model)
+    jobs = policy_jobs(dataset)
+    done = set() if refresh else store.region_codes(version, dataset)
+    pending = [job for job in jobs if job[0] not in done]
+
+    limiter = AsyncRateLimiter(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+    failed = []
+
+    async def run(code, region, prompt):
+        async with semaphore:
+            await limiter.wait()
+            try:
+                # 연결 풀을 공유하는 동기 클라이언트를 스레드에서 호출합니다.
+                suggestion = await asyncio.to_thread(client.chat, prompt)
+            except LLMError:
+                failed.append(region)
+                return
+            store.put(version, dataset, code, region, make_key(client.model, prompt, dataset_version()), suggestion)
+            logger.info(f"{region} 정책 제안 저장")
+
+    await asyncio.gather(*(run(*job) for job in pending))
+    return {
+        'version': version,
+        'regions': len(jobs),
+        'skipped': len(jobs) - len(pending),
+        'generated': len(pending) - len(failed),
+        'failed': failed,
+    }
+
+
+if __name__ == "__main__":
+    # 정책 제안 일괄 생성: python -m utils.suggestions <gyeonggi|national> [초당 요청 수] [동시 요청 수]
+    if len(sys.argv) < 2 or sys.argv[1] not in POLICY_COLUMNS:
+        print("사용법: python -m utils.suggestions <gyeonggi|national> [초당 요청 수] [동시 요청 수]")
+        sys.exit(1)
+    logging.basicConfig(level=logging.INFO)
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else BATCH_RATE
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else BATCH_CONCURRENCY
+    start = time.perf_counter()
+    summary = asyncio.run(precompute(sys.argv[1], rate, concurrency))
+    print(f"{summary['version']}: 지역 {summary['regions']}개 중 {summary['generated']}개 생성, "
+          f"{summary['skipped']}개 건너뜀, 실패 {len(summary['failed'])}개 ({time.perf_counter() - start:.1f}초)")
+    if summary['failed']:
+        print("실패한 지역:", ", ".join(summary['failed']))
@@ -0,0 +1,62 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.emission_factors import DEFAULT_REGION
+from utils.footprint import ANNUAL_PERIODS, CATEGORIES, TOTAL_COLUMN, factor_registry
+
+# 요청당 표본 수
+DRAWS = 20_000
+
+# 배출계수 불확실성: 항목별 로그정규 분포의 로그 표준편차 (평균은 등록된 계수로 유지)
+FACTOR_SIGMA = np.array([0.10, 0.15, 0.30, 0.40, 0.25])
+
+# 사용자 입력 불확실성: 자기 보고 값의 변동계수 (0 미만은 0으로 자름)
+INPUT_CV = np.array([0.20, 0.10, 0.25, 0.30, 0.30])
+
+_PERIODS = np.asarray(ANNUAL_PERIODS, dtype='float64') / 1000
+
+_seed_sequence = np.random.SeedSequence()
+_seed_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_rng():
+    """
+    스레드별로 재사용하는 난수 생성기. Generator는 스레드 안전하지 않으므로
+    프로세스 시드에서 파생한 독립 스트림을 스레드(세션 실행)마다 하나씩 만들어 둡니다.
+    """
+    rng = getattr(_local, 'rng', None)
+    if rng is None:
+        with _seed_lock:
+            child = _seed_sequence.spawn(1)[0]
+        rng = _local.rng = np.random.default_rng(child)
+    return rng
+
+
+def simulate_footprint(inputs, draws=DRAWS, confidence=0.95, year=None, region=DEFAULT_REGION):
+    """
+    배출계수와 입력값을 분포에서 draws번 표본추출해 항목별/전체 탄소 발자국 분포를 계산합니다.
+    표본 전체를 (draws, 5) 배열 하나로 만들어 계산하므로 표본당 파이썬 반복이 없습니다.
+    반환: 항목(+총계) x [평균, 하한, 상한] DataFrame (톤 CO2e).
+    """
+    rng = get_rng()
+    inputs = np.asarray(inputs, dtype='float64')
+    factors = factor_registry().factors_for(year, region)
+
+    # 로그정규 계수: exp(sigma*Z - sigma^2/2)를 곱하면 평균이 원래 계수와 같습니다.
+    noise = rng.standard_normal((2, draws, len(CATEGORIES)))
+    sampled_factors = factors * np.exp(FACTOR_SIGMA * noise[0] - FACTOR_SIGMA ** 2 / 2)
+    sampled_inputs = np.maximum(inputs * (1 + INPUT_CV * noise[1]), 0)
+
+    samples = np.empty((draws, len(CATEGORIES) + 1))
+    np.multiply(sampled_inputs * sampled_factors, _PERIODS, out=samples[:, :-1])
+    samples[:, -1] = samples[:, :-1].sum(axis=1)
+
+    tail = (1 - confidence) / 2
+    lower, upper = np.quantile(samples, [tail, 1 - tail], axis=0)
+    return pd.DataFrame(
+        {'평균': samples.mean(axis=0), '하한': lower, '상한': upper},
+        index=CATEGORIES + [TOTAL_COLUMN],
+    )